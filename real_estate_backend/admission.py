@@ -0,0 +1,248 @@
+import asyncio
+import bisect
+import itertools
+import json
+import time
+from collections import defaultdict
+
+from starlette.routing import Match
+from real_estate_backend import config, logs
+from real_estate_backend.metrics import ADMISSION_SHED, ADMISSION_WAIT_SECONDS
+
+# ------------------------------------------------------------
+# ADMISSION CONTROL / LOAD SHEDDING
+# Requests are admitted before they reach a handler, so a spike
+# queues here (cheaply, on the event loop) instead of as sessions
+# piling onto Oracle. A request needs a global slot
+# (ADMISSION_MAX_CONCURRENT) and a slot on its route (lower caps from
+# ADMISSION_ROUTE_LIMITS). Otherwise it waits in a bounded queue
+# ordered by priority class, then arrival:
+#   write      POST / PUT / DELETE
+#   read       other GETs
+#   analytics  aggregates and exports (ANALYTICS_ROUTES)
+# A full queue makes room for a better class by shedding the newest
+# waiter of the worst class; otherwise the arrival is shed. Waiters
+# past ADMISSION_MAX_WAIT_MS are shed too. Shed requests get 503 with
+# Retry-After before any handler or query runs.
+# ------------------------------------------------------------
+CLASSES = ("write", "read", "analytics")
+PRIORITY = {name: rank for rank, name in enumerate(CLASSES)}
+ANALYTICS_ROUTES = {
+    "/calc_total_sales/{agent_id}",
+    "/get_total_commission/{agent_id}",
+    "/agents/stats",
+    "/available_properties/{city}",
+    "/export/properties",
+    "/export/users",
+}
+# No database session of their own (or they watch admission itself)
+EXEMPT_ROUTES = {
+    "/", "/metrics", "/pool_stats", "/cache_stats", "/loader_stats", "/admission_stats", "/replica_stats",
+    "/stream/properties", "/stream/stats",
+}
+
+
+def parse_route_limits(spec):
+    # "/agents/stats=2,/export/users=1" -> {"/agents/stats": 2, ...}
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        route, _, value = item.rpartition("=")
+        limits[route.strip()] = int(value)
+    return limits
+
+
+class Shed(Exception):
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class _Waiter:
+    __slots__ = ("key", "route", "klass", "future")
+
+    def __init__(self, key, route, klass, future):
+        self.key = key
+        self.route = route
+        self.klass = klass
+        self.future = future
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+
+class AdmissionController:
+    # All state is touched from the event loop only
+    def __init__(self, max_concurrent, route_limits, queue_size, max_wait_seconds):
+        self.max_concurrent = max_concurrent
+        self.route_limits = route_limits
+        self.queue_size = queue_size
+        self.max_wait_seconds = max_wait_seconds
+        self.active = 0
+        self.active_by_route = defaultdict(int)
+        self.waiters = []  # sorted by (priority, arrival)
+        self.admitted = defaultdict(int)
+        self.shed = defaultdict(int)  # (class, reason) -> count
+        self._seq = itertools.count()
+
+    def _has_room(self, route):
+        return (
+            self.active < self.max_concurrent
+            and self.active_by_route[route] < self.route_limits.get(route, self.max_concurrent)
+        )
+
+    def _grant(self, route, klass):
+        self.active += 1
+        self.active_by_route[route] += 1
+        self.admitted[klass] += 1
+
+    def _shed(self, klass, reason):
+        self.shed[(klass, reason)] += 1
+        ADMISSION_SHED.inc(1, klass, reason)
+        return Shed(reason)
+
+    async def acquire(self, route, klass):
+        # Waiters still queued while there is global room are blocked
+        # on their own route's cap, so they don't outrank this request
+        if self._has_room(route):
+            self._grant(route, klass)
+            ADMISSION_WAIT_SECONDS.observe(0.0, klass)
+            return
+        if len(self.waiters) >= self.queue_size:
+            if not self.waiters or PRIORITY[klass] >= PRIORITY[self.waiters[-1].klass]:
+                raise self._shed(klass, "queue_full")
+            worst = self.waiters.pop()
+            worst.future.set_exception(self._shed(worst.klass, "evicted"))
+
+        waiter = _Waiter((PRIORITY[klass], next(self._seq)), route, klass,
+                         asyncio.get_running_loop().create_future())
+        bisect.insort(self.waiters, waiter)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait({waiter.future}, timeout=self.max_wait_seconds)
+        except BaseException:
+            # Cancelled (client went away) while queued or just granted
+            self._abandon(waiter)
+            raise
+        ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - start, klass)
+        if not waiter.future.done():
+            self._abandon(waiter)
+            raise self._shed(klass, "timeout")
+        waiter.future.result()  # raises Shed when evicted
+
+    def _abandon(self, waiter):
+        if not waiter.future.done():
+            self.waiters.remove(waiter)
+            waiter.future.cancel()
+        elif not waiter.future.cancelled() and waiter.future.exception() is None:
+            self.release(waiter.route)
+
+    def release(self, route):
+        self.active -= 1
+        self.active_by_route[route] -= 1
+        if not self.active_by_route[route]:
+            del self.active_by_route[route]
+        # Hand freed slots to the best waiters whose route has room
+        i = 0
+        while i < len(self.waiters) and self.active < self.max_concurrent:
+            waiter = self.waiters[i]
+            if self._has_room(waiter.route):
+                del self.waiters[i]
+                self._grant(waiter.route, waiter.klass)
+                waiter.future.set_result(True)
+            else:
+                i += 1
+
+    def queued(self):
+        depth = dict.fromkeys(CLASSES, 0)
+        for waiter in list(self.waiters):
+            depth[waiter.klass] += 1
+        return depth
+
+    def stats(self):
+        return {
+            "enabled": config.ADMISSION_ENABLED,
+            "max_concurrent": self.max_concurrent,
+            "active": self.active,
+            "active_by_route": dict(self.active_by_route),
+            "route_limits": self.route_limits,
+            "queue_size": self.queue_size,
+            "queued": self.queued(),
+            "admitted": dict(self.admitted),
+            "shed": {f"{k}:{reason}": n for (k, reason), n in dict(self.shed).items()},
+        }
+
+
+controller = AdmissionController(
+    config.ADMISSION_MAX_CONCURRENT,
+    parse_route_limits(config.ADMISSION_ROUTE_LIMITS),
+    config.ADMISSION_QUEUE_SIZE,
+    config.ADMISSION_MAX_WAIT_MS / 1000,
+)
+
+
+def _flat_routes(routes):
+    # Routers added with include_router() are matched through their own routes
+    for route in routes:
+        included = getattr(route, "original_router", None)
+        if included is not None:
+            yield from _flat_routes(included.routes)
+        else:
+            yield route
+
+
+def _match_route(scope):
+    # Same matching the router does next (the middleware runs first);
+    # returns the route template, or None when nothing matches
+    for route in _flat_routes(scope["app"].router.routes):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return None
+
+
+def classify(method, route):
+    if method == "OPTIONS" or route is None or route in EXEMPT_ROUTES:
+        return None
+    if method not in ("GET", "HEAD"):
+        return "write"
+    return "analytics" if route in ANALYTICS_ROUTES else "read"
+
+
+class AdmissionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not config.ADMISSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        route = _match_route(scope)
+        klass = classify(scope["method"], route)
+        if klass is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await controller.acquire(route, klass)
+        except Shed as e:
+            logs.log("request_shed", "warning", route=route, priority_class=klass, reason=e.reason)
+            await _reject(send, e.reason)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release(route)
+
+
+async def _reject(send, reason):
+    body = json.dumps({"detail": "Server busy, please retry", "reason": reason}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(config.ADMISSION_RETRY_AFTER_SECONDS).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
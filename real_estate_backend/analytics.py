@@ -0,0 +1,471 @@
+import threading
+import time
+
+from fastapi import APIRouter, HTTPException, Query
+from real_estate_backend import config, events
+from real_estate_backend.database import get_connection
+from real_estate_backend.dataloader import COMMISSION_RATE
+from real_estate_backend.logtail import LogTail
+from real_estate_backend.search import LOG_BATCH, LOGS_SQL, fetch_by_ids
+
+try:
+    import numpy as np
+except ImportError:  # optional: /analytics/* answer 501 without it
+    np = None
+
+# ------------------------------------------------------------
+# MARKET ANALYTICS (columnar snapshot)
+# A process-local NumPy copy of the properties table, one array per
+# column, with text columns dictionary-encoded to small ints:
+#   property_id  int64    sorted
+#   price        float64  NaN when missing
+#   city, area   int32    codes; area = (city, locality) pair
+#   status, ptype int32   codes
+#   agent        int32    code of agent_id, -1 when unassigned
+# Kept fresh like the search index: change events mark ids dirty,
+# property_logs is tailed for status changes made elsewhere (rows
+# committing behind the tail re-fetch their property), and
+# every refresh builds new arrays and swaps them in, so a query
+# always sees one consistent snapshot. Grouped statistics are
+# bincount / sorted-segment arithmetic over the arrays; no query
+# reaches Oracle.
+# ------------------------------------------------------------
+router = APIRouter(prefix="/analytics")
+
+SNAPSHOT_FIELDS = ("property_id", "agent_id", "city", "locality", "price", "property_type", "status")
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def _norm(value):
+    # Same folding as the search facets: " Mumbai" and "mumbai" group together
+    return (value or "").strip().lower()
+
+
+class _Dictionary:
+    # Append-only value <-> code mapping; codes stay valid across refreshes
+    def __init__(self):
+        self.codes = {}
+        self.labels = []
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.labels)
+            self.labels.append(value)
+        return code
+
+    def encode(self, values):
+        return np.fromiter((self.code(v) for v in values), dtype=np.int32, count=len(values))
+
+
+class PropertySnapshot:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.cities = _Dictionary()
+        self.areas = _Dictionary()
+        self.statuses = _Dictionary()
+        self.types = _Dictionary()
+        self.agents = _Dictionary()
+        self.columns = None
+        self._orders = {}  # grouping -> priced rows sorted by (group, price)
+        self.logs = self._log_tail()
+        self.last_log_poll = 0.0
+        self.refreshed_at = None
+        self.dirty = set()
+        self.needs_reload = True
+
+    # ---------- building columns ----------
+    def _encode(self, rows):
+        # rows in SNAPSHOT_FIELDS order -> dict of column arrays
+        count = len(rows)
+        pids, agents, cities, localities, prices, types, statuses = zip(*rows) if rows else ([],) * 7
+        city_keys = [_norm(c) for c in cities]
+        return {
+            "property_id": np.fromiter(pids, dtype=np.int64, count=count),
+            "price": np.fromiter((np.nan if p is None else p for p in prices), dtype=np.float64, count=count),
+            "city": self.cities.encode(city_keys),
+            "area": self.areas.encode(list(zip(city_keys, (_norm(loc) for loc in localities)))),
+            "status": self.statuses.encode([_norm(s) for s in statuses]),
+            "ptype": self.types.encode([_norm(t) for t in types]),
+            "agent": np.fromiter((-1 if a is None else self.agents.code(a) for a in agents),
+                                 dtype=np.int32, count=count),
+        }
+
+    @staticmethod
+    def _sorted(columns):
+        ids = columns["property_id"]
+        if len(ids) > 1 and not (ids[1:] > ids[:-1]).all():
+            order = np.argsort(ids, kind="stable")
+            columns = {name: col[order] for name, col in columns.items()}
+        return columns
+
+    def _swap(self, columns, keep_orders=False):
+        with self._lock:
+            self.columns = columns
+            if not keep_orders:
+                self._orders = {}
+            self.refreshed_at = time.time()
+
+    def _view(self):
+        with self._lock:
+            return self.columns, self._orders
+
+    # ---------- syncing with Oracle ----------
+    @staticmethod
+    def _log_tail():
+        return LogTail("log", LOGS_SQL, "property_logs", "log_id", "log_id, property_id",
+                       config.LOG_GAP_GRACE_SECONDS)
+
+    def load(self, cursor):
+        cursor.execute("SELECT NVL(MAX(log_id), 0) FROM property_logs")
+        hwm = cursor.fetchone()[0]
+        logs = self._log_tail()
+        logs.seed(cursor, hwm, time.monotonic(), config.LOG_GAP_SCAN_IDS)
+        cursor.arraysize = 5000
+        cursor.execute(f"SELECT {', '.join(SNAPSHOT_FIELDS)} FROM properties")
+        columns = self._sorted(self._encode(cursor.fetchall()))
+        self._swap(columns)
+        with self._lock:
+            self.logs = logs
+            self.last_log_poll = time.monotonic()
+            self.needs_reload = False
+
+    def _refresh_dirty(self, cursor):
+        with self._lock:
+            dirty, self.dirty = list(self.dirty), set()
+        rows = fetch_by_ids(cursor, f"SELECT {', '.join(SNAPSHOT_FIELDS)} FROM properties", dirty)
+        current = self.columns
+        # Drop every dirty id, then append the rows that still exist
+        keep = ~np.isin(current["property_id"], np.asarray(dirty, dtype=np.int64))
+        fresh = self._encode(rows)
+        columns = {name: np.concatenate([col[keep], fresh[name]]) for name, col in current.items()}
+        self._swap(self._sorted(columns))
+
+    def _tail_logs(self, cursor):
+        now = time.monotonic()
+        rows, late = [], []
+        while True:
+            batch, found = self.logs.read(cursor, LOG_BATCH)
+            self.logs.advance(batch, found, now)
+            rows.extend(batch)
+            late.extend(found)
+            if len(batch) < LOG_BATCH:
+                break
+        if rows:
+            latest = {pid: new_status for _, pid, new_status in rows}  # last change wins
+            current = self.columns
+            ids = current["property_id"]
+            wanted = np.fromiter(latest, dtype=np.int64, count=len(latest))
+            codes = self.statuses.encode([_norm(s) for s in latest.values()])
+            pos = np.minimum(np.searchsorted(ids, wanted), max(len(ids) - 1, 0))
+            found = ids[pos] == wanted if len(ids) else np.zeros(len(wanted), dtype=bool)
+            status = current["status"].copy()
+            status[pos[found]] = codes[found]
+            # Prices and groups are unchanged, so are the sort orders
+            self._swap(dict(current, status=status), keep_orders=True)
+        if late:
+            # A late row's status may be older than the one applied above
+            with self._lock:
+                self.dirty.update(pid for _, pid in late)
+            self._refresh_dirty(cursor)
+        self.last_log_poll = time.monotonic()
+
+    def on_change(self, entity, ids):
+        with self._lock:
+            if ids is None:
+                self.needs_reload = True
+            else:
+                self.dirty.update(ids)
+
+    def sync(self):
+        with self._lock:
+            reload_needed = self.needs_reload or self.columns is None
+            has_dirty = bool(self.dirty)
+            poll_due = time.monotonic() - self.last_log_poll >= config.ANALYTICS_LOG_POLL_SECONDS
+        if not (reload_needed or has_dirty or poll_due):
+            return
+        with self._sync_lock, get_connection() as conn, conn.cursor() as cursor:
+            if reload_needed:
+                self.load(cursor)
+                return
+            if has_dirty:
+                self._refresh_dirty(cursor)
+            if poll_due:
+                self._tail_logs(cursor)
+
+    def info(self):
+        with self._lock:
+            columns = self.columns
+            return {
+                "rows": 0 if columns is None else len(columns["property_id"]),
+                "log_id": self.logs.mark,
+                "refreshed_at": self.refreshed_at,
+            }
+
+    # ---------- querying ----------
+    def _mask(self, columns, city=None, locality=None, status=None, property_type=None):
+        # None when nothing is filtered, so full scans skip the compress
+        mask = None
+        for column, dictionary, value in (
+            ("city", self.cities, city),
+            ("status", self.statuses, status),
+            ("ptype", self.types, property_type),
+        ):
+            if value:
+                code = dictionary.codes.get(_norm(value))
+                mask = _and(mask, columns[column] == (-1 if code is None else code))
+        if locality:
+            wanted = _norm(locality)
+            codes = [c for c, (_, loc) in enumerate(self.areas.labels) if loc == wanted]
+            mask = _and(mask, np.isin(columns["area"], codes))
+        return mask
+
+    @staticmethod
+    def _ranked(columns, orders, key, mask):
+        # Priced rows sorted by (group, price), with the columns the
+        # price statistics read, gathered once per snapshot; each group
+        # is then a contiguous, price-sorted run
+        ranked = orders.get(key)
+        if ranked is None:
+            price = columns["price"]
+            priced = np.flatnonzero(~np.isnan(price))
+            order = priced[np.argsort(price[priced], kind="stable")]
+            if key is not None:
+                groups = columns[key][order] + 1  # unassigned agents (-1) first
+                if groups.max(initial=0) < 1 << 16:
+                    groups = groups.astype(np.uint16)  # radix sort
+                order = order[np.argsort(groups, kind="stable")]
+            ranked = orders[key] = {
+                "rows": order,
+                "group": np.zeros(len(order), dtype=np.int32) if key is None else columns[key][order],
+                "price": price[order],
+                "ptype": columns["ptype"][order],
+            }
+        if mask is None:
+            return ranked
+        keep = mask[ranked["rows"]]
+        return {name: col[keep] for name, col in ranked.items()}
+
+    def _status_code(self, name):
+        return self.statuses.codes.get(name, -1)
+
+    def prices(self, group_by="city", percentiles=DEFAULT_PERCENTILES, bins=0,
+               min_count=1, limit=100, **filters):
+        columns, orders = self._view()
+        mask = self._mask(columns, **filters)
+        key = {"city": "city", "locality": "area", "all": None}[group_by]
+        labels = [None] if key is None else list((self.cities if key == "city" else self.areas).labels)
+        n_groups = len(labels)
+
+        def rows(name):
+            if name is None:
+                return np.zeros(len(columns["price"]) if mask is None else int(mask.sum()), dtype=np.int32)
+            return columns[name] if mask is None else columns[name][mask]
+
+        # Counts over every matching row, priced or not
+        groups, status, ptype = rows(key), rows("status"), rows("ptype")
+        counts = np.bincount(groups, minlength=n_groups)
+        n_status, n_types = len(self.statuses.labels), len(self.types.labels)
+        status_counts = np.bincount(groups * n_status + status, minlength=n_groups * n_status)
+        status_counts = status_counts.reshape(n_groups, n_status)
+        type_counts = np.bincount(groups * n_types + ptype, minlength=n_groups * n_types)
+        type_counts = type_counts.reshape(n_groups, n_types)
+
+        # Price statistics over matching rows that have a price
+        ranked = self._ranked(columns, orders, key, mask)
+        price, ranked_groups = ranked["price"], ranked["group"]
+        stats = _grouped_price_stats(ranked_groups, price, n_groups, percentiles)
+        type_key = ranked_groups * n_types + ranked["ptype"]
+        type_sums = np.bincount(type_key, weights=price, minlength=n_groups * n_types).reshape(n_groups, n_types)
+        type_priced = np.bincount(type_key, minlength=n_groups * n_types).reshape(n_groups, n_types)
+
+        edges = hist = None
+        if bins and len(price):
+            lo, hi = float(price.min()), float(price.max())
+            edges = np.linspace(lo, hi if hi > lo else lo + 1, bins + 1)
+            slot = np.clip(np.searchsorted(edges, price, side="right") - 1, 0, bins - 1)
+            hist = np.bincount(ranked_groups * bins + slot, minlength=n_groups * bins).reshape(n_groups, bins)
+
+        sold, available = self._status_code("sold"), self._status_code("available")
+        order = [g for g in np.argsort(-counts, kind="stable").tolist() if counts[g] >= max(min_count, 1)]
+        result = []
+        for g in order[:limit]:
+            n = int(counts[g])
+            entry = {"count": n}
+            if group_by == "city":
+                entry["city"] = labels[g]
+            elif group_by == "locality":
+                entry["city"], entry["locality"] = labels[g]
+            entry["price"] = {k: v[g] for k, v in stats.items()}
+            entry["status"] = {
+                self.statuses.labels[s]: int(c) for s, c in enumerate(status_counts[g].tolist()) if c
+            }
+            entry["sold_ratio"] = round(int(status_counts[g, sold]) / n, 4) if sold >= 0 else 0.0
+            entry["available_ratio"] = round(int(status_counts[g, available]) / n, 4) if available >= 0 else 0.0
+            entry["property_type"] = {
+                self.types.labels[t]: {
+                    "count": int(c),
+                    "share": round(int(c) / n, 4),
+                    "mean_price": float(type_sums[g, t] / type_priced[g, t]) if type_priced[g, t] else None,
+                }
+                for t, c in enumerate(type_counts[g].tolist()) if c
+            }
+            if hist is not None:
+                entry["histogram"] = hist[g].tolist()
+            result.append(entry)
+        return {
+            "group_by": group_by,
+            "groups": result,
+            "total_groups": len(order),
+            "histogram_edges": edges.tolist() if edges is not None else None,
+        }
+
+    def agents_report(self, sort_by="sold_value", min_listings=1, limit=50, **filters):
+        columns, orders = self._view()
+        mask = self._mask(columns, **filters)
+        # Slot 0 collects unassigned properties (agent code -1) and is dropped
+        n_slots = len(self.agents.labels) + 1
+        groups = (columns["agent"] if mask is None else columns["agent"][mask]) + 1
+        price = columns["price"] if mask is None else columns["price"][mask]
+        status = columns["status"] if mask is None else columns["status"][mask]
+        value = np.where(np.isnan(price), 0.0, price)
+
+        listings = np.bincount(groups, minlength=n_slots)[1:]
+        is_sold = status == self._status_code("sold")
+        is_available = status == self._status_code("available")
+        sold = np.bincount(groups, weights=is_sold, minlength=n_slots)[1:].astype(np.int64)
+        available = np.bincount(groups, weights=is_available, minlength=n_slots)[1:].astype(np.int64)
+        sold_value = np.bincount(groups, weights=value * is_sold, minlength=n_slots)[1:]
+        listed_value = np.bincount(groups, weights=value, minlength=n_slots)[1:]
+        ranked = self._ranked(columns, orders, "agent", mask)
+        medians = _grouped_price_stats(ranked["group"] + 1, ranked["price"], n_slots, (50,))["median"][1:]
+        n_agents = n_slots - 1
+        sell_through = np.divide(sold, listings, out=np.zeros(n_agents), where=listings > 0)
+
+        keys = {"sold_value": sold_value, "listings": listings, "sold": sold,
+                "sell_through": sell_through, "listed_value": listed_value}
+        order = [a for a in np.argsort(-keys[sort_by], kind="stable").tolist()
+                 if listings[a] >= max(min_listings, 1)]
+        agents = [
+            {
+                "agent_id": self.agents.labels[a],
+                "listings": int(listings[a]),
+                "sold": int(sold[a]),
+                "available": int(available[a]),
+                "sell_through": round(float(sell_through[a]), 4),
+                "sold_value": float(sold_value[a]),
+                "commission": float(sold_value[a]) * COMMISSION_RATE,
+                "listed_value": float(listed_value[a]),
+                "median_price": medians[a],
+            }
+            for a in order[:limit]
+        ]
+        return {"sort_by": sort_by, "agents": agents, "total_agents": len(order)}
+
+
+def _and(mask, condition):
+    return condition if mask is None else mask & condition
+
+
+def _grouped_price_stats(groups, price, n_groups, percentiles):
+    # Rows arrive sorted by (group, price), so each group is a sorted
+    # segment and min / max / percentiles are index arithmetic
+    # (linear interpolation, as numpy.percentile)
+    counts = np.bincount(groups, minlength=n_groups)
+    sums = np.bincount(groups, weights=price, minlength=n_groups)
+    ends = np.cumsum(counts)
+    starts = ends - counts
+    last = np.maximum(ends - 1, 0)
+    present = counts > 0
+
+    def column(values):
+        return [float(v) if p else None for v, p in zip(values.tolist(), present.tolist())]
+
+    qs = sorted(set(percentiles) | {50})
+    if len(price):
+        pos = starts[:, None] + (np.maximum(counts, 1)[:, None] - 1) * (np.array(qs)[None, :] / 100)
+        below = np.minimum(np.floor(pos).astype(np.int64), last[:, None])
+        above = np.minimum(below + 1, last[:, None])
+        values = price[below] + (price[above] - price[below]) * (pos - np.floor(pos))
+        low, high = price[np.minimum(starts, last)], price[last]
+    else:
+        values = np.zeros((n_groups, len(qs)))
+        low = high = np.zeros(n_groups)
+    stats = {
+        "min": column(low),
+        "max": column(high),
+        "mean": column(np.divide(sums, counts, out=np.zeros(n_groups), where=present)),
+    }
+    for i, q in enumerate(qs):
+        stats["median" if q == 50 else f"p{q:g}"] = column(values[:, i])
+    return stats
+
+
+market_snapshot = PropertySnapshot()
+events.subscribe("properties", market_snapshot.on_change)
+# Agent deletions cascade to their properties without listing the ids
+events.subscribe("agents", lambda entity, ids: market_snapshot.on_change(entity, None))
+
+
+def _check_numpy():
+    if np is None:
+        raise HTTPException(status_code=501, detail="Analytics needs numpy (pip install numpy)")
+
+
+def _parse_percentiles(spec):
+    try:
+        values = tuple(float(v) for v in spec.split(",") if v.strip())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="percentiles must be comma-separated numbers")
+    if not values or any(not 0 <= v <= 100 for v in values):
+        raise HTTPException(status_code=400, detail="percentiles must be between 0 and 100")
+    return values
+
+
+@router.get("/prices")
+def price_statistics(
+    group_by: str = Query("city", pattern="^(city|locality|all)$"),
+    city: str = None,
+    locality: str = None,
+    status: str = None,
+    property_type: str = None,
+    percentiles: str = "10,25,50,75,90",
+    bins: int = Query(0, ge=0, le=200),
+    min_count: int = Query(1, ge=1),
+    limit: int = Query(100, ge=1, le=10000),
+):
+    _check_numpy()
+    qs = _parse_percentiles(percentiles)
+    try:
+        market_snapshot.sync()
+        start = time.perf_counter()
+        result = market_snapshot.prices(group_by, qs, bins, min_count, limit, city=city,
+                                        locality=locality, status=status, property_type=property_type)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    result["took_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    result["snapshot"] = market_snapshot.info()
+    return result
+
+
+@router.get("/agents")
+def agent_statistics(
+    city: str = None,
+    locality: str = None,
+    property_type: str = None,
+    sort_by: str = Query("sold_value", pattern="^(sold_value|listings|sold|sell_through|listed_value)$"),
+    min_listings: int = Query(1, ge=1),
+    limit: int = Query(50, ge=1, le=10000),
+):
+    _check_numpy()
+    try:
+        market_snapshot.sync()
+        start = time.perf_counter()
+        result = market_snapshot.agents_report(sort_by, min_listings, limit, city=city,
+                                               locality=locality, property_type=property_type)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    result["took_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    result["snapshot"] = market_snapshot.info()
+    return result
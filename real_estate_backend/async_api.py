@@ -0,0 +1,507 @@
+from fastapi import APIRouter, FastAPI, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+import oracledb
+from real_estate_backend import dataloader, events, jobs, logs
+from real_estate_backend.cache import cache_key, response_cache
+from real_estate_backend.database import get_async_connection
+from real_estate_backend.ids import agent_ids, property_ids, user_ids
+from real_estate_backend.models import Agent, User
+from real_estate_backend.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    page_query,
+    property_filters,
+    resolve_after_id,
+    split_page,
+)
+from real_estate_backend.serialization import (
+    AGENT_LIST_COLUMNS,
+    PROPERTY_LIST_COLUMNS,
+    USER_LIST_COLUMNS,
+    check_format,
+    columnar,
+    json_bytes_response,
+)
+
+# ------------------------------------------------------------
+# ASYNC ENGINE (DB_ENGINE=async)
+# asyncio twins of the handlers in main.py. They run on the event
+# loop instead of the threadpool, so in-flight DB calls are bounded
+# by the async pool rather than by the worker threads.
+# ------------------------------------------------------------
+router = APIRouter()
+
+
+def install_async_routes(app: FastAPI, keep=()):
+    # Drop the sync handlers that have an async twin, then mount the
+    # twins; paths in `keep` stay on their sync GET handler
+    twins = APIRouter()
+    twins.routes.extend(
+        route for route in router.routes
+        if not (route.path in keep and "GET" in route.methods)
+    )
+    replaced = {
+        (route.path, method)
+        for route in twins.routes
+        for method in route.methods
+    }
+    app.router.routes = [
+        route for route in app.router.routes
+        if not (
+            isinstance(route, APIRoute)
+            and any((route.path, method) in replaced for method in route.methods)
+        )
+    ]
+    app.include_router(twins)
+
+
+# ------------------------------------------------------------
+# USERS: CRUD OPERATIONS
+# ------------------------------------------------------------
+@router.get("/users")
+async def get_users(
+    after_id: int = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str = None,
+    format: str = "objects",
+):
+    check_format(format)
+    start = resolve_after_id(after_id, cursor)
+    try:
+        sql, binds = page_query(
+            "SELECT USER_ID, USERNAME, EMAIL, ROLE FROM USERS", "USER_ID", start, limit
+        )
+        async with get_async_connection() as conn:
+            with conn.cursor() as cur:
+                await cur.execute(sql, binds)
+                rows = await cur.fetchall()
+
+        rows, next_cursor = split_page(rows, limit)
+        if format == "columnar":
+            return json_bytes_response(columnar(USER_LIST_COLUMNS, rows, next_cursor=next_cursor))
+        users = [dict(zip(USER_LIST_COLUMNS, r)) for r in rows]
+        return {"users": users, "next_cursor": next_cursor}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/add_user")
+async def add_user(user: User):
+    try:
+        async with get_async_connection() as conn:
+            with conn.cursor() as cursor:
+                new_id = await user_ids.next_id_async(cursor)
+
+                await cursor.execute("""
+                    INSERT INTO USERS (USER_ID, USERNAME, PASSWORD_HASH, FULL_NAME, EMAIL, PHONE, ROLE, CREATED_AT)
+                    VALUES (:1, :2, 'default_hash', :3, :4, '0000000000', :5, SYSDATE)
+                """, (new_id, user.username, user.username, user.email, user.role))
+
+            await conn.commit()
+        events.publish("users", [new_id])
+        return {"message": f"✅ User '{user.username}' added successfully!"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/update_user/{user_id}")
+async def update_user(user_id: int, request: dict):
+    username = request.get("username")
+    email = request.get("email")
+    role = request.get("role")
+
+    try:
+        async with get_async_connection() as conn:
+            with conn.cursor() as cursor:
+                await cursor.execute("""
+                    UPDATE users
+                    SET username = :1, email = :2, role = :3
+                    WHERE user_id = :4
+                """, [username, email, role, user_id])
+
+                # ✅ Sync role with agents table
+                if role.lower() == "buyer":
+                    await cursor.execute("DELETE FROM agents WHERE user_id = :1", [user_id])
+                elif role.lower() == "agent":
+                    await cursor.execute("SELECT agent_id FROM agents WHERE user_id = :1", [user_id])
+                    if await cursor.fetchone() is None:
+                        new_agent_id = await agent_ids.next_id_async(cursor)
+                        await cursor.execute("""
+                            INSERT INTO agents (agent_id, user_id, license_no, region)
+                            VALUES (:1, :2, 'UNASSIGNED', 'Not specified')
+                        """, [new_agent_id, user_id])
+
+            await conn.commit()
+
+        events.publish("users", [user_id])
+        events.publish("agents")
+        if role.lower() == "buyer":
+            events.publish("properties")
+        return {"message": f"✅ User '{username}' updated successfully!"}
+    except Exception as e:
+        logs.log("user_update_failed", "error", exc=e, user_id=user_id)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/delete_user/{user_id}")
+async def delete_user(user_id: int):
+    try:
+        async with get_async_connection() as conn:
+            with conn.cursor() as cursor:
+                await cursor.execute("SELECT username FROM users WHERE user_id = :1", [user_id])
+                user_row = await cursor.fetchone()
+        if user_row is None:
+            return {"message": f"User ID {user_id} not found"}
+
+        # Jobs run on the sync pool's worker threads
+        job_id = await run_in_threadpool(jobs.submit, "delete_user", user_id=user_id)
+        logs.log("user_delete_queued", user_id=user_id, username=user_row[0], job_id=job_id)
+    except Exception as e:
+        logs.log("user_delete_failed", "error", exc=e, user_id=user_id)
+        raise HTTPException(status_code=500, detail=str(e))
+    return jobs.accepted(job_id, f"🗑️ Deletion of user {user_id} and linked data queued (job {job_id}).")
+
+
+# ------------------------------------------------------------
+# PL/SQL PROCEDURE / FUNCTION / CURSOR / EXCEPTION DEMOS
+# ------------------------------------------------------------
+@router.get("/calc_total_sales/{agent_id}")
+async def calc_total_sales(agent_id: int):
+    try:
+        result = float(await dataloader.agent_sales.load_async(agent_id))
+        return {"agent_id": agent_id, "total_sales": result}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/get_total_commission/{agent_id}")
+async def get_total_commission(agent_id: int):
+    try:
+        result = float(await dataloader.agent_sales.load_async(agent_id)) * dataloader.COMMISSION_RATE
+        return {"agent_id": agent_id, "total_unpaid_commission": result}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/available_properties/{city}")
+async def available_properties(city: str):
+    async def load():
+        async with get_async_connection() as conn:
+            with conn.cursor() as cursor:
+                await cursor.execute("""
+                    SELECT property_id, title, price, status
+                    FROM properties
+                    WHERE LOWER(city) = LOWER(:city)
+                    AND status = 'available'
+                """, [city])
+                rows = await cursor.fetchall()
+
+        properties = [
+            {"property_id": r[0], "title": r[1], "price": r[2], "status": r[3]}
+            for r in rows
+        ]
+        return {"available_properties": properties}
+
+    try:
+        key = cache_key("available_properties", city=city.lower())
+        return await response_cache.get_or_load_async(key, ["properties"], load)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/check_property/{property_id}")
+async def check_property(property_id: int):
+    async def load():
+        price = await dataloader.property_prices.load_async(property_id)
+
+        if price is None:
+            return {"error": f"❌ Property with ID {property_id} not found"}
+        else:
+            return {"property_id": property_id, "price": price}
+
+    try:
+        key = cache_key("check_property", property_id=property_id)
+        return await response_cache.get_or_load_async(key, [f"properties:{property_id}"], load)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ------------------------------------------------------------
+# AGENT ENDPOINTS
+# ------------------------------------------------------------
+@router.get("/agents")
+async def get_agents(
+    after_id: int = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str = None,
+    format: str = "objects",
+):
+    check_format(format)
+    start = resolve_after_id(after_id, cursor)
+
+    async def load():
+        sql, binds = page_query("""
+            SELECT a.agent_id, u.username, a.license_no, a.region
+            FROM agents a
+            JOIN users u ON a.user_id = u.user_id""", "a.agent_id", start, limit)
+        async with get_async_connection() as conn:
+            with conn.cursor() as cur:
+                await cur.execute(sql, binds)
+                rows = await cur.fetchall()
+
+        rows, next_cursor = split_page(rows, limit)
+        if format == "columnar":
+            return columnar(AGENT_LIST_COLUMNS, rows, next_cursor=next_cursor)
+        agents = [dict(zip(AGENT_LIST_COLUMNS, r)) for r in rows]
+        return {"agents": agents, "next_cursor": next_cursor}
+
+    try:
+        key = cache_key("agents", after_id=start, limit=limit, format=format)
+        result = await response_cache.get_or_load_async(key, ["agents", "users"], load)
+        return json_bytes_response(result) if format == "columnar" else result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/add_agent")
+async def add_agent(agent: Agent):
+    try:
+        async with get_async_connection() as conn:
+            with conn.cursor() as cursor:
+                await cursor.execute("SELECT USER_ID, ROLE FROM USERS WHERE USERNAME = :1", [agent.username])
+                row = await cursor.fetchone()
+
+                if row:
+                    user_id = row[0]
+                    if row[1] != 'agent':
+                        await cursor.execute("UPDATE USERS SET ROLE = 'agent' WHERE USER_ID = :1", [user_id])
+                else:
+                    user_id = await user_ids.next_id_async(cursor)
+                    await cursor.execute("""
+                        INSERT INTO USERS (
+                            USER_ID, USERNAME, PASSWORD_HASH, FULL_NAME, EMAIL, PHONE, ROLE, CREATED_AT
+                        ) VALUES (
+                            :1, :2, 'default_hash', :3, :2 || '@example.com', '0000000000', 'agent', SYSDATE
+                        )
+                    """, (user_id, agent.username, agent.username))
+
+                agent_id = await agent_ids.next_id_async(cursor)
+
+                await cursor.execute("""
+                    INSERT INTO AGENTS (AGENT_ID, USER_ID, LICENSE_NO, REGION)
+                    VALUES (:1, :2, :3, :4)
+                """, (agent_id, user_id, agent.license_no, agent.region))
+
+            await conn.commit()
+        events.publish("users", [user_id])
+        events.publish("agents", [agent_id])
+        return {"message": f"✅ Agent '{agent.username}' added successfully!"}
+    except oracledb.IntegrityError:
+        raise HTTPException(status_code=400, detail="Agent already exists or duplicate key.")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/update_agent/{agent_id}")
+async def update_agent(agent_id: int, agent: Agent):
+    try:
+        async with get_async_connection() as conn:
+            with conn.cursor() as cursor:
+                await cursor.execute("""
+                    UPDATE agents
+                    SET license_no = :1, region = :2
+                    WHERE agent_id = :3
+                """, [agent.license_no, agent.region, agent_id])
+                await cursor.execute("""
+                    UPDATE users
+                    SET username = :1
+                    WHERE user_id = (SELECT user_id FROM agents WHERE agent_id = :2)
+                """, [agent.username, agent_id])
+
+            await conn.commit()
+
+        events.publish("agents", [agent_id])
+        events.publish("users")
+        return {"message": f"✅ Agent ID {agent_id} updated successfully!"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/delete_agent/{agent_id}")
+async def delete_agent(agent_id: int):
+    try:
+        job_id = await run_in_threadpool(jobs.submit, "delete_agent", agent_id=agent_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return jobs.accepted(job_id, f"🗑️ Deletion of agent ID {agent_id} queued (job {job_id}).")
+
+
+# ------------------------------------------------------------
+# PROPERTY ENDPOINTS
+# ------------------------------------------------------------
+@router.get("/properties")
+async def get_properties(
+    after_id: int = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str = None,
+    city: str = None,
+    status: str = None,
+    property_type: str = None,
+    agent: str = None,
+    agent_id: int = None,
+    min_price: float = None,
+    max_price: float = None,
+    format: str = "objects",
+):
+    check_format(format)
+    filters = {
+        "city": city, "status": status, "property_type": property_type, "agent": agent,
+        "agent_id": agent_id, "min_price": min_price, "max_price": max_price,
+    }
+    start = resolve_after_id(after_id, cursor, filters)
+
+    async def load():
+        where, filter_binds = property_filters(**filters)
+        sql, binds = page_query("""
+            SELECT p.property_id, u.username, p.title, p.city, p.locality, p.price, p.status
+            FROM properties p
+            LEFT JOIN agents a ON p.agent_id = a.agent_id
+            LEFT JOIN users u ON a.user_id = u.user_id""", "p.property_id", start, limit, where, filter_binds)
+        async with get_async_connection() as conn:
+            with conn.cursor() as cur:
+                await cur.execute(sql, binds)
+                rows = await cur.fetchall()
+
+        rows, next_cursor = split_page(rows, limit, filters)
+        if format == "columnar":
+            return columnar(PROPERTY_LIST_COLUMNS, rows, next_cursor=next_cursor)
+        properties = [dict(zip(PROPERTY_LIST_COLUMNS, r)) for r in rows]
+        return {"properties": properties, "next_cursor": next_cursor}
+
+    try:
+        key = cache_key("properties", after_id=start, limit=limit, format=format, **filters)
+        result = await response_cache.get_or_load_async(key, ["properties", "agents", "users"], load)
+        return json_bytes_response(result) if format == "columnar" else result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _find_agent_id(cursor, username):
+    await cursor.execute("""
+        SELECT a.agent_id FROM agents a
+        JOIN users u ON a.user_id = u.user_id
+        WHERE u.username = :1
+    """, [username])
+    agent = await cursor.fetchone()
+    if not agent:
+        raise HTTPException(status_code=404, detail="Agent not found.")
+    return agent[0]
+
+
+@router.post("/add_property")
+async def add_property(property_data: dict):
+    try:
+        async with get_async_connection() as conn:
+            with conn.cursor() as cursor:
+                agent_id = await _find_agent_id(cursor, property_data["agent_username"])
+                property_id = await property_ids.next_id_async(cursor)
+                await cursor.execute("""
+                    INSERT INTO properties (property_id, agent_id, title, description, city, locality, price, property_type, status)
+                    VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :9)
+                """, (
+                    property_id,
+                    agent_id,
+                    property_data["title"],
+                    property_data["description"],
+                    property_data["city"],
+                    property_data["locality"],
+                    property_data["price"],
+                    property_data["property_type"],
+                    property_data["status"]
+                ))
+
+            await conn.commit()
+        events.publish("properties", [property_id])
+        return {"message": f"✅ Property '{property_data['title']}' added successfully!"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/update_property_status/{property_id}")
+async def update_property_status(property_id: int, new_status: str):
+    try:
+        async with get_async_connection() as conn:
+            with conn.cursor() as cursor:
+                await cursor.execute("""
+                    UPDATE properties
+                    SET status = :1
+                    WHERE property_id = :2
+                """, [new_status, property_id])
+                await conn.commit()
+
+                if cursor.rowcount == 0:
+                    raise HTTPException(status_code=404, detail=f"Property ID {property_id} not found")
+
+        events.publish("properties", [property_id])
+        return {
+            "message": f"✅ Property {property_id} updated to '{new_status}'",
+            "trigger": "trg_property_status_log fired automatically"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/update_property/{property_id}")
+async def update_property(property_id: int, property_data: dict):
+    try:
+        async with get_async_connection() as conn:
+            with conn.cursor() as cursor:
+                agent_id = await _find_agent_id(cursor, property_data.get("agent_username"))
+                await cursor.execute("""
+                    UPDATE properties
+                    SET agent_id = :1,
+                        title = :2,
+                        description = :3,
+                        city = :4,
+                        locality = :5,
+                        price = :6,
+                        property_type = :7,
+                        status = :8
+                    WHERE property_id = :9
+                """, (
+                    agent_id,
+                    property_data.get("title"),
+                    property_data.get("description", ""),
+                    property_data.get("city"),
+                    property_data.get("locality", ""),
+                    property_data.get("price"),
+                    property_data.get("property_type"),
+                    property_data.get("status"),
+                    property_id
+                ))
+                if cursor.rowcount == 0:
+                    raise HTTPException(status_code=404, detail=f"Property ID {property_id} not found.")
+
+            await conn.commit()
+
+        events.publish("properties", [property_id])
+        logs.log("property_updated", property_id=property_id, agent_id=agent_id,
+                 fields=sorted(property_data))
+        return {"message": f"✅ Property {property_id} updated successfully!"}
+    except Exception as e:
+        logs.log("property_update_failed", "error", exc=e, property_id=property_id)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/delete_property/{property_id}")
+async def delete_property(property_id: int):
+    try:
+        async with get_async_connection() as conn:
+            with conn.cursor() as cursor:
+                await cursor.execute("DELETE FROM properties WHERE property_id = :1", [property_id])
+            await conn.commit()
+        events.publish("properties", [property_id])
+        return {"message": f"🗑️ Property ID {property_id} deleted successfully!"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,198 @@
+import csv
+import io
+import json
+import time
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from real_estate_backend import config, events
+from real_estate_backend.database import get_connection
+from real_estate_backend.ids import property_ids
+from real_estate_backend.models import StatusChange
+
+# ------------------------------------------------------------
+# BULK INGESTION
+# Feeds are resolved and inserted set-at-a-time: one lookup for all
+# agent usernames, then executemany() in BULK_BATCH_SIZE batches with
+# batcherrors so a bad row is reported instead of failing the batch.
+# Status changes are array-bound the same way but share one commit.
+# ------------------------------------------------------------
+router = APIRouter(prefix="/bulk")
+
+REQUIRED_FIELDS = ["agent_username", "title", "city", "price", "property_type", "status"]
+
+# Oracle caps IN-lists at 1000 expressions
+IN_LIST_LIMIT = 1000
+
+
+class _Malformed:
+    # Stands in for an NDJSON line that does not parse, so it is
+    # reported as a row error and the other rows keep their indexes
+    def __init__(self, error):
+        self.error = error
+
+
+def _parse_line(number, line):
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        return _Malformed(f"line {number}: invalid JSON: {e.msg}")
+
+
+def parse_records(body: bytes, content_type: str):
+    text = body.decode("utf-8-sig")
+    if "csv" in content_type:
+        return list(csv.DictReader(io.StringIO(text)))
+    if "ndjson" in content_type or "jsonl" in content_type:
+        return [_parse_line(n, line) for n, line in enumerate(text.splitlines(), 1) if line.strip()]
+    records = json.loads(text)
+    if not isinstance(records, list):
+        raise ValueError("expected a JSON array of properties")
+    return records
+
+
+def lookup_agent_ids(cursor, usernames):
+    agent_ids = {}
+    usernames = list(usernames)
+    for i in range(0, len(usernames), IN_LIST_LIMIT):
+        chunk = usernames[i:i + IN_LIST_LIMIT]
+        binds = {f"u{n}": name for n, name in enumerate(chunk)}
+        cursor.execute(f"""
+            SELECT u.username, a.agent_id FROM agents a
+            JOIN users u ON a.user_id = u.user_id
+            WHERE u.username IN ({", ".join(":" + k for k in binds)})
+        """, binds)
+        agent_ids.update(cursor.fetchall())
+    return agent_ids
+
+
+def _validate(record):
+    if isinstance(record, _Malformed):
+        return record.error
+    if not isinstance(record, dict):
+        return "row is not an object"
+    missing = [f for f in REQUIRED_FIELDS if record.get(f) in (None, "")]
+    if missing:
+        return f"missing fields: {', '.join(missing)}"
+    if not isinstance(record["agent_username"], str):
+        return f"invalid agent_username: {record['agent_username']!r}"
+    try:
+        float(record["price"])
+    except (TypeError, ValueError):
+        return f"invalid price: {record['price']!r}"
+    return None
+
+
+def ingest_properties(records):
+    start = time.perf_counter()
+    errors = []
+    valid = []
+    for index, record in enumerate(records):
+        problem = _validate(record)
+        if problem:
+            errors.append({"row": index, "error": problem})
+        else:
+            valid.append((index, record))
+
+    inserted_ids = []
+    with get_connection() as conn, conn.cursor() as cursor:
+        agent_ids = lookup_agent_ids(cursor, {r["agent_username"] for _, r in valid})
+
+        rows, row_index = [], []
+        for index, record in valid:
+            agent_id = agent_ids.get(record["agent_username"])
+            if agent_id is None:
+                errors.append({"row": index, "error": f"agent '{record['agent_username']}' not found"})
+                continue
+            rows.append((
+                agent_id,
+                record["title"],
+                record.get("description") or "",
+                record["city"],
+                record.get("locality") or "",
+                float(record["price"]),
+                record["property_type"],
+                record["status"],
+            ))
+            row_index.append(index)
+
+        for i in range(0, len(rows), config.BULK_BATCH_SIZE):
+            batch = rows[i:i + config.BULK_BATCH_SIZE]
+            new_ids = property_ids.reserve(cursor, len(batch))
+            batch = [(new_id,) + row for new_id, row in zip(new_ids, batch)]
+            cursor.executemany("""
+                INSERT INTO properties (property_id, agent_id, title, description, city, locality, price, property_type, status)
+                VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :9)
+            """, batch, batcherrors=True)
+            failed = cursor.getbatcherrors()
+            failed_offsets = {err.offset for err in failed}
+            for err in failed:
+                errors.append({"row": row_index[i + err.offset], "error": err.message})
+            inserted_ids += [row[0] for n, row in enumerate(batch) if n not in failed_offsets]
+            conn.commit()
+
+    if inserted_ids:
+        events.publish("properties", inserted_ids)
+
+    elapsed = time.perf_counter() - start
+    errors.sort(key=lambda e: e["row"])
+    return {
+        "received": len(records),
+        "inserted": len(inserted_ids),
+        "failed": len(errors),
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_sec": round(len(inserted_ids) / elapsed, 1) if elapsed else None,
+    }
+
+
+@router.post("/properties")
+async def bulk_properties(request: Request):
+    # Accepts a JSON array, NDJSON (application/x-ndjson) or CSV (text/csv) body
+    try:
+        records = parse_records(await request.body(), request.headers.get("content-type", ""))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse upload: {e}")
+
+    try:
+        return await run_in_threadpool(ingest_properties, records)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def apply_status_changes(changes):
+    # One transaction; trg_property_status_log still fires per row, so
+    # property_logs ends up exactly as with one call per property
+    start = time.perf_counter()
+    rows = [(c.new_status, c.property_id) for c in changes]
+    missing, updated = [], []
+    with get_connection() as conn, conn.cursor() as cursor:
+        for i in range(0, len(rows), config.BULK_BATCH_SIZE):
+            batch = rows[i:i + config.BULK_BATCH_SIZE]
+            cursor.executemany("""
+                UPDATE properties
+                SET status = :1
+                WHERE property_id = :2
+            """, batch, arraydmlrowcounts=True)
+            for (_, property_id), count in zip(batch, cursor.getarraydmlrowcounts()):
+                (updated if count else missing).append(property_id)
+        conn.commit()
+
+    if updated:
+        events.publish("properties", sorted(set(updated)))
+    return {
+        "received": len(rows),
+        "updated": len(updated),
+        "missing": sorted(set(missing)),
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+@router.post("/property_status")
+def bulk_property_status(changes: List[StatusChange]):
+    # Body: [{"property_id": 1, "new_status": "Sold"}, ...]
+    try:
+        return apply_status_changes(changes)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
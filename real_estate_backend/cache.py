@@ -0,0 +1,207 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from real_estate_backend import config, events
+
+# ------------------------------------------------------------
+# READ-THROUGH RESPONSE CACHE
+# Entries carry tags naming the data they were built from:
+#   "properties"      -> any row of the table (lists, searches)
+#   "properties:<id>" -> one row only (point lookups)
+# A change event for entity E with ids [..] drops every entry tagged
+# "E" plus the matching "E:<id>" entries; ids=None drops all "E:*".
+# ------------------------------------------------------------
+class CacheBackend:
+    # Interface for cache stores; a shared store (e.g. Redis) can
+    # implement the same five methods and be passed to ResponseCache.
+
+    def get(self, key):
+        # Returns (found, value)
+        raise NotImplementedError
+
+    def set(self, key, value, ttl, tags):
+        raise NotImplementedError
+
+    def invalidate_tags(self, tags, prefixes=()):
+        # Drops entries carrying any of `tags` or a tag starting with a prefix
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    # In-process LRU with per-entry TTL, bounded by entry count and bytes
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, expires_at, size, tags)
+        self._tags = defaultdict(set)  # tag -> keys
+        self._bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _drop(self, key):
+        value, expires_at, size, tags = self._entries.pop(key)
+        self._bytes -= size
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[1] < time.monotonic():
+                self._drop(key)
+                self.expirations += 1
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[0]
+
+    def set(self, key, value, ttl, tags):
+        size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, time.monotonic() + ttl, size, tuple(tags))
+            self._bytes += size
+            for tag in tags:
+                self._tags[tag].add(key)
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_tags(self, tags, prefixes=()):
+        with self._lock:
+            doomed = set()
+            for tag in tags:
+                doomed.update(self._tags.get(tag, ()))
+            for prefix in prefixes:
+                for tag, keys in self._tags.items():
+                    if tag.startswith(prefix):
+                        doomed.update(keys)
+            for key in doomed:
+                self._drop(key)
+            return len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class ResponseCache:
+    def __init__(self, backend, ttl, enabled=True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # Bumped on every invalidation; a load that overlapped a write
+        # is returned to its caller but never stored.
+        self._generation = defaultdict(int)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _tag_generations(self, tags):
+        with self._lock:
+            return [self._generation[t.split(":")[0]] for t in tags]
+
+    def _lookup(self, key):
+        found, value = self.backend.get(key)
+        with self._lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return found, value
+
+    def _store(self, key, tags, value, generations):
+        if self._tag_generations(tags) == generations:
+            self.backend.set(key, value, self.ttl, tags)
+
+    def get_or_load(self, key, tags, loader):
+        if not self.enabled:
+            return loader()
+        found, value = self._lookup(key)
+        if found:
+            return value
+        generations = self._tag_generations(tags)
+        value = loader()
+        self._store(key, tags, value, generations)
+        return value
+
+    async def get_or_load_async(self, key, tags, loader):
+        if not self.enabled:
+            return await loader()
+        found, value = self._lookup(key)
+        if found:
+            return value
+        generations = self._tag_generations(tags)
+        value = await loader()
+        self._store(key, tags, value, generations)
+        return value
+
+    def on_change(self, entity, ids):
+        with self._lock:
+            self._generation[entity] += 1
+        if ids is None:
+            dropped = self.backend.invalidate_tags([entity], prefixes=[f"{entity}:"])
+        else:
+            dropped = self.backend.invalidate_tags([entity] + [f"{entity}:{i}" for i in ids])
+        with self._lock:
+            self.invalidations += dropped
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+        total = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / total, 4) if total else 0.0
+        stats.update(self.backend.stats())
+        return stats
+
+
+def cache_key(name, **params):
+    return name + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
+
+
+response_cache = ResponseCache(
+    MemoryBackend(config.CACHE_MAX_ENTRIES, config.CACHE_MAX_BYTES),
+    ttl=config.CACHE_TTL_SECONDS,
+    enabled=config.CACHE_ENABLED,
+)
+for _entity in ("users", "agents", "properties"):
+    events.subscribe(_entity, response_cache.on_change)
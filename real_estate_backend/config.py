@@ -0,0 +1,223 @@
+import os
+
+# ------------------------------------------------------------
+# DATABASE SETTINGS
+# Every value can be overridden with an environment variable of
+# the same name, e.g. DB_POOL_MAX=32 uvicorn real_estate_backend.main:app
+# ------------------------------------------------------------
+DB_HOST = os.getenv("DB_HOST", "127.0.0.1")
+DB_PORT = int(os.getenv("DB_PORT", "1521"))
+DB_SERVICE = os.getenv("DB_SERVICE", "XE")
+DB_USER = os.getenv("DB_USER", "system")
+DB_PASSWORD = os.getenv("DB_PASSWORD", "ks123")
+
+# ------------------------------------------------------------
+# CONNECTION POOL SETTINGS
+# ------------------------------------------------------------
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "2"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_INCREMENT = int(os.getenv("DB_POOL_INCREMENT", "1"))
+# How long a request waits for a free connection before failing (ms)
+DB_POOL_WAIT_TIMEOUT_MS = int(os.getenv("DB_POOL_WAIT_TIMEOUT_MS", "5000"))
+# Idle sessions are pinged before reuse when older than this (seconds)
+DB_POOL_PING_INTERVAL = int(os.getenv("DB_POOL_PING_INTERVAL", "60"))
+# Idle sessions above DB_POOL_MIN are closed after this long (seconds)
+DB_POOL_IDLE_TIMEOUT = int(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))
+DB_STMT_CACHE_SIZE = int(os.getenv("DB_STMT_CACHE_SIZE", "50"))
+
+# ------------------------------------------------------------
+# DATA ENGINE
+# "sync"  -> plain def handlers on FastAPI's threadpool (default)
+# "async" -> async def handlers on python-oracledb's asyncio pool
+# ------------------------------------------------------------
+DB_ENGINE = os.getenv("DB_ENGINE", "sync").lower()
+
+# ------------------------------------------------------------
+# BULK EXPORT
+# Rows fetched per round trip while streaming /export/* responses
+# ------------------------------------------------------------
+EXPORT_ARRAYSIZE = int(os.getenv("EXPORT_ARRAYSIZE", "1000"))
+
+# ------------------------------------------------------------
+# BULK INGESTION
+# Rows sent per executemany() round trip on /bulk/* endpoints
+# ------------------------------------------------------------
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+
+# ------------------------------------------------------------
+# ID ALLOCATION
+# Must equal the INCREMENT BY of users_seq / agents_seq /
+# properties_seq in real_estate_db.sql: each NEXTVAL reserves a block
+# of this many ids that the process hands out without further queries.
+# ------------------------------------------------------------
+ID_BLOCK_SIZE = int(os.getenv("ID_BLOCK_SIZE", "50"))
+
+# ------------------------------------------------------------
+# ADMISSION CONTROL
+# At most ADMISSION_MAX_CONCURRENT requests run against the database
+# at once (default: the pool size, so admitted requests never queue
+# inside pool.acquire()). Routes in ADMISSION_ROUTE_LIMITS
+# ("/route=N,...") are capped lower. Up to ADMISSION_QUEUE_SIZE more
+# wait, each at most ADMISSION_MAX_WAIT_MS; the rest get 503 with
+# Retry-After: ADMISSION_RETRY_AFTER_SECONDS.
+# ------------------------------------------------------------
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "1") == "1"
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", str(DB_POOL_MAX)))
+ADMISSION_ROUTE_LIMITS = os.getenv(
+    "ADMISSION_ROUTE_LIMITS", "/agents/stats=2,/export/properties=2,/export/users=2"
+)
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "100"))
+ADMISSION_MAX_WAIT_MS = float(os.getenv("ADMISSION_MAX_WAIT_MS", "2000"))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+
+# ------------------------------------------------------------
+# RESPONSE CACHE
+# ------------------------------------------------------------
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "1") == "1"
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# ------------------------------------------------------------
+# IN-MEMORY SEARCH INDEXES
+# How often a search re-checks property_logs for status changes
+# made outside this process (seconds). log_ids skipped by the tail are
+# re-read for LOG_GAP_GRACE_SECONDS in case their rows commit late (a
+# load looks LOG_GAP_SCAN_IDS ids back for them); the /analytics
+# snapshot tails property_logs the same way.
+# ------------------------------------------------------------
+SEARCH_LOG_POLL_SECONDS = float(os.getenv("SEARCH_LOG_POLL_SECONDS", "2"))
+LOG_GAP_GRACE_SECONDS = float(os.getenv("LOG_GAP_GRACE_SECONDS", "300"))
+LOG_GAP_SCAN_IDS = int(os.getenv("LOG_GAP_SCAN_IDS", "10000"))
+# Where the full-text index is snapshotted for fast restarts
+FULLTEXT_SNAPSHOT_PATH = os.getenv("FULLTEXT_SNAPSHOT_PATH", "fulltext_index.json.gz")
+
+# ------------------------------------------------------------
+# METRICS
+# Per-route and per-statement timings served at GET /metrics.
+# Statements slower than SLOW_QUERY_MS are logged with their binds;
+# the last SLOW_QUERY_LOG_SIZE of them are kept for /metrics/slow_queries.
+# ------------------------------------------------------------
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "100"))
+
+# ------------------------------------------------------------
+# LOGGING
+# Structured JSON events written by a background thread. Events
+# below "warning" are kept with probability LOG_SAMPLE_RATE; the
+# queue holds LOG_QUEUE_SIZE events and drops (and counts) overflow.
+# LOG_FILE empty -> stderr, keeping stdout for program output.
+# ------------------------------------------------------------
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info").lower()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.1"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "500"))
+LOG_FLUSH_SECONDS = float(os.getenv("LOG_FLUSH_SECONDS", "0.5"))
+LOG_FILE = os.getenv("LOG_FILE", "")
+
+# ------------------------------------------------------------
+# CONDITIONAL GET
+# How often listing ETags re-read the shared change counters in
+# replica_changes / property_logs (seconds; a write in this process
+# forces the next request to re-read). Rows committed up to
+# VERSION_LATE_IDS ids behind the newest one still change the tag.
+# ------------------------------------------------------------
+VERSION_POLL_SECONDS = float(os.getenv("VERSION_POLL_SECONDS", "2"))
+VERSION_LATE_IDS = int(os.getenv("VERSION_LATE_IDS", "1000"))
+
+# ------------------------------------------------------------
+# BACKGROUND JOBS
+# Worker threads for /jobs, and rows deleted per committed chunk by
+# the delete_user / delete_agent cascades. A running job's owner renews
+# its lease every JOB_LEASE_SECONDS / 4; a job whose lease has run out
+# is taken over by another process.
+# ------------------------------------------------------------
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", "1000"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "120"))
+
+# ------------------------------------------------------------
+# DATALOADER
+# Point lookups (/check_property, /calc_total_sales,
+# /get_total_commission) wait up to LOADER_WINDOW_MS for other keys
+# and are fetched together, at most LOADER_MAX_BATCH keys per query
+# ------------------------------------------------------------
+LOADER_WINDOW_MS = float(os.getenv("LOADER_WINDOW_MS", "2"))
+LOADER_MAX_BATCH = int(os.getenv("LOADER_MAX_BATCH", "500"))
+
+# ------------------------------------------------------------
+# CHANGE STREAM (/stream/properties)
+# One poller tails property_logs every STREAM_POLL_SECONDS (sooner
+# when this process commits a change). Each client gets a queue of
+# STREAM_CLIENT_QUEUE events; a client that falls that far behind is
+# disconnected and resumes from its Last-Event-ID. Resumes further
+# back than STREAM_BACKFILL_LIMIT log rows get a "reset" instead.
+# A missing log_id holds the stream for up to STREAM_GAP_HOLD_SECONDS
+# in case its row is still committing; after that it is skipped.
+# ------------------------------------------------------------
+STREAM_POLL_SECONDS = float(os.getenv("STREAM_POLL_SECONDS", "1"))
+STREAM_CLIENT_QUEUE = int(os.getenv("STREAM_CLIENT_QUEUE", "256"))
+STREAM_BACKFILL_LIMIT = int(os.getenv("STREAM_BACKFILL_LIMIT", "1000"))
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+STREAM_GAP_HOLD_SECONDS = float(os.getenv("STREAM_GAP_HOLD_SECONDS", "5"))
+
+# ------------------------------------------------------------
+# MARKET ANALYTICS
+# How often the /analytics snapshot re-checks property_logs for
+# status changes made outside this process (seconds)
+# ------------------------------------------------------------
+ANALYTICS_LOG_POLL_SECONDS = float(os.getenv("ANALYTICS_LOG_POLL_SECONDS", "2"))
+
+# ------------------------------------------------------------
+# PROPERTY LOG HISTORY
+# property_logs rows older than HISTORY_RETENTION_DAYS are moved by
+# the archive job into gzip NDJSON files of HISTORY_ARCHIVE_CHUNK_ROWS
+# rows (the last one may be shorter) under HISTORY_ARCHIVE_DIR. The
+# last HISTORY_ARCHIVE_CACHE_CHUNKS decoded files stay in memory for
+# history reads.
+# ------------------------------------------------------------
+HISTORY_RETENTION_DAYS = float(os.getenv("HISTORY_RETENTION_DAYS", "90"))
+HISTORY_ARCHIVE_DIR = os.getenv("HISTORY_ARCHIVE_DIR", "property_log_archive")
+HISTORY_ARCHIVE_CHUNK_ROWS = int(os.getenv("HISTORY_ARCHIVE_CHUNK_ROWS", "100000"))
+HISTORY_ARCHIVE_CACHE_CHUNKS = int(os.getenv("HISTORY_ARCHIVE_CACHE_CHUNKS", "8"))
+
+# ------------------------------------------------------------
+# READ REPLICA
+# With REPLICA_PATH set, users / agents / properties are copied into
+# an embedded SQLite file there and kept current by tailing
+# replica_changes and property_logs every REPLICA_POLL_SECONDS
+# (REPLICA_BATCH_ROWS per round trip). GET endpoints read the copy
+# while its lag is within REPLICA_MAX_LAG_SECONDS and fall back to the
+# primary beyond that; writes always go to the primary.
+# Log ids are not commit-ordered (sequence caching, long transactions),
+# so ids skipped below the marks are re-read for REPLICA_GAP_GRACE_SECONDS
+# (bootstrap looks REPLICA_GAP_SCAN_IDS ids back for them), and every
+# REPLICA_RECONCILE_SECONDS the copy is compared row by row against
+# ORA_HASH values from the primary (0 disables).
+# Every REPLICA_PROGRESS_SECONDS a replica records in replica_progress
+# (as REPLICA_ID, default host:path) the change_id it has applied; the
+# prune_replica_changes job keeps replica_changes rows from the lowest
+# of those minus the late-id window. A replica silent for
+# REPLICA_PROGRESS_STALE_DAYS stops holding rows back and copies
+# everything again when it returns.
+# ------------------------------------------------------------
+REPLICA_PATH = os.getenv("REPLICA_PATH", "")
+REPLICA_POOL_SIZE = int(os.getenv("REPLICA_POOL_SIZE", "8"))
+REPLICA_POLL_SECONDS = float(os.getenv("REPLICA_POLL_SECONDS", "1"))
+REPLICA_BATCH_ROWS = int(os.getenv("REPLICA_BATCH_ROWS", "5000"))
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "30"))
+REPLICA_GAP_GRACE_SECONDS = float(os.getenv("REPLICA_GAP_GRACE_SECONDS", "300"))
+REPLICA_GAP_SCAN_IDS = int(os.getenv("REPLICA_GAP_SCAN_IDS", "10000"))
+REPLICA_RECONCILE_SECONDS = float(os.getenv("REPLICA_RECONCILE_SECONDS", "3600"))
+REPLICA_ID = os.getenv("REPLICA_ID", "")
+REPLICA_PROGRESS_SECONDS = float(os.getenv("REPLICA_PROGRESS_SECONDS", "60"))
+REPLICA_PROGRESS_STALE_DAYS = float(os.getenv("REPLICA_PROGRESS_STALE_DAYS", "7"))
+
+# ------------------------------------------------------------
+# SCHEMA MIGRATIONS / QUERY PLAN CHECK
+# `python -m real_estate_backend.migrations check` fails when an API
+# query plans a full scan of a table holding at least this many rows
+# (Oracle: user_tables.num_rows; tables without statistics count as large)
+# ------------------------------------------------------------
+PLAN_CHECK_MIN_ROWS = int(os.getenv("PLAN_CHECK_MIN_ROWS", "10000"))
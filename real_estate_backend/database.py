@@ -1,14 +1,178 @@
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
 import oracledb
+from real_estate_backend import config, logs, metrics
+
+# ------------------------------------------------------------
+# CONNECTION POOL
+# One pool per process, created on app startup (see lifespan in
+# main.py) and closed on shutdown. Handlers borrow a session with
+# `with get_connection() as conn:` and it always goes back to the pool.
+# The asyncio engine gets its own pool with the same settings.
+# ------------------------------------------------------------
+_pool = None
+_async_pool = None
+_pool_lock = threading.Lock()
+_stats_lock = threading.Lock()
+
+
+def _new_stats():
+    return {
+        "acquired": 0,
+        "acquire_errors": 0,
+        "wait_time_total_ms": 0.0,
+        "wait_time_max_ms": 0.0,
+    }
+
+
+_stats = {"sync": _new_stats(), "async": _new_stats()}
+
+
+def _pool_params():
+    return dict(
+        user=config.DB_USER,
+        password=config.DB_PASSWORD,
+        dsn=oracledb.makedsn(config.DB_HOST, config.DB_PORT, service_name=config.DB_SERVICE),
+        min=config.DB_POOL_MIN,
+        max=config.DB_POOL_MAX,
+        increment=config.DB_POOL_INCREMENT,
+        getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+        wait_timeout=config.DB_POOL_WAIT_TIMEOUT_MS,
+        ping_interval=config.DB_POOL_PING_INTERVAL,
+        timeout=config.DB_POOL_IDLE_TIMEOUT,
+        stmtcachesize=config.DB_STMT_CACHE_SIZE,
+    )
+
+
+def _record_acquire(engine, start):
+    waited = time.perf_counter() - start
+    metrics.record_pool_wait(engine, waited)
+    waited_ms = waited * 1000
+    with _stats_lock:
+        stats = _stats[engine]
+        stats["acquired"] += 1
+        stats["wait_time_total_ms"] += waited_ms
+        stats["wait_time_max_ms"] = max(stats["wait_time_max_ms"], waited_ms)
+
+
+def _record_acquire_error(engine):
+    with _stats_lock:
+        _stats[engine]["acquire_errors"] += 1
+
+
+def init_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            return _pool
+        try:
+            _pool = oracledb.create_pool(**_pool_params())
+            return _pool
+        except oracledb.DatabaseError as e:
+            logs.log("db_pool_create_failed", "error", exc=e, engine="sync")
+            raise
+
+
+def install_pool(pool):
+    # Serve get_connection() from an existing oracledb-compatible pool
+    # (e.g. the SQLite stand-in used by the benchmarks)
+    global _pool
+    with _pool_lock:
+        _pool = pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close(force=True)
+            _pool = None
 
+
+@contextmanager
 def get_connection():
+    pool = _pool or init_pool()
+    start = time.perf_counter()
     try:
-        dsn = oracledb.makedsn("127.0.0.1", 1521, service_name="XE")
-        conn = oracledb.connect(
-            user="system",
-            password="ks123",  # ✅ correct password only
-            dsn=dsn
-        )
-        return conn
-    except oracledb.DatabaseError as e:
-        print("❌ Database connection error:", e)
+        conn = pool.acquire()
+    except oracledb.DatabaseError:
+        _record_acquire_error("sync")
         raise
+    _record_acquire("sync", start)
+
+    try:
+        yield metrics.InstrumentedConnection(conn) if config.METRICS_ENABLED else conn
+    except BaseException:
+        # Never hand a session with an open transaction back to the pool
+        try:
+            conn.rollback()
+        except oracledb.Error:
+            pass
+        raise
+    finally:
+        pool.release(conn)
+
+
+# ------------------------------------------------------------
+# ASYNCIO POOL (DB_ENGINE=async)
+# ------------------------------------------------------------
+def init_async_pool():
+    global _async_pool
+    if _async_pool is None:
+        try:
+            _async_pool = oracledb.create_pool_async(**_pool_params())
+        except oracledb.DatabaseError as e:
+            logs.log("db_pool_create_failed", "error", exc=e, engine="async")
+            raise
+    return _async_pool
+
+
+async def close_async_pool():
+    global _async_pool
+    if _async_pool is not None:
+        pool, _async_pool = _async_pool, None
+        await pool.close(force=True)
+
+
+@asynccontextmanager
+async def get_async_connection():
+    pool = _async_pool or init_async_pool()
+    start = time.perf_counter()
+    try:
+        conn = await pool.acquire()
+    except oracledb.DatabaseError:
+        _record_acquire_error("async")
+        raise
+    _record_acquire("async", start)
+
+    try:
+        yield metrics.AsyncInstrumentedConnection(conn) if config.METRICS_ENABLED else conn
+    except BaseException:
+        try:
+            await conn.rollback()
+        except oracledb.Error:
+            pass
+        raise
+    finally:
+        await pool.release(conn)
+
+
+# ------------------------------------------------------------
+# POOL STATS
+# ------------------------------------------------------------
+def pool_stats(engine=None):
+    engine = engine or config.DB_ENGINE
+    pool = _async_pool if engine == "async" else _pool
+    with _stats_lock:
+        stats = dict(_stats[engine])
+    stats["engine"] = engine
+    stats["avg_wait_time_ms"] = (
+        stats["wait_time_total_ms"] / stats["acquired"] if stats["acquired"] else 0.0
+    )
+    if pool is None:
+        stats.update({"open": 0, "busy": 0, "min": config.DB_POOL_MIN, "max": config.DB_POOL_MAX})
+    else:
+        stats.update({"open": pool.opened, "busy": pool.busy, "min": pool.min, "max": pool.max})
+    return stats
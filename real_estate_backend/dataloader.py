@@ -0,0 +1,242 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+
+from real_estate_backend import config, events
+from real_estate_backend.database import get_async_connection
+from real_estate_backend.metrics import LOADER_BATCH_SIZE, LOADER_COALESCED
+from real_estate_backend.replica import read_connection
+from real_estate_backend.search import fetch_by_ids, in_list_chunks
+
+# ------------------------------------------------------------
+# DATALOADER (request coalescing for point lookups)
+# A lookup for a key that is already in flight waits for that result
+# instead of issuing its own query (single-flight). Distinct keys
+# requested within LOADER_WINDOW_MS of each other are fetched by one
+# `WHERE key IN (...)` query, dispatched early once LOADER_MAX_BATCH
+# keys are waiting. The window is only worth waiting when other
+# lookups are under way: a caller with none runs its query at once.
+#   sync engine  -> the first caller of a batch sleeps out the window
+#                   and runs the query; the others block on a Future
+#   async engine -> a loop timer flushes the batch into a task (on the
+#                   next loop iteration when nothing else is loading)
+# A change event drops the affected keys from the in-flight table so
+# lookups made after a commit never join a query started before it.
+# ------------------------------------------------------------
+
+
+class DataLoader:
+    def __init__(self, name, load_many, load_many_async, default=None):
+        # load_many(keys) -> {key: value}; missing keys resolve to `default`
+        self.name = name
+        self.load_many = load_many
+        self.load_many_async = load_many_async
+        self.default = default
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> Future
+        self._pending = []
+        self._callers = 0  # load() / load_async() calls under way
+        self._ainflight = {}  # key -> asyncio.Future
+        self._apending = []
+        self._atimer = None
+        self._atasks = set()
+        self._stats = {"loads": 0, "coalesced": 0, "batches": 0, "keys": 0, "max_batch": 0}
+
+    # ---------- sync engine ----------
+    def load(self, key):
+        with self._lock:
+            self._stats["loads"] += 1
+            self._callers += 1
+            future = self._inflight.get(key)
+            joined = future is not None
+            if joined:
+                self._stats["coalesced"] += 1
+                leader = full = False
+            else:
+                future = self._inflight[key] = Future()
+                self._pending.append((key, future))
+                leader = len(self._pending) == 1
+                full = len(self._pending) >= config.LOADER_MAX_BATCH
+            alone = self._callers == 1
+        try:
+            if joined:
+                LOADER_COALESCED.inc(1, self.name)
+            if full:
+                self._dispatch(self._take())
+            elif leader:
+                if config.LOADER_WINDOW_MS > 0 and not alone:
+                    time.sleep(config.LOADER_WINDOW_MS / 1000)
+                self._dispatch(self._take())
+            return future.result()
+        finally:
+            with self._lock:
+                self._callers -= 1
+
+    def _take(self):
+        with self._lock:
+            batch = self._pending[:config.LOADER_MAX_BATCH]
+            del self._pending[:len(batch)]
+            return batch
+
+    def _dispatch(self, batch):
+        # Another caller may already have taken this batch (it filled up)
+        if not batch:
+            return
+        keys = [k for k, _ in batch]
+        self._observe(len(keys))
+        try:
+            found = self.load_many(keys)
+        except Exception as e:
+            self._settle(batch, error=e)
+        else:
+            self._settle(batch, found=found)
+
+    def _settle(self, batch, found=None, error=None):
+        with self._lock:
+            for key, future in batch:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+        for key, future in batch:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(found.get(key, self.default))
+
+    # ---------- async engine ----------
+    async def load_async(self, key):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._stats["loads"] += 1
+            self._callers += 1
+            future = self._ainflight.get(key)
+            joined = future is not None
+            if joined:
+                self._stats["coalesced"] += 1
+            else:
+                future = self._ainflight[key] = loop.create_future()
+            alone = self._callers == 1
+        try:
+            if joined:
+                LOADER_COALESCED.inc(1, self.name)
+            else:
+                self._apending.append((key, future))
+                if len(self._apending) >= config.LOADER_MAX_BATCH:
+                    self._aflush()
+                elif len(self._apending) == 1:
+                    # Lookups started in this same loop iteration still join
+                    delay = 0 if alone else config.LOADER_WINDOW_MS / 1000
+                    self._atimer = loop.call_later(delay, self._aflush)
+            # shield: one cancelled request must not cancel the others' result
+            return await asyncio.shield(future)
+        finally:
+            with self._lock:
+                self._callers -= 1
+
+    def _aflush(self):
+        if self._atimer is not None:
+            self._atimer.cancel()
+            self._atimer = None
+        batch = self._apending[:config.LOADER_MAX_BATCH]
+        del self._apending[:len(batch)]
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._arun(batch))
+        self._atasks.add(task)
+        task.add_done_callback(self._atasks.discard)
+        if self._apending:
+            self._atimer = asyncio.get_running_loop().call_later(
+                config.LOADER_WINDOW_MS / 1000, self._aflush
+            )
+
+    async def _arun(self, batch):
+        self._observe(len(batch))
+        try:
+            found = await self.load_many_async([k for k, _ in batch])
+        except Exception as e:
+            found, error = None, e
+        else:
+            error = None
+        with self._lock:
+            for key, future in batch:
+                if self._ainflight.get(key) is future:
+                    del self._ainflight[key]
+        for key, future in batch:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(found.get(key, self.default))
+
+    # ---------- invalidation / stats ----------
+    def forget(self, keys=None):
+        # Later lookups of these keys start a fresh query; current waiters
+        # still receive the in-flight result
+        with self._lock:
+            for table in (self._inflight, self._ainflight):
+                if keys is None:
+                    table.clear()
+                else:
+                    for key in keys:
+                        table.pop(key, None)
+
+    def _observe(self, size):
+        LOADER_BATCH_SIZE.observe(size, self.name)
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["keys"] += size
+            self._stats["max_batch"] = max(self._stats["max_batch"], size)
+
+    def stats(self):
+        with self._lock:
+            data = dict(self._stats)
+        data["avg_batch"] = round(data["keys"] / data["batches"], 2) if data["batches"] else 0.0
+        return data
+
+
+# ------------------------------------------------------------
+# LOADERS
+# ------------------------------------------------------------
+PRICE_SQL = "SELECT property_id, price FROM properties"
+# Same source as calc_total_sales / get_total_commission in the schema
+SALES_SQL = "SELECT agent_id, total_sales FROM agent_sales_summary"
+# The one commission rate in Python; keep in step with get_total_commission
+COMMISSION_RATE = 0.05
+
+
+def _sync_loader(select_sql, column):
+    def load_many(keys):
+        with read_connection() as conn, conn.cursor() as cursor:
+            return dict(fetch_by_ids(cursor, select_sql, keys, column))
+    return load_many
+
+
+def _async_loader(select_sql, column):
+    async def load_many(keys):
+        found = {}
+        async with get_async_connection() as conn:
+            with conn.cursor() as cursor:
+                for sql, binds in in_list_chunks(select_sql, keys, column):
+                    await cursor.execute(sql, binds)
+                    found.update(await cursor.fetchall())
+        return found
+    return load_many
+
+
+property_prices = DataLoader(
+    "property_prices", _sync_loader(PRICE_SQL, "property_id"), _async_loader(PRICE_SQL, "property_id")
+)
+# Agents without a sold property have no summary row: 0, as in the procedure
+agent_sales = DataLoader(
+    "agent_sales", _sync_loader(SALES_SQL, "agent_id"), _async_loader(SALES_SQL, "agent_id"), default=0
+)
+
+events.subscribe("properties", lambda entity, ids: property_prices.forget(ids))
+# Any property change can move an agent's total, and the ids are property ids
+events.subscribe("properties", lambda entity, ids: agent_sales.forget())
+events.subscribe("agents", lambda entity, ids: agent_sales.forget(ids))
+
+
+def stats():
+    return {loader.name: loader.stats() for loader in (property_prices, agent_sales)}
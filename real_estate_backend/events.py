@@ -0,0 +1,22 @@
+from collections import defaultdict
+
+# ------------------------------------------------------------
+# CHANGE EVENTS
+# Mutating endpoints call publish() after they commit. Subscribers
+# (cache invalidation, indexes, ...) react to "entity changed" events.
+#   entity: "users" | "agents" | "properties"
+#   ids:    the affected primary keys, or None when unknown (e.g. a
+#           cascade), which subscribers must treat as "any row".
+# ------------------------------------------------------------
+_subscribers = defaultdict(list)
+
+
+def subscribe(entity, callback):
+    _subscribers[entity].append(callback)
+
+
+def publish(entity, ids=None):
+    if ids is not None:
+        ids = list(ids)
+    for callback in list(_subscribers[entity]):
+        callback(entity, ids)
@@ -0,0 +1,117 @@
+import csv
+import io
+import json
+import zlib
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from real_estate_backend import config
+from real_estate_backend.replica import read_connection
+
+# ------------------------------------------------------------
+# STREAMING BULK EXPORT
+# Rows are pulled with fetchmany() in EXPORT_ARRAYSIZE batches and
+# written straight to the response, so memory stays flat no matter
+# how many rows the table holds.
+# ------------------------------------------------------------
+router = APIRouter(prefix="/export")
+
+PROPERTY_COLUMNS = {
+    "property_id": "p.property_id",
+    "agent": "u.username",
+    "title": "p.title",
+    "description": "p.description",
+    "city": "p.city",
+    "locality": "p.locality",
+    "price": "p.price",
+    "property_type": "p.property_type",
+    "status": "p.status",
+}
+PROPERTY_FROM = """
+    FROM properties p
+    LEFT JOIN agents a ON p.agent_id = a.agent_id
+    LEFT JOIN users u ON a.user_id = u.user_id
+    ORDER BY p.property_id
+"""
+
+USER_COLUMNS = {
+    "user_id": "user_id",
+    "username": "username",
+    "full_name": "full_name",
+    "email": "email",
+    "phone": "phone",
+    "role": "role",
+    "created_at": "created_at",
+}
+USER_FROM = """
+    FROM users
+    ORDER BY user_id
+"""
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _pick_columns(available, columns):
+    if not columns:
+        return list(available)
+    picked = [c.strip() for c in columns.split(",") if c.strip()]
+    unknown = [c for c in picked if c not in available]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(unknown)}")
+    return picked
+
+
+def _encode_batch(rows, names, fmt):
+    if fmt == "ndjson":
+        return "".join(
+            json.dumps(dict(zip(names, r)), default=str) + "\n" for r in rows
+        ).encode()
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue().encode()
+
+
+def _stream_rows(sql, names, fmt, compress):
+    gz = zlib.compressobj(wbits=31) if compress else None
+
+    def emit(chunk):
+        return gz.compress(chunk) if gz else chunk
+
+    with read_connection() as conn, conn.cursor() as cursor:
+        cursor.arraysize = config.EXPORT_ARRAYSIZE
+        cursor.prefetchrows = config.EXPORT_ARRAYSIZE + 1
+        cursor.execute(sql)
+        if fmt == "csv":
+            yield emit(_encode_batch([names], names, fmt))
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+            yield emit(_encode_batch(rows, names, fmt))
+    if gz:
+        yield gz.flush()
+
+
+def _export(name, available, from_sql, fmt, columns, gzip):
+    if fmt not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+    names = _pick_columns(available, columns)
+    sql = "SELECT " + ", ".join(available[c] for c in names) + from_sql
+
+    filename = f"{name}.{fmt}" + (".gz" if gzip else "")
+    media_type = "application/gzip" if gzip else MEDIA_TYPES[fmt]
+    return StreamingResponse(
+        _stream_rows(sql, names, fmt, gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/properties")
+def export_properties(format: str = "ndjson", columns: str = None, gzip: bool = False):
+    return _export("properties", PROPERTY_COLUMNS, PROPERTY_FROM, format, columns, gzip)
+
+
+@router.get("/users")
+def export_users(format: str = "ndjson", columns: str = None, gzip: bool = False):
+    return _export("users", USER_COLUMNS, USER_FROM, format, columns, gzip)
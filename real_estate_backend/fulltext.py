@@ -0,0 +1,243 @@
+import bisect
+import gzip
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from fastapi import APIRouter, HTTPException, Query
+from real_estate_backend import config, events
+from real_estate_backend.database import get_connection
+from real_estate_backend.search import fetch_by_ids
+
+# ------------------------------------------------------------
+# FULL-TEXT SEARCH over properties.title + properties.description
+# Inverted index (term -> {property_id: weighted tf}) ranked with
+# BM25. Title terms count TITLE_BOOST times. The last query word may
+# be matched as a prefix through a sorted vocabulary. Each document
+# keeps ORA_HASH(title|description), so a restart from a snapshot only
+# re-reads rows whose text actually changed.
+# ------------------------------------------------------------
+router = APIRouter(prefix="/search")
+
+K1 = 1.2
+B = 0.75
+TITLE_BOOST = 2
+MAX_PREFIX_EXPANSIONS = 50
+STOPWORDS = {"a", "an", "and", "the", "of", "in", "on", "at", "for", "with", "to", "is", "by"}
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+DOC_SQL = """
+    SELECT property_id, title, description,
+           ORA_HASH(title || '|' || description) AS text_hash
+    FROM properties
+"""
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+def _term_counts(title, description):
+    counts = Counter()
+    for term in tokenize(title):
+        counts[term] += TITLE_BOOST
+    counts.update(tokenize(description))
+    return counts
+
+
+class TextIndex:
+    def __init__(self, snapshot_path=None):
+        self.snapshot_path = snapshot_path
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        self.postings = defaultdict(dict)  # term -> {pid: tf}
+        self.vocab = []                    # sorted terms, for prefix lookups
+        self.docs = {}                     # pid -> {"title", "hash", "tf", "len"}
+        self.total_len = 0
+        self.loaded = False
+        self.snapshot_checked = False
+        self.needs_reload = True
+        self.dirty = set()
+
+    # ---------- maintenance ----------
+    def _remove(self, pid):
+        doc = self.docs.pop(pid, None)
+        if doc is None:
+            return
+        self.total_len -= doc["len"]
+        for term in doc["tf"]:
+            plist = self.postings[term]
+            plist.pop(pid, None)
+            if not plist:
+                del self.postings[term]
+                i = bisect.bisect_left(self.vocab, term)
+                if i < len(self.vocab) and self.vocab[i] == term:
+                    del self.vocab[i]
+
+    def _add(self, pid, title, text_hash, tf):
+        self._remove(pid)
+        length = sum(tf.values())
+        self.docs[pid] = {"title": title, "hash": text_hash, "tf": tf, "len": length}
+        self.total_len += length
+        for term, count in tf.items():
+            if term not in self.postings:
+                bisect.insort(self.vocab, term)
+            self.postings[term][pid] = count
+
+    def index_row(self, pid, title, description, text_hash):
+        with self._lock:
+            self._add(pid, title, text_hash, dict(_term_counts(title, description)))
+
+    def on_change(self, entity, ids):
+        with self._lock:
+            if ids is None:
+                self.needs_reload = True
+            else:
+                self.dirty.update(ids)
+
+    # ---------- syncing with Oracle ----------
+    def _reconcile(self, cursor):
+        # Compare stored hashes with Oracle's and re-read only what changed
+        cursor.arraysize = 5000
+        cursor.execute("SELECT property_id, ORA_HASH(title || '|' || description) FROM properties")
+        current = dict(cursor.fetchall())
+        with self._lock:
+            for pid in [p for p in self.docs if p not in current]:
+                self._remove(pid)
+            stale = [p for p, h in current.items()
+                     if p not in self.docs or self.docs[p]["hash"] != h]
+        for row in fetch_by_ids(cursor, DOC_SQL, stale):
+            self.index_row(*row)
+        with self._lock:
+            self.needs_reload = False
+            self.loaded = True
+        return len(stale)
+
+    def _refresh_dirty(self, cursor):
+        with self._lock:
+            dirty, self.dirty = list(self.dirty), set()
+        rows = fetch_by_ids(cursor, DOC_SQL, dirty)
+        found = {r[0] for r in rows}
+        for row in rows:
+            self.index_row(*row)
+        with self._lock:
+            for pid in dirty:
+                if pid not in found:
+                    self._remove(pid)
+
+    def sync(self):
+        with self._lock:
+            if not self.snapshot_checked:
+                self.snapshot_checked = True
+                self.load_snapshot()
+            reload_needed = self.needs_reload or not self.loaded
+            has_dirty = bool(self.dirty)
+        if not (reload_needed or has_dirty):
+            return
+        with self._sync_lock, get_connection() as conn, conn.cursor() as cursor:
+            if reload_needed:
+                self._reconcile(cursor)
+            elif has_dirty:
+                self._refresh_dirty(cursor)
+
+    # ---------- snapshots ----------
+    def save_snapshot(self, path=None):
+        path = path or self.snapshot_path
+        with self._lock:
+            if not self.loaded:
+                return False
+            data = {
+                "version": 1,
+                "docs": {str(pid): [d["title"], d["hash"], d["tf"]] for pid, d in self.docs.items()},
+            }
+        tmp = path + ".tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+        return True
+
+    def load_snapshot(self, path=None):
+        # Documents come back marked for reconciliation, not trusted as-is
+        path = path or self.snapshot_path
+        if not path or not os.path.exists(path):
+            return False
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        with self._lock:
+            for pid, (title, text_hash, tf) in data["docs"].items():
+                self._add(int(pid), title, text_hash, tf)
+            self.needs_reload = True
+        return True
+
+    # ---------- querying ----------
+    def _expand(self, term):
+        i = bisect.bisect_left(self.vocab, term)
+        out = []
+        while i < len(self.vocab) and self.vocab[i].startswith(term) and len(out) < MAX_PREFIX_EXPANSIONS:
+            out.append(self.vocab[i])
+            i += 1
+        return out
+
+    def search(self, query, k=10, prefix=True):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with self._lock:
+            n_docs = len(self.docs)
+            if not n_docs:
+                return []
+            avg_len = self.total_len / n_docs
+            scores = defaultdict(float)
+            for position, term in enumerate(terms):
+                is_last = position == len(terms) - 1
+                candidates = self._expand(term) if prefix and is_last else [term]
+                for cand in candidates:
+                    plist = self.postings.get(cand)
+                    if not plist:
+                        continue
+                    idf = math.log(1 + (n_docs - len(plist) + 0.5) / (len(plist) + 0.5))
+                    for pid, tf in plist.items():
+                        norm = tf + K1 * (1 - B + B * self.docs[pid]["len"] / avg_len)
+                        scores[pid] += idf * tf * (K1 + 1) / norm
+            top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [
+                {"property_id": pid, "title": self.docs[pid]["title"], "score": round(score, 4)}
+                for pid, score in top
+            ]
+
+    def stats(self):
+        with self._lock:
+            return {"documents": len(self.docs), "terms": len(self.postings), "loaded": self.loaded}
+
+
+text_index = TextIndex(config.FULLTEXT_SNAPSHOT_PATH)
+events.subscribe("properties", text_index.on_change)
+
+
+@router.get("/text")
+def search_text(q: str, k: int = Query(10, ge=1, le=100), prefix: bool = True):
+    try:
+        text_index.sync()
+        start = time.perf_counter()
+        results = text_index.search(q, k, prefix)
+        return {
+            "query": q,
+            "results": results,
+            "took_us": round((time.perf_counter() - start) * 1e6, 1),
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/text/snapshot")
+def snapshot_text_index():
+    try:
+        saved = text_index.save_snapshot()
+        return {"saved": saved, "path": text_index.snapshot_path, **text_index.stats()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
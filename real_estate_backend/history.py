@@ -0,0 +1,407 @@
+import bisect
+import gzip
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, HTTPException, Query
+from real_estate_backend import config, jobs, logs
+from real_estate_backend.database import get_connection
+from real_estate_backend.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, split_page
+from real_estate_backend.serialization import dumps
+
+# ------------------------------------------------------------
+# PROPERTY STATUS HISTORY (property_logs, live + archived)
+# trg_property_status_log appends a row per status change, forever.
+# Reads stay index-bound however long the log gets:
+#   /properties/{id}/history  newest first, (property_id, log_id) index,
+#                             keyset on log_id < :before
+#   /history?since=&until=    oldest first; the time bounds resolve to a
+#                             log_id range through (change_date, log_id),
+#                             then pages walk the primary key
+# The archive_property_logs job moves rows older than
+# HISTORY_RETENTION_DAYS out of the table, HISTORY_ARCHIVE_CHUNK_ROWS
+# at a time, into gzip NDJSON files under HISTORY_ARCHIVE_DIR (one row
+# object per line). property_log_archives records each file's log_id
+# and date range, property_log_archive_members which properties it
+# holds. Archiving always takes the oldest rows, so every archived
+# log_id is below every live one and the readers simply continue from
+# one side into the other with the same cursor.
+# log_id and change_date are both assigned by the trigger at insert, so
+# they grow together; the time-range reads rely on that.
+# ------------------------------------------------------------
+router = APIRouter()
+
+LOG_FIELDS = ("log_id", "property_id", "old_status", "new_status", "change_date")
+LOG_SELECT = f"SELECT {', '.join(LOG_FIELDS)} FROM property_logs"
+ARCHIVE_FIELDS = (
+    "first_log_id", "last_log_id", "first_change_date", "last_change_date",
+    "row_count", "file_name", "created_at",
+)
+
+
+def _iso(value):
+    # Oracle returns DATE as datetime, the SQLite stand-in as text; live
+    # and archived rows both leave here as "YYYY-MM-DDTHH:MM:SS"
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.replace(microsecond=0).isoformat()
+    return str(value).replace(" ", "T")[:19]
+
+
+def _row(raw):
+    return (raw[0], raw[1], raw[2], raw[3], _iso(raw[4]))
+
+
+def _bound(value):
+    # DATE columns are naive, in database time
+    return value.replace(tzinfo=None, microsecond=0) if value is not None else None
+
+
+# ------------------------------------------------------------
+# ARCHIVE FILES
+# ------------------------------------------------------------
+def archive_path(file_name):
+    return os.path.join(config.HISTORY_ARCHIVE_DIR, file_name)
+
+
+def write_archive(file_name, rows):
+    os.makedirs(config.HISTORY_ARCHIVE_DIR, exist_ok=True)
+    path = archive_path(file_name)
+    tmp = path + ".tmp"
+    with gzip.open(tmp, "wb") as f:
+        for row in rows:
+            f.write(dumps(dict(zip(LOG_FIELDS, row))) + b"\n")
+    os.replace(tmp, path)
+
+
+class _Chunk:
+    def __init__(self, rows):
+        self.rows = rows  # sorted by log_id
+        self.log_ids = [r[0] for r in rows]
+        self.by_property = {}  # property_id -> row positions, ascending
+        for i, row in enumerate(rows):
+            self.by_property.setdefault(row[1], []).append(i)
+
+    def after(self, after_id):
+        return self.rows[bisect.bisect_right(self.log_ids, after_id):]
+
+    def property_rows(self, property_id, before_id=None):
+        rows = [self.rows[i] for i in self.by_property.get(property_id, ())]
+        if before_id is not None:
+            rows = [r for r in rows if r[0] < before_id]
+        return rows
+
+
+class ChunkCache:
+    # LRU of decoded archive files; a hot range is decompressed once
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._chunks = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get(self, file_name):
+        with self._lock:
+            chunk = self._chunks.get(file_name)
+            if chunk is not None:
+                self._chunks.move_to_end(file_name)
+                self._stats["hits"] += 1
+                return chunk
+            self._stats["misses"] += 1
+        with gzip.open(archive_path(file_name), "rb") as f:
+            rows = []
+            for line in f:
+                item = json.loads(line)
+                rows.append(tuple(item[field] for field in LOG_FIELDS))
+        chunk = _Chunk(rows)
+        with self._lock:
+            self._chunks[file_name] = chunk
+            self._chunks.move_to_end(file_name)
+            while len(self._chunks) > self.capacity:
+                self._chunks.popitem(last=False)
+        return chunk
+
+    def stats(self):
+        with self._lock:
+            data = dict(self._stats)
+            data["cached"] = list(self._chunks)
+        data["capacity"] = self.capacity
+        return data
+
+
+chunk_cache = ChunkCache(config.HISTORY_ARCHIVE_CACHE_CHUNKS)
+
+
+# ------------------------------------------------------------
+# READERS (live rows and archive files behind one log_id cursor)
+# ------------------------------------------------------------
+def property_history(cursor, property_id, before_id, limit):
+    # Newest first; returns up to limit + 1 rows so the caller can tell
+    # whether another page exists
+    n = limit + 1
+    where = "property_id = :property_id" + (" AND log_id < :before_id" if before_id is not None else "")
+    binds = {"property_id": property_id, "n": n}
+    if before_id is not None:
+        binds["before_id"] = before_id
+    cursor.execute(f"""
+        {LOG_SELECT}
+        WHERE {where}
+        ORDER BY log_id DESC
+        FETCH FIRST :n ROWS ONLY
+    """, binds)
+    rows = [_row(r) for r in cursor.fetchall()]
+    if len(rows) >= n:
+        return rows
+
+    # Only files that hold rows of this property. Each adds at least one
+    # row, except that the newest one may start below before_id and hold
+    # only rows at or above it, so one extra file is read.
+    where = "m.property_id = :property_id" + (" AND m.first_log_id < :before_id" if before_id is not None else "")
+    binds["n"] = n - len(rows) + 1
+    cursor.execute(f"""
+        SELECT a.file_name FROM property_log_archive_members m
+        JOIN property_log_archives a ON a.first_log_id = m.first_log_id
+        WHERE {where}
+        ORDER BY m.first_log_id DESC
+        FETCH FIRST :n ROWS ONLY
+    """, binds)
+    for (file_name,) in cursor.fetchall():
+        rows.extend(reversed(chunk_cache.get(file_name).property_rows(property_id, before_id)))
+        if len(rows) >= n:
+            break
+    return rows[:n]
+
+
+def _live_bounds(cursor, since, until):
+    # (change_date, log_id) index probes: first log_id at/after `since`,
+    # last log_id before `until`. None when the window holds no live rows.
+    lo = hi = None
+    if since is not None:
+        cursor.execute("""
+            SELECT log_id FROM property_logs WHERE change_date >= :since
+            ORDER BY change_date, log_id
+            FETCH FIRST 1 ROWS ONLY
+        """, {"since": since})
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        lo = row[0]
+    if until is not None:
+        cursor.execute("""
+            SELECT log_id FROM property_logs WHERE change_date < :until
+            ORDER BY change_date DESC, log_id DESC
+            FETCH FIRST 1 ROWS ONLY
+        """, {"until": until})
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        hi = row[0]
+    return lo, hi
+
+
+def history_range(cursor, since, until, after_id, limit):
+    # Oldest first from log_id > after_id within [since, until); up to
+    # limit + 1 rows. Archived rows come first (they are all older).
+    n = limit + 1
+    since_iso, until_iso = _iso(since), _iso(until)
+    rows = []
+
+    clauses, binds = ["last_log_id > :after_id"], {"after_id": after_id}
+    if since is not None:
+        clauses.append("last_change_date >= :since")
+        binds["since"] = since
+    if until is not None:
+        clauses.append("first_change_date < :until")
+        binds["until"] = until
+    cursor.execute(f"""
+        SELECT file_name FROM property_log_archives
+        WHERE {' AND '.join(clauses)}
+        ORDER BY first_log_id
+    """, binds)
+    for (file_name,) in cursor.fetchall():
+        for row in chunk_cache.get(file_name).after(after_id):
+            if (since_iso is None or row[4] >= since_iso) and (until_iso is None or row[4] < until_iso):
+                rows.append(row)
+                if len(rows) >= n:
+                    return rows
+
+    bounds = _live_bounds(cursor, since, until)
+    if bounds is None:
+        return rows
+    lo, hi = bounds
+    clauses = ["log_id > :after_id"]
+    binds = {"after_id": after_id if lo is None else max(after_id, lo - 1), "n": n - len(rows)}
+    if hi is not None:
+        clauses.append("log_id <= :hi")
+        binds["hi"] = hi
+    if since is not None:
+        clauses.append("change_date >= :since")
+        binds["since"] = since
+    if until is not None:
+        clauses.append("change_date < :until")
+        binds["until"] = until
+    cursor.execute(f"""
+        {LOG_SELECT}
+        WHERE {' AND '.join(clauses)}
+        ORDER BY log_id
+        FETCH FIRST :n ROWS ONLY
+    """, binds)
+    rows.extend(_row(r) for r in cursor.fetchall())
+    return rows
+
+
+# ------------------------------------------------------------
+# RETENTION / ARCHIVE JOB
+# ------------------------------------------------------------
+def _archive_file_name(first_id, last_id):
+    return f"property_logs_{first_id:012d}_{last_id:012d}.ndjson.gz"
+
+
+@jobs.job_handler("archive_property_logs")
+def archive_property_logs_job(job, retention_days=None, max_chunks=None):
+    # Moves the oldest rows in chunks of up to HISTORY_ARCHIVE_CHUNK_ROWS,
+    # each ending before the first row (in log_id order) that is still
+    # within retention; a short chunk is the last one. Expired rows that
+    # sit behind a newer one stay and are reported as rows_retained.
+    # Each chunk's file is written first, then the manifest rows and the
+    # delete commit together, so a crash leaves at worst an unreferenced
+    # file that the re-run overwrites.
+    days = config.HISTORY_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = datetime.now().replace(microsecond=0) - timedelta(days=days)
+    chunk_rows = config.HISTORY_ARCHIVE_CHUNK_ROWS
+    archived = chunks = 0
+    with get_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM property_logs WHERE change_date < :cutoff", {"cutoff": cutoff})
+        expired = cursor.fetchone()[0]
+        job.progress(cursor, 0, expired)
+        conn.commit()
+        while max_chunks is None or chunks < max_chunks:
+            cursor.execute(f"""
+                {LOG_SELECT}
+                ORDER BY log_id
+                FETCH FIRST :n ROWS ONLY
+            """, {"n": chunk_rows})
+            raw = cursor.fetchall()
+            if not raw:
+                break
+            last = len(raw) < chunk_rows
+            cursor.execute("""
+                SELECT MIN(log_id) FROM property_logs
+                WHERE log_id BETWEEN :first_id AND :last_id AND change_date >= :cutoff
+            """, {"first_id": raw[0][0], "last_id": raw[-1][0], "cutoff": cutoff})
+            keep_from = cursor.fetchone()[0]
+            if keep_from is not None:
+                raw = [r for r in raw if r[0] < keep_from]
+                last = True
+            if not raw:
+                break
+            first_id, last_id = raw[0][0], raw[-1][0]
+
+            rows = [_row(r) for r in raw]
+            file_name = _archive_file_name(first_id, last_id)
+            write_archive(file_name, rows)
+            dates = [r[4] for r in raw if r[4] is not None]
+            members = {}
+            for row in rows:
+                members[row[1]] = members.get(row[1], 0) + 1
+            cursor.execute("""
+                INSERT INTO property_log_archives
+                    (first_log_id, last_log_id, first_change_date, last_change_date, row_count, file_name, created_at)
+                VALUES (:first_id, :last_id, :first_date, :last_date, :row_count, :file_name, SYSDATE)
+            """, {
+                "first_id": first_id, "last_id": last_id,
+                "first_date": min(dates) if dates else None, "last_date": max(dates) if dates else None,
+                "row_count": len(rows), "file_name": file_name,
+            })
+            cursor.executemany("""
+                INSERT INTO property_log_archive_members (property_id, first_log_id, row_count)
+                VALUES (:1, :2, :3)
+            """, [(pid, first_id, count) for pid, count in members.items() if pid is not None])
+            cursor.execute("""
+                DELETE FROM property_logs WHERE log_id BETWEEN :first_id AND :last_id
+            """, {"first_id": first_id, "last_id": last_id})
+            archived += len(rows)
+            chunks += 1
+            job.progress(cursor, archived, max(expired, archived))
+            conn.commit()
+            logs.log("property_logs_archived", file_name=file_name, rows=len(rows))
+            if last:
+                break
+        cursor.execute("SELECT COUNT(*) FROM property_logs WHERE change_date < :cutoff", {"cutoff": cutoff})
+        retained = cursor.fetchone()[0]
+    if retained:
+        logs.log("property_logs_retained", "warning", rows=retained, cutoff=cutoff.isoformat())
+    return {"chunks": chunks, "rows_archived": archived, "rows_retained": retained, "cutoff": cutoff.isoformat()}
+
+
+# ------------------------------------------------------------
+# ENDPOINTS
+# ------------------------------------------------------------
+@router.get("/properties/{property_id}/history")
+def get_property_history(
+    property_id: int,
+    before_log_id: int = None,
+    cursor: str = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    filters = {"property_id": property_id}
+    before_id = decode_cursor(cursor, filters) if cursor else before_log_id
+    try:
+        with get_connection() as conn, conn.cursor() as cur:
+            rows = property_history(cur, property_id, before_id, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    rows, next_cursor = split_page(rows, limit, filters)
+    return {
+        "property_id": property_id,
+        "history": [dict(zip(LOG_FIELDS, r)) for r in rows],
+        "next_cursor": next_cursor,
+    }
+
+
+@router.get("/history")
+def get_history(
+    since: datetime = None,
+    until: datetime = None,
+    after_log_id: int = None,
+    cursor: str = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    since, until = _bound(since), _bound(until)
+    filters = {"since": _iso(since), "until": _iso(until)}
+    after_id = decode_cursor(cursor, filters) if cursor else (after_log_id or 0)
+    try:
+        with get_connection() as conn, conn.cursor() as cur:
+            rows = history_range(cur, since, until, after_id, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    rows, next_cursor = split_page(rows, limit, filters)
+    return {"history": [dict(zip(LOG_FIELDS, r)) for r in rows], "next_cursor": next_cursor}
+
+
+@router.get("/history/archives")
+def list_archives():
+    try:
+        with get_connection() as conn, conn.cursor() as cur:
+            cur.execute(f"SELECT {', '.join(ARCHIVE_FIELDS)} FROM property_log_archives ORDER BY first_log_id")
+            archives = [dict(zip(ARCHIVE_FIELDS, r)) for r in cur.fetchall()]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "archives": archives,
+        "rows_archived": sum(a["row_count"] for a in archives),
+        "cache": chunk_cache.stats(),
+    }
+
+
+@router.post("/history/archive")
+def archive_history(retention_days: float = Query(None, ge=0), max_chunks: int = Query(None, ge=1)):
+    try:
+        job_id = jobs.submit("archive_property_logs", retention_days=retention_days, max_chunks=max_chunks)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return jobs.accepted(job_id, f"🗄️ Property log archiving queued (job {job_id}).")
@@ -0,0 +1,73 @@
+import threading
+
+from real_estate_backend import config
+
+# ------------------------------------------------------------
+# SEQUENCE-BACKED ID ALLOCATION (hi/lo)
+# Each sequence steps by ID_BLOCK_SIZE, so one NEXTVAL reserves the
+# block [value, value + ID_BLOCK_SIZE) for this process alone. Ids are
+# then handed out from memory; only one insert in ID_BLOCK_SIZE pays
+# for a sequence round trip, and concurrent writers never collide.
+# ------------------------------------------------------------
+class IdAllocator:
+    def __init__(self, sequence, block_size=None):
+        self.sequence = sequence
+        self.block_size = block_size or config.ID_BLOCK_SIZE
+        self._lock = threading.Lock()
+        self._next = 0
+        self._limit = 0
+
+    def _take(self, count):
+        with self._lock:
+            start = self._next
+            self._next = min(self._next + count, self._limit)
+            return list(range(start, self._next))
+
+    def _blocks_sql(self, count):
+        # CONNECT BY pulls several blocks in a single round trip
+        blocks = -(-count // self.block_size)
+        if blocks == 1:
+            return f"SELECT {self.sequence}.NEXTVAL FROM dual", {}
+        return (
+            f"SELECT {self.sequence}.NEXTVAL FROM dual CONNECT BY LEVEL <= :blocks",
+            {"blocks": blocks},
+        )
+
+    def _use_blocks(self, block_starts, need):
+        fresh = [i for start in sorted(block_starts) for i in range(start, start + self.block_size)]
+        leftover = fresh[need:]
+        if leftover:
+            with self._lock:
+                # Another thread may have refilled meanwhile; then the
+                # leftover is simply skipped (sequences allow gaps)
+                if self._next >= self._limit:
+                    self._next, self._limit = leftover[0], leftover[-1] + 1
+        return fresh[:need]
+
+    def reserve(self, cursor, count=1):
+        ids = self._take(count)
+        if len(ids) < count:
+            sql, binds = self._blocks_sql(count - len(ids))
+            cursor.execute(sql, binds)
+            ids += self._use_blocks([r[0] for r in cursor.fetchall()], count - len(ids))
+        return ids
+
+    def next_id(self, cursor):
+        return self.reserve(cursor, 1)[0]
+
+    async def reserve_async(self, cursor, count=1):
+        ids = self._take(count)
+        if len(ids) < count:
+            sql, binds = self._blocks_sql(count - len(ids))
+            await cursor.execute(sql, binds)
+            ids += self._use_blocks([r[0] for r in await cursor.fetchall()], count - len(ids))
+        return ids
+
+    async def next_id_async(self, cursor):
+        return (await self.reserve_async(cursor, 1))[0]
+
+
+user_ids = IdAllocator("users_seq")
+agent_ids = IdAllocator("agents_seq")
+property_ids = IdAllocator("properties_seq")
+job_ids = IdAllocator("background_jobs_seq")
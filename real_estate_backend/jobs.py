@@ -0,0 +1,349 @@
+import json
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
+from real_estate_backend import config, events, logs
+from real_estate_backend.database import get_connection
+from real_estate_backend.ids import job_ids
+
+# ------------------------------------------------------------
+# BACKGROUND JOBS
+# Long cascades and recomputations run on a small worker pool instead
+# of the request thread. Every job is a row in background_jobs
+# (queued -> running -> succeeded | failed) with progress counters,
+# so GET /jobs/{id} works from any process.
+# A worker runs a job only after claiming it with a conditional UPDATE
+# (queued -> running, owner = this process), so of several processes
+# holding the same job id exactly one runs it. The owner renews a
+# lease (heartbeat_at) while it runs; queued jobs are picked up on
+# startup, and running jobs whose lease has run out are taken over
+# then and by the heartbeat of any live process.
+# Job functions must therefore be safe to re-run: the cascades below
+# delete in JOB_CHUNK_SIZE batches, committing each batch together
+# with the job's progress, which fails once the lease is lost.
+# ------------------------------------------------------------
+router = APIRouter(prefix="/jobs")
+
+JOB_FIELDS = (
+    "job_id", "kind", "params", "status", "progress_done", "progress_total",
+    "result", "error", "created_at", "started_at", "finished_at", "owner", "heartbeat_at",
+)
+# This process, as recorded in background_jobs.owner
+OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"[:100]
+_handlers = {}
+_executor = None
+_executor_lock = threading.Lock()
+_heartbeat_thread = None
+_heartbeat_stop = threading.Event()
+
+
+class LeaseLost(Exception):
+    pass
+
+
+def job_handler(kind):
+    def register(fn):
+        _handlers[kind] = fn
+        return fn
+    return register
+
+
+class Job:
+    def __init__(self, job_id, kind, params):
+        self.job_id = job_id
+        self.kind = kind
+        self.params = params
+
+    def progress(self, cursor, done, total=None):
+        # Runs in the caller's transaction so progress commits with the
+        # work; raising LeaseLost rolls the work back with it
+        cursor.execute("""
+            UPDATE background_jobs
+            SET progress_done = :done, progress_total = NVL(:total, progress_total), heartbeat_at = :now
+            WHERE job_id = :job_id AND owner = :owner AND status = 'running'
+        """, {"done": done, "total": total, "now": _now(), "job_id": self.job_id, "owner": OWNER})
+        if cursor.rowcount != 1:
+            raise LeaseLost(f"Job {self.job_id} was taken over by another process")
+
+
+def _now():
+    # Leases compare application clocks only, never SYSDATE
+    return datetime.now().replace(microsecond=0)
+
+
+def _lease_expired_before():
+    return _now() - timedelta(seconds=config.JOB_LEASE_SECONDS)
+
+
+def _claim(job_id):
+    # Queued, or running under a lease that ran out: exactly one caller
+    # gets rowcount 1
+    with get_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("""
+            UPDATE background_jobs
+            SET status = 'running', owner = :owner, heartbeat_at = :now, started_at = SYSDATE
+            WHERE job_id = :job_id
+            AND (status = 'queued'
+                 OR (status = 'running' AND (heartbeat_at IS NULL OR heartbeat_at < :expired)))
+        """, {"owner": OWNER, "now": _now(), "job_id": job_id, "expired": _lease_expired_before()})
+        claimed = cursor.rowcount == 1
+        conn.commit()
+    return claimed
+
+
+def _set_status(job_id, status, **fields):
+    # Final status, written only while this process still owns the job
+    assignments = "".join(f", {k} = :{k}" for k in fields)
+    with get_connection() as conn, conn.cursor() as cursor:
+        cursor.execute(f"""
+            UPDATE background_jobs
+            SET status = :status, finished_at = SYSDATE{assignments}
+            WHERE job_id = :job_id AND owner = :owner
+        """, dict(fields, status=status, job_id=job_id, owner=OWNER))
+        updated = cursor.rowcount == 1
+        conn.commit()
+    if not updated:
+        logs.log("job_lease_lost", "warning", job_id=job_id, status=status)
+
+
+def _run(job_id, kind, params):
+    try:
+        if not _claim(job_id):
+            # Finished, or running in another process
+            logs.log("job_claim_skipped", job_id=job_id, kind=kind)
+            return
+    except Exception as e:
+        logs.log("job_claim_failed", "error", exc=e, job_id=job_id, kind=kind)
+        return
+    job = Job(job_id, kind, params)
+    try:
+        result = _handlers[kind](job, **params)
+        _set_status(job_id, "succeeded", result=json.dumps(result, default=str))
+        logs.log("job_succeeded", job_id=job_id, kind=kind)
+    except LeaseLost:
+        logs.log("job_lease_lost", "warning", job_id=job_id, kind=kind)
+    except Exception as e:
+        logs.log("job_failed", "error", exc=e, job_id=job_id, kind=kind)
+        try:
+            _set_status(job_id, "failed", error=str(e)[:4000])
+        except Exception as status_error:
+            logs.log("job_status_update_failed", "error", exc=status_error, job_id=job_id)
+
+
+def _pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=config.JOB_WORKERS, thread_name_prefix="job")
+        return _executor
+
+
+def submit(kind, **params):
+    if kind not in _handlers:
+        raise ValueError(f"Unknown job kind: {kind}")
+    with get_connection() as conn, conn.cursor() as cursor:
+        job_id = job_ids.next_id(cursor)
+        cursor.execute("""
+            INSERT INTO background_jobs (job_id, kind, params, status, progress_done, created_at)
+            VALUES (:1, :2, :3, 'queued', 0, SYSDATE)
+        """, [job_id, kind, json.dumps(params)])
+        conn.commit()
+    _pool().submit(_run, job_id, kind, params)
+    logs.log("job_queued", job_id=job_id, kind=kind)
+    return job_id
+
+
+def accepted(job_id, message):
+    # 202 body returned by handlers that hand their work to a job
+    return JSONResponse(
+        status_code=202,
+        content={"message": message, "job_id": job_id, "status_url": f"/jobs/{job_id}"},
+        headers={"Location": f"/jobs/{job_id}"},
+    )
+
+
+def _resume(queued):
+    # Submits abandoned jobs: running ones whose lease ran out (never
+    # this process's own) and, with `queued`, unclaimed ones. _run's
+    # claim settles races with other processes doing the same.
+    with get_connection() as conn, conn.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT job_id, kind, params FROM background_jobs
+            WHERE (status = 'running' AND NVL(owner, '-') <> :owner
+                   AND (heartbeat_at IS NULL OR heartbeat_at < :expired))
+            {"OR status = 'queued'" if queued else ""}
+            ORDER BY job_id
+        """, {"owner": OWNER, "expired": _lease_expired_before()})
+        pending = cursor.fetchall()
+    for job_id, kind, params in pending:
+        if kind in _handlers:
+            _pool().submit(_run, job_id, kind, json.loads(params or "{}"))
+            logs.log("job_resumed", job_id=job_id, kind=kind)
+
+
+def _heartbeat():
+    # Renews this process's leases and takes over jobs whose owner died
+    while not _heartbeat_stop.wait(config.JOB_LEASE_SECONDS / 4):
+        try:
+            with get_connection() as conn, conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE background_jobs SET heartbeat_at = :now
+                    WHERE owner = :owner AND status = 'running'
+                """, {"now": _now(), "owner": OWNER})
+                conn.commit()
+            _resume(queued=False)
+        except Exception as e:
+            logs.log("job_heartbeat_failed", "error", exc=e)
+
+
+def start():
+    global _heartbeat_thread
+    _pool()
+    _resume(queued=True)
+    if _heartbeat_thread is None:
+        _heartbeat_stop.clear()
+        _heartbeat_thread = threading.Thread(target=_heartbeat, name="job-heartbeat", daemon=True)
+        _heartbeat_thread.start()
+
+
+def shutdown():
+    # Unstarted jobs stay 'queued' in the table and resume on next start;
+    # running ones are taken over once their lease runs out
+    global _executor, _heartbeat_thread
+    _heartbeat_stop.set()
+    _heartbeat_thread = None
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ------------------------------------------------------------
+# JOB KINDS
+# ------------------------------------------------------------
+def _delete_agent_properties(job, cursor, conn, agent_id):
+    # Deletes the agent's properties JOB_CHUNK_SIZE at a time; each
+    # chunk commits with the job's progress and is published by id
+    cursor.execute("SELECT COUNT(*) FROM properties WHERE agent_id = :1", [agent_id])
+    total = cursor.fetchone()[0]
+    job.progress(cursor, 0, total)
+    conn.commit()
+    done = 0
+    while True:
+        cursor.execute("""
+            SELECT property_id FROM properties
+            WHERE agent_id = :agent_id
+            ORDER BY property_id
+            FETCH FIRST :chunk ROWS ONLY
+        """, {"agent_id": agent_id, "chunk": config.JOB_CHUNK_SIZE})
+        ids = [r[0] for r in cursor.fetchall()]
+        if not ids:
+            return done
+        cursor.executemany("DELETE FROM properties WHERE property_id = :1", [(i,) for i in ids])
+        done += len(ids)
+        job.progress(cursor, done, max(total, done))
+        conn.commit()
+        events.publish("properties", ids)
+
+
+@job_handler("delete_agent")
+def delete_agent_job(job, agent_id):
+    with get_connection() as conn, conn.cursor() as cursor:
+        deleted = _delete_agent_properties(job, cursor, conn, agent_id)
+        cursor.execute("DELETE FROM agents WHERE agent_id = :1", [agent_id])
+        conn.commit()
+    events.publish("agents", [agent_id])
+    return {"agent_id": agent_id, "properties_deleted": deleted}
+
+
+@job_handler("delete_user")
+def delete_user_job(job, user_id):
+    with get_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT agent_id FROM agents WHERE user_id = :1", [user_id])
+        agent = cursor.fetchone()
+        deleted = 0
+        if agent:
+            deleted = _delete_agent_properties(job, cursor, conn, agent[0])
+            cursor.execute("DELETE FROM agents WHERE agent_id = :1", [agent[0]])
+        cursor.execute("DELETE FROM users WHERE user_id = :1", [user_id])
+        conn.commit()
+    events.publish("users", [user_id])
+    if agent:
+        events.publish("agents", [agent[0]])
+    return {"user_id": user_id, "agent_id": agent[0] if agent else None, "properties_deleted": deleted}
+
+
+@job_handler("rebuild_agent_sales_summary")
+def rebuild_agent_sales_summary_job(job):
+    # Recomputes the trigger-maintained summary from properties
+    with get_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("DELETE FROM agent_sales_summary")
+        cursor.execute("""
+            INSERT INTO agent_sales_summary (agent_id, sold_count, total_sales)
+            SELECT agent_id, COUNT(*), NVL(SUM(price), 0)
+            FROM properties
+            WHERE LOWER(status) = 'sold' AND agent_id IS NOT NULL
+            GROUP BY agent_id
+        """)
+        agents = cursor.rowcount
+        job.progress(cursor, agents, agents)
+        conn.commit()
+    events.publish("properties")
+    return {"agents": agents}
+
+
+# ------------------------------------------------------------
+# ENDPOINTS
+# ------------------------------------------------------------
+def _job_dict(row):
+    job = dict(zip(JOB_FIELDS, row))
+    for field in ("params", "result"):
+        if job[field]:
+            job[field] = json.loads(job[field])
+    return job
+
+
+@router.get("/{job_id}")
+def get_job(job_id: int):
+    try:
+        with get_connection() as conn, conn.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {', '.join(JOB_FIELDS)} FROM background_jobs WHERE job_id = :1", [job_id]
+            )
+            row = cursor.fetchone()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return _job_dict(row)
+
+
+@router.get("")
+def list_jobs(status: str = None, limit: int = Query(50, ge=1, le=500)):
+    where = "WHERE status = :status" if status else ""
+    binds = {"status": status} if status else {}
+    try:
+        with get_connection() as conn, conn.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT {', '.join(JOB_FIELDS)} FROM background_jobs {where}
+                ORDER BY job_id DESC
+                FETCH FIRST :n ROWS ONLY
+            """, dict(binds, n=limit))
+            return {"jobs": [_job_dict(r) for r in cursor.fetchall()]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/rebuild_agent_sales_summary")
+def rebuild_agent_sales_summary():
+    try:
+        job_id = submit("rebuild_agent_sales_summary")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return accepted(job_id, f"📊 Sales summary rebuild queued (job {job_id}).")
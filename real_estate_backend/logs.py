@@ -0,0 +1,195 @@
+import contextvars
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+import traceback
+import uuid
+
+from real_estate_backend import config
+from real_estate_backend.metrics import route_template
+
+# ------------------------------------------------------------
+# STRUCTURED LOG PIPELINE
+# Request threads never write to the log sink themselves. log() builds a
+# dict (tagged with the current request id and route) and puts it on
+# a bounded queue without blocking; if the queue is full the event is
+# dropped and counted. A daemon thread drains the queue and writes
+# batches of JSON lines with one write() + flush() per batch.
+# Events below "warning" are success-path chatter and are sampled at
+# LOG_SAMPLE_RATE; warnings and errors are always kept.
+# ------------------------------------------------------------
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+_STOP = object()
+
+_queue = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+_writer = None
+_writer_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"emitted": 0, "sampled_out": 0, "dropped": 0, "written": 0, "batches": 0}
+
+_request = contextvars.ContextVar("log_request", default=None)  # (request id, ASGI scope)
+
+
+def _count(key, amount=1):
+    with _stats_lock:
+        _stats[key] += amount
+
+
+def log(event, level="info", exc=None, **fields):
+    # `exc` is formatted by the writer thread, not the caller
+    severity = LEVELS[level]
+    if severity < LEVELS[config.LOG_LEVEL]:
+        return
+    if severity < LEVELS["warning"] and random.random() >= config.LOG_SAMPLE_RATE:
+        _count("sampled_out")
+        return
+    record = {"ts": time.time(), "level": level, "event": event}
+    current = _request.get()
+    if current is not None:
+        record["request_id"] = current[0]
+        record["route"] = route_template(current[1])
+    record.update(fields)
+    if exc is not None:
+        record["_exc"] = exc
+    _ensure_writer()
+    try:
+        _queue.put_nowait(record)
+        _count("emitted")
+    except queue.Full:
+        _count("dropped")
+
+
+def _format(record):
+    exc = record.pop("_exc", None)
+    if exc is not None:
+        record["error"] = str(exc)
+        record["traceback"] = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+    return json.dumps(record, default=str, ensure_ascii=False)
+
+
+def _open_sink():
+    if config.LOG_FILE:
+        return open(config.LOG_FILE, "a", encoding="utf-8", buffering=1 << 16)
+    return sys.stderr
+
+
+def _drain():
+    sink = _open_sink()
+    stopping = False
+    while not stopping:
+        try:
+            first = _queue.get(timeout=config.LOG_FLUSH_SECONDS)
+        except queue.Empty:
+            continue
+        batch = [first]
+        while len(batch) < config.LOG_BATCH_SIZE:
+            try:
+                batch.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        if _STOP in batch:
+            stopping = True
+            batch = [r for r in batch if r is not _STOP]
+        if not batch:
+            continue
+        try:
+            sink.write("\n".join(_format(r) for r in batch) + "\n")
+            sink.flush()
+            _count("written", len(batch))
+            _count("batches")
+        except Exception:
+            _count("dropped", len(batch))
+    if sink is not sys.stderr:
+        sink.close()
+
+
+def _ensure_writer():
+    global _writer
+    if _writer is not None and _writer.is_alive():
+        return
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_drain, name="log-writer", daemon=True)
+            _writer.start()
+
+
+def shutdown(timeout=5.0):
+    # Flushes what is queued; called from the app lifespan on exit
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is None or not writer.is_alive():
+        return
+    try:
+        _queue.put(_STOP, timeout=timeout)
+    except queue.Full:
+        return
+    writer.join(timeout)
+
+
+def stats():
+    with _stats_lock:
+        data = dict(_stats)
+    data["queued"] = _queue.qsize()
+    data["queue_max"] = _queue.maxsize
+    data["sample_rate"] = config.LOG_SAMPLE_RATE
+    return data
+
+
+# ------------------------------------------------------------
+# REQUEST EVENTS
+# One "request" event per HTTP request with its outcome; the request
+# id comes from X-Request-ID when the caller sends one and is echoed
+# back on the response.
+# ------------------------------------------------------------
+class RequestLogMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        rid = dict(scope["headers"]).get(b"x-request-id", b"").decode("latin-1") or uuid.uuid4().hex[:16]
+        token = _request.set((rid, scope))
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", rid.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            code = status[0]
+            outcome = "ok" if code < 400 else "client_error" if code < 500 else "error"
+            log("request", "error" if code >= 500 else "info",
+                method=scope["method"], route=route_template(scope), status=code,
+                outcome=outcome, elapsed_ms=round((time.perf_counter() - start) * 1000, 2))
+            _request.reset(token)
+
+
+# ------------------------------------------------------------
+# STDLIB BRIDGE
+# Module loggers under real_estate_backend (e.g. the slow query log)
+# go through the same queue instead of a blocking StreamHandler.
+# ------------------------------------------------------------
+class PipelineHandler(logging.Handler):
+    def emit(self, record):
+        level = record.levelname.lower()
+        log(record.name, level if level in LEVELS else "error",
+            exc=record.exc_info[1] if record.exc_info else None, message=record.getMessage())
+
+
+_package_logger = logging.getLogger("real_estate_backend")
+_package_logger.addHandler(PipelineHandler())
+_package_logger.setLevel(logging.DEBUG)
+_package_logger.propagate = False
@@ -0,0 +1,89 @@
+import json
+
+# ------------------------------------------------------------
+# LATE LOG ROWS
+# property_logs / replica_changes ids are handed out at insert but
+# become visible at commit, and sequence caching skips ranges, so a
+# reader that only remembers the highest id it has seen can step over
+# a row that commits after a higher one. LogTail keeps, next to that
+# high-water mark, the id ranges below it that had no rows yet and
+# re-reads them on every poll until rows show up or `grace` seconds
+# pass. Used by the read replica, the search and analytics snapshots.
+# ------------------------------------------------------------
+GAP_RANGES_PER_QUERY = 100
+
+
+class LogTail:
+    # An id-ordered log tailed past a high-water mark, with the ranges
+    # below the mark that had no rows yet: [first id, last id, noticed at]
+    def __init__(self, name, sql, table, key, columns, grace):
+        # sql: rows after :after, ordered by key, FETCH FIRST :n
+        self.name = name
+        self.sql = sql
+        self.table = table
+        self.key = key
+        self.columns = columns
+        self.grace = grace
+        self.mark = None
+        self.gaps = []
+
+    def restore(self, state):
+        self.mark = state.get(f"{self.name}_id")
+        self.gaps = json.loads(state.get(f"{self.name}_gaps") or "[]")
+
+    def state(self):
+        return [(f"{self.name}_id", self.mark), (f"{self.name}_gaps", json.dumps(self.gaps))]
+
+    def seed(self, cursor, mark, now, scan_ids):
+        # Starting at `mark` (a MAX() just read): ids missing in the
+        # `scan_ids` below it may belong to transactions still open
+        lo = max(0, mark - scan_ids)
+        cursor.execute(
+            f"SELECT {self.key} FROM {self.table} WHERE {self.key} > :lo AND {self.key} <= :hi ORDER BY {self.key}",
+            {"lo": lo, "hi": mark},
+        )
+        self.mark, self.gaps = lo, []
+        self.advance(cursor.fetchall(), [], now)
+        if self.mark < mark:
+            self.gaps.append([self.mark + 1, mark, now])
+        self.mark = mark
+
+    def read(self, cursor, batch):
+        # (rows past the mark, rows that have appeared in a gap)
+        cursor.execute(self.sql, {"after": self.mark, "n": batch})
+        rows = cursor.fetchall()
+        late = []
+        for i in range(0, len(self.gaps), GAP_RANGES_PER_QUERY):
+            chunk = self.gaps[i:i + GAP_RANGES_PER_QUERY]
+            binds = {}
+            for n, (lo, hi, _) in enumerate(chunk):
+                binds[f"lo{n}"], binds[f"hi{n}"] = lo, hi
+            ranges = " OR ".join(f"{self.key} BETWEEN :lo{n} AND :hi{n}" for n in range(len(chunk)))
+            cursor.execute(f"SELECT {self.columns} FROM {self.table} WHERE {ranges}", binds)
+            late.extend(cursor.fetchall())
+        return rows, late
+
+    def advance(self, rows, late, now):
+        # Moves the mark past `rows`, closes gaps around `late` and gives
+        # up on gaps older than the grace period. Returns the number given up.
+        found = sorted(row[0] for row in late)
+        gaps, expired = [], 0
+        for lo, hi, noticed in self.gaps:
+            if now - noticed > self.grace:
+                expired += 1
+                continue
+            for i in found:
+                if lo <= i <= hi:
+                    if i > lo:
+                        gaps.append([lo, i - 1, noticed])
+                    lo = i + 1
+            if lo <= hi:
+                gaps.append([lo, hi, noticed])
+        last = self.mark
+        for row in rows:
+            if row[0] > last + 1:
+                gaps.append([last + 1, row[0] - 1, now])
+            last = row[0]
+        self.mark = last
+        self.gaps = gaps
+        return expired
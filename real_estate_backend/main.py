@@ -1,13 +1,92 @@
-from fastapi import FastAPI, HTTPException, Request
+from contextlib import asynccontextmanager
+from typing import List
+
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
 import oracledb
-from real_estate_backend.database import get_connection
+from real_estate_backend import (
+    admission,
+    analytics,
+    bulk,
+    config,
+    dataloader,
+    events,
+    export,
+    fulltext,
+    history,
+    jobs,
+    logs,
+    metrics,
+    replica,
+    search,
+    stream,
+)
+from real_estate_backend.cache import cache_key, response_cache
+from real_estate_backend.database import (
+    close_async_pool,
+    close_pool,
+    get_connection,
+    init_async_pool,
+    init_pool,
+    pool_stats,
+)
+from real_estate_backend.ids import agent_ids, property_ids, user_ids
+from real_estate_backend.models import Agent, User
+from real_estate_backend.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    page_query,
+    property_filters,
+    resolve_after_id,
+    split_page,
+)
+from real_estate_backend.replica import read_connection
+from real_estate_backend.serialization import (
+    AGENT_LIST_COLUMNS,
+    PROPERTY_LIST_COLUMNS,
+    USER_LIST_COLUMNS,
+    check_format,
+    columnar,
+    json_bytes_response,
+)
+from real_estate_backend.versions import ConditionalGetMiddleware
+
+
+# ------------------------------------------------------------
+# APP LIFESPAN: open the DB pool on startup, close it on shutdown
+# ------------------------------------------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if config.DB_ENGINE == "async":
+        init_async_pool()
+    else:
+        init_pool()
+    jobs.start()
+    replica.replica.start()
+    yield
+    jobs.shutdown()
+    replica.replica.stop()
+    await stream.change_feed.stop()
+    fulltext.text_index.save_snapshot()
+    await close_async_pool()
+    close_pool()
+    logs.shutdown()
+
 
 # ------------------------------------------------------------
 # FASTAPI APP CONFIGURATION
 # ------------------------------------------------------------
-app = FastAPI(title="Real Estate Management System API")
+app = FastAPI(title="Real Estate Management System API", lifespan=lifespan)
+
+# Queues or sheds (503) requests beyond the database's capacity;
+# 304 answers from ConditionalGetMiddleware never take a slot
+app.add_middleware(admission.AdmissionMiddleware)
+
+# Answers If-None-Match on /properties, /agents, /users with 304
+app.add_middleware(ConditionalGetMiddleware)
+
+# Adds X-Replica-Lag / X-Read-Source to GETs in read-replica mode
+app.add_middleware(replica.ReplicaMiddleware)
 
 # ✅ Enable CORS for React frontend
 app.add_middleware(
@@ -17,6 +96,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if config.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+app.add_middleware(logs.RequestLogMiddleware)
 
 # ✅ Handle only OPTIONS preflight (don’t block other methods)
 @app.options("/{rest_of_path:path}")
@@ -26,46 +108,90 @@ async def preflight_handler(request: Request, rest_of_path: str):
     }
 
 # ------------------------------------------------------------
-# DATA MODELS
+# ROOT ENDPOINT
+# ------------------------------------------------------------
+@app.get("/")
+def home():
+    return {"message": "🏠 Real Estate Management System API is running!"}
+
+
+# ------------------------------------------------------------
+# CONNECTION POOL STATS
 # ------------------------------------------------------------
-class User(BaseModel):
-    username: str
-    email: str
-    role: str = "buyer"
+@app.get("/pool_stats")
+def get_pool_stats(engine: str = None):
+    if engine is not None and engine not in ("sync", "async"):
+        raise HTTPException(status_code=400, detail="engine must be 'sync' or 'async'.")
+    return pool_stats(engine)
 
 
-class Agent(BaseModel):
-    username: str
-    license_no: str
-    region: str
+# ------------------------------------------------------------
+# RESPONSE CACHE STATS
+# ------------------------------------------------------------
+@app.get("/cache_stats")
+def get_cache_stats():
+    return response_cache.stats()
 
 
 # ------------------------------------------------------------
-# ROOT ENDPOINT
+# DATALOADER STATS (achieved batch sizes per loader)
 # ------------------------------------------------------------
-@app.get("/")
-def home():
-    return {"message": "🏠 Real Estate Management System API is running!"}
+@app.get("/loader_stats")
+def get_loader_stats():
+    return dataloader.stats()
+
+
+# ------------------------------------------------------------
+# ADMISSION CONTROL STATS (active slots, queue depth, sheds)
+# ------------------------------------------------------------
+@app.get("/admission_stats")
+def get_admission_stats():
+    return admission.controller.stats()
+
+
+# ------------------------------------------------------------
+# READ REPLICA STATS (lag, high-water marks, read routing) AND
+# replica_changes RETENTION
+# ------------------------------------------------------------
+@app.get("/replica_stats")
+def get_replica_stats():
+    return replica.replica.stats()
+
+
+@app.post("/replica_changes/prune")
+def prune_replica_changes(keep_ids: int = Query(None, ge=0), stale_days: float = Query(None, ge=0)):
+    try:
+        job_id = jobs.submit("prune_replica_changes", keep_ids=keep_ids, stale_days=stale_days)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return jobs.accepted(job_id, f"🧹 Replica change log pruning queued (job {job_id}).")
 
 
 # ------------------------------------------------------------
 # USERS: CRUD OPERATIONS
 # ------------------------------------------------------------
 @app.get("/users")
-def get_users():
+def get_users(
+    after_id: int = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str = None,
+    format: str = "objects",
+):
+    check_format(format)
+    start = resolve_after_id(after_id, cursor)
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT USER_ID, USERNAME, EMAIL, ROLE FROM USERS ORDER BY USER_ID")
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
-
-        users = [
-            {"user_id": r[0], "username": r[1], "email": r[2], "role": r[3]}
-            for r in rows
-        ]
-        return {"users": users}
+        sql, binds = page_query(
+            "SELECT USER_ID, USERNAME, EMAIL, ROLE FROM USERS", "USER_ID", start, limit
+        )
+        with read_connection() as conn, conn.cursor() as cur:
+            cur.execute(sql, binds)
+            rows = cur.fetchall()
+
+        rows, next_cursor = split_page(rows, limit)
+        if format == "columnar":
+            return json_bytes_response(columnar(USER_LIST_COLUMNS, rows, next_cursor=next_cursor))
+        users = [dict(zip(USER_LIST_COLUMNS, r)) for r in rows]
+        return {"users": users, "next_cursor": next_cursor}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -73,20 +199,16 @@ def get_users():
 @app.post("/add_user")
 def add_user(user: User):
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT NVL(MAX(USER_ID), 0) + 1 FROM USERS")
-        new_id = cursor.fetchone()[0]
+        with get_connection() as conn, conn.cursor() as cursor:
+            new_id = user_ids.next_id(cursor)
 
-        cursor.execute("""
-            INSERT INTO USERS (USER_ID, USERNAME, PASSWORD_HASH, FULL_NAME, EMAIL, PHONE, ROLE, CREATED_AT)
-            VALUES (:1, :2, 'default_hash', :3, :4, '0000000000', :5, SYSDATE)
-        """, (new_id, user.username, user.username, user.email, user.role))
+            cursor.execute("""
+                INSERT INTO USERS (USER_ID, USERNAME, PASSWORD_HASH, FULL_NAME, EMAIL, PHONE, ROLE, CREATED_AT)
+                VALUES (:1, :2, 'default_hash', :3, :4, '0000000000', :5, SYSDATE)
+            """, (new_id, user.username, user.username, user.email, user.role))
 
-        conn.commit()
-        cursor.close()
-        conn.close()
+            conn.commit()
+        events.publish("users", [new_id])
         return {"message": f"✅ User '{user.username}' added successfully!"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -99,156 +221,161 @@ def update_user(user_id: int, request: dict):
     role = request.get("role")
 
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        # Update user info
-        cursor.execute("""
-            UPDATE users 
-            SET username = :1, email = :2, role = :3 
-            WHERE user_id = :4
-        """, [username, email, role, user_id])
-
-        # ✅ Sync role with agents table
+        with get_connection() as conn, conn.cursor() as cursor:
+            # Update user info
+            cursor.execute("""
+                UPDATE users
+                SET username = :1, email = :2, role = :3
+                WHERE user_id = :4
+            """, [username, email, role, user_id])
+
+            # ✅ Sync role with agents table
+            if role.lower() == "buyer":
+                cursor.execute("DELETE FROM agents WHERE user_id = :1", [user_id])
+            elif role.lower() == "agent":
+                cursor.execute("SELECT agent_id FROM agents WHERE user_id = :1", [user_id])
+                if cursor.fetchone() is None:
+                    new_agent_id = agent_ids.next_id(cursor)
+                    cursor.execute("""
+                        INSERT INTO agents (agent_id, user_id, license_no, region)
+                        VALUES (:1, :2, 'UNASSIGNED', 'Not specified')
+                    """, [new_agent_id, user_id])
+
+            conn.commit()
+
+        events.publish("users", [user_id])
+        events.publish("agents")
         if role.lower() == "buyer":
-            cursor.execute("DELETE FROM agents WHERE user_id = :1", [user_id])
-        elif role.lower() == "agent":
-            cursor.execute("SELECT agent_id FROM agents WHERE user_id = :1", [user_id])
-            if cursor.fetchone() is None:
-                cursor.execute("SELECT NVL(MAX(agent_id),0)+1 FROM agents")
-                new_agent_id = cursor.fetchone()[0]
-                cursor.execute("""
-                    INSERT INTO agents (agent_id, user_id, license_no, region)
-                    VALUES (:1, :2, 'UNASSIGNED', 'Not specified')
-                """, [new_agent_id, user_id])
-
-        conn.commit()
-        cursor.close()
-        conn.close()
-
+            # agents -> properties is ON DELETE CASCADE
+            events.publish("properties")
         return {"message": f"✅ User '{username}' updated successfully!"}
     except Exception as e:
-        print("🔥 Update error:", e)
+        logs.log("user_update_failed", "error", exc=e, user_id=user_id)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.delete("/delete_user/{user_id}")
 def delete_user(user_id: int):
-    import traceback
-    print(f"🧹 Attempting to delete user_id={user_id}")
-
+    # The cascade (agent, their properties, the user) runs as a job
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        # Check if user exists
-        cursor.execute("SELECT username FROM users WHERE user_id = :1", [user_id])
-        user_row = cursor.fetchone()
+        with get_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT username FROM users WHERE user_id = :1", [user_id])
+            user_row = cursor.fetchone()
         if not user_row:
-            print("⚠️ User not found.")
+            logs.log("user_delete_not_found", user_id=user_id)
             return {"message": f"User ID {user_id} not found"}
 
-        username = user_row[0]
-        print(f"👤 Found user: {username}")
-
-        # Find linked agent
-        cursor.execute("SELECT agent_id FROM agents WHERE user_id = :1", [user_id])
-        agent = cursor.fetchone()
-
-        if agent:
-            agent_id = agent[0]
-            print(f"🔗 Found linked agent_id={agent_id}. Deleting their properties...")
-            
-            # Delete all properties linked to that agent
-            cursor.execute("DELETE FROM properties WHERE agent_id = :1", [agent_id])
-            print(f"🏠 Deleted {cursor.rowcount} properties")
-
-            # Delete the agent
-            cursor.execute("DELETE FROM agents WHERE agent_id = :1", [agent_id])
-            print(f"🧾 Agent deleted.")
-
-        # Delete user
-        cursor.execute("DELETE FROM users WHERE user_id = :1", [user_id])
-        print(f"🧍‍♂️ Deleted user record (count={cursor.rowcount})")
-
-        conn.commit()
-        cursor.close()
-        conn.close()
-
-        print("✅ All deletions done successfully.")
-        return {"message": f"🗑️ User {user_id} and linked data deleted successfully."}
-
+        job_id = jobs.submit("delete_user", user_id=user_id)
+        logs.log("user_delete_queued", user_id=user_id, username=user_row[0], job_id=job_id)
     except Exception as e:
-        print("🔥 Delete error:", e)
-        traceback.print_exc()
-        if 'conn' in locals():
-            conn.rollback()
+        logs.log("user_delete_failed", "error", exc=e, user_id=user_id)
         raise HTTPException(status_code=500, detail=str(e))
+    return jobs.accepted(job_id, f"🗑️ Deletion of user {user_id} and linked data queued (job {job_id}).")
 
 
 # ------------------------------------------------------------
-# PL/SQL PROCEDURE: Calculate Total Sales for Agent
+# AGENT TOTAL SALES (same read as PL/SQL calc_total_sales)
 # ------------------------------------------------------------
 @app.get("/calc_total_sales/{agent_id}")
 def calc_total_sales(agent_id: int):
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        total_sales = cursor.var(float)
-        cursor.callproc("calc_total_sales", [agent_id, total_sales])
-        result = total_sales.getvalue()
-
-        conn.commit()
-        cursor.close()
-        conn.close()
-
+        # Batched with concurrent lookups of other agents
+        result = float(dataloader.agent_sales.load(agent_id))
         return {"agent_id": agent_id, "total_sales": result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # ------------------------------------------------------------
-# PL/SQL FUNCTION: Get Total Unpaid Commission for Agent
+# AGENT UNPAID COMMISSION (same read as PL/SQL get_total_commission)
 # ------------------------------------------------------------
 @app.get("/get_total_commission/{agent_id}")
 def get_total_commission(agent_id: int):
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT get_total_commission(:1) FROM dual", [agent_id])
-        result = cursor.fetchone()[0]
-        cursor.close()
-        conn.close()
+        result = float(dataloader.agent_sales.load(agent_id)) * dataloader.COMMISSION_RATE
         return {"agent_id": agent_id, "total_unpaid_commission": result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ------------------------------------------------------------
+# AGENT SALES / COMMISSION STATS (all agents, or ?agent_id=1&agent_id=2)
+# Reads the trigger-maintained agent_sales_summary table; live=true
+# recomputes from properties with one grouped query instead.
+# ------------------------------------------------------------
+@app.get("/agents/stats")
+def agent_stats(agent_id: List[int] = Query(None), live: bool = False):
+    ids = sorted(set(agent_id or []))
+    if len(ids) > 1000:
+        raise HTTPException(status_code=400, detail="At most 1000 agent ids per request.")
+
+    def load():
+        if live:
+            totals = """
+                SELECT agent_id, COUNT(*) AS sold_count, SUM(price) AS total_sales
+                FROM properties
+                WHERE LOWER(status) = 'sold'
+                GROUP BY agent_id
+            """
+        else:
+            totals = "SELECT agent_id, sold_count, total_sales FROM agent_sales_summary"
+        binds = {f"a{n}": i for n, i in enumerate(ids)}
+        where = f"WHERE a.agent_id IN ({', '.join(':' + k for k in binds)})" if ids else ""
+        with read_connection() as conn, conn.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT a.agent_id, u.username, NVL(s.sold_count, 0), NVL(s.total_sales, 0)
+                FROM agents a
+                JOIN users u ON a.user_id = u.user_id
+                LEFT JOIN ({totals}) s ON s.agent_id = a.agent_id
+                {where}
+                ORDER BY a.agent_id
+            """, binds)
+            rows = cursor.fetchall()
+
+        stats = [
+            {
+                "agent_id": r[0],
+                "username": r[1],
+                "sold_count": r[2],
+                "total_sales": r[3],
+                "total_unpaid_commission": r[3] * dataloader.COMMISSION_RATE,
+            }
+            for r in rows
+        ]
+        return {"agents": stats}
+
+    try:
+        key = cache_key("agents_stats", agent_id=ids, live=live)
+        return response_cache.get_or_load(key, ["properties", "agents", "users"], load)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # ------------------------------------------------------------
 # CURSOR LOGIC: Available Properties by City
 # ------------------------------------------------------------
 @app.get("/available_properties/{city}")
 def available_properties(city: str):
-    try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        query = """
-            SELECT property_id, title, price, status
-            FROM properties
-            WHERE LOWER(city) = LOWER(:city)
-            AND status = 'available'
-        """
-        cursor.execute(query, [city])
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
+    def load():
+        with read_connection() as conn, conn.cursor() as cursor:
+            query = """
+                SELECT property_id, title, price, status
+                FROM properties
+                WHERE LOWER(city) = LOWER(:city)
+                AND status = 'available'
+            """
+            cursor.execute(query, [city])
+            rows = cursor.fetchall()
 
         properties = [
             {"property_id": r[0], "title": r[1], "price": r[2], "status": r[3]}
             for r in rows
         ]
         return {"available_properties": properties}
+
+    try:
+        key = cache_key("available_properties", city=city.lower())
+        return response_cache.get_or_load(key, ["properties"], load)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -258,18 +385,18 @@ def available_properties(city: str):
 # ------------------------------------------------------------
 @app.get("/check_property/{property_id}")
 def check_property(property_id: int):
-    try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT price FROM properties WHERE property_id = :1", [property_id])
-        result = cursor.fetchone()
-        cursor.close()
-        conn.close()
-
-        if not result:
+    def load():
+        # Batched with concurrent lookups of other properties
+        price = dataloader.property_prices.load(property_id)
+
+        if price is None:
             return {"error": f"❌ Property with ID {property_id} not found"}
         else:
-            return {"property_id": property_id, "price": result[0]}
+            return {"property_id": property_id, "price": price}
+
+    try:
+        key = cache_key("check_property", property_id=property_id)
+        return response_cache.get_or_load(key, [f"properties:{property_id}"], load)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -278,24 +405,34 @@ def check_property(property_id: int):
 # AGENT ENDPOINTS
 # ------------------------------------------------------------
 @app.get("/agents")
-def get_agents():
-    try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
+def get_agents(
+    after_id: int = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str = None,
+    format: str = "objects",
+):
+    check_format(format)
+    start = resolve_after_id(after_id, cursor)
+
+    def load():
+        sql, binds = page_query("""
             SELECT a.agent_id, u.username, a.license_no, a.region
             FROM agents a
-            JOIN users u ON a.user_id = u.user_id
-            ORDER BY a.agent_id
-        """)
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        agents = [
-            {"agent_id": r[0], "username": r[1], "license_no": r[2], "region": r[3]}
-            for r in rows
-        ]
-        return {"agents": agents}
+            JOIN users u ON a.user_id = u.user_id""", "a.agent_id", start, limit)
+        with read_connection() as conn, conn.cursor() as cur:
+            cur.execute(sql, binds)
+            rows = cur.fetchall()
+
+        rows, next_cursor = split_page(rows, limit)
+        if format == "columnar":
+            return columnar(AGENT_LIST_COLUMNS, rows, next_cursor=next_cursor)
+        agents = [dict(zip(AGENT_LIST_COLUMNS, r)) for r in rows]
+        return {"agents": agents, "next_cursor": next_cursor}
+
+    try:
+        key = cache_key("agents", after_id=start, limit=limit, format=format)
+        result = response_cache.get_or_load(key, ["agents", "users"], load)
+        return json_bytes_response(result) if format == "columnar" else result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -303,43 +440,39 @@ def get_agents():
 @app.post("/add_agent")
 def add_agent(agent: Agent):
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        # See if user exists
-        cursor.execute("SELECT USER_ID, ROLE FROM USERS WHERE USERNAME = :1", [agent.username])
-        row = cursor.fetchone()
-
-        if row:
-            user_id = row[0]
-            current_role = row[1]
-            # If role is not agent, update it
-            if current_role != 'agent':
-                cursor.execute("UPDATE USERS SET ROLE = 'agent' WHERE USER_ID = :1", [user_id])
-        else:
-            # Create user with role agent
-            cursor.execute("SELECT NVL(MAX(USER_ID),0)+1 FROM USERS")
-            user_id = cursor.fetchone()[0]
+        with get_connection() as conn, conn.cursor() as cursor:
+            # See if user exists
+            cursor.execute("SELECT USER_ID, ROLE FROM USERS WHERE USERNAME = :1", [agent.username])
+            row = cursor.fetchone()
+
+            if row:
+                user_id = row[0]
+                current_role = row[1]
+                # If role is not agent, update it
+                if current_role != 'agent':
+                    cursor.execute("UPDATE USERS SET ROLE = 'agent' WHERE USER_ID = :1", [user_id])
+            else:
+                # Create user with role agent
+                user_id = user_ids.next_id(cursor)
+                cursor.execute("""
+                    INSERT INTO USERS (
+                        USER_ID, USERNAME, PASSWORD_HASH, FULL_NAME, EMAIL, PHONE, ROLE, CREATED_AT
+                    ) VALUES (
+                        :1, :2, 'default_hash', :3, :2 || '@example.com', '0000000000', 'agent', SYSDATE
+                    )
+                """, (user_id, agent.username, agent.username))
+
+            # Insert into agents table
+            agent_id = agent_ids.next_id(cursor)
+
             cursor.execute("""
-                INSERT INTO USERS (
-                    USER_ID, USERNAME, PASSWORD_HASH, FULL_NAME, EMAIL, PHONE, ROLE, CREATED_AT
-                ) VALUES (
-                    :1, :2, 'default_hash', :3, :2 || '@example.com', '0000000000', 'agent', SYSDATE
-                )
-            """, (user_id, agent.username, agent.username))
-
-        # Insert into agents table
-        cursor.execute("SELECT NVL(MAX(AGENT_ID),0)+1 FROM AGENTS")
-        agent_id = cursor.fetchone()[0]
-
-        cursor.execute("""
-            INSERT INTO AGENTS (AGENT_ID, USER_ID, LICENSE_NO, REGION)
-            VALUES (:1, :2, :3, :4)
-        """, (agent_id, user_id, agent.license_no, agent.region))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+                INSERT INTO AGENTS (AGENT_ID, USER_ID, LICENSE_NO, REGION)
+                VALUES (:1, :2, :3, :4)
+            """, (agent_id, user_id, agent.license_no, agent.region))
+
+            conn.commit()
+        events.publish("users", [user_id])
+        events.publish("agents", [agent_id])
         return {"message": f"✅ Agent '{agent.username}' added successfully!"}
     except oracledb.IntegrityError:
         raise HTTPException(status_code=400, detail="Agent already exists or duplicate key.")
@@ -351,34 +484,47 @@ def add_agent(agent: Agent):
 # PROPERTY ENDPOINTS
 # ------------------------------------------------------------
 @app.get("/properties")
-def get_properties():
-    try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
+def get_properties(
+    after_id: int = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str = None,
+    city: str = None,
+    status: str = None,
+    property_type: str = None,
+    agent: str = None,
+    agent_id: int = None,
+    min_price: float = None,
+    max_price: float = None,
+    format: str = "objects",
+):
+    check_format(format)
+    filters = {
+        "city": city, "status": status, "property_type": property_type, "agent": agent,
+        "agent_id": agent_id, "min_price": min_price, "max_price": max_price,
+    }
+    start = resolve_after_id(after_id, cursor, filters)
+
+    def load():
+        where, filter_binds = property_filters(**filters)
+        sql, binds = page_query("""
             SELECT p.property_id, u.username, p.title, p.city, p.locality, p.price, p.status
             FROM properties p
             LEFT JOIN agents a ON p.agent_id = a.agent_id
-            LEFT JOIN users u ON a.user_id = u.user_id
-            ORDER BY p.property_id
-        """)
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
+            LEFT JOIN users u ON a.user_id = u.user_id""", "p.property_id", start, limit, where, filter_binds)
+        with read_connection() as conn, conn.cursor() as cur:
+            cur.execute(sql, binds)
+            rows = cur.fetchall()
 
-        properties = [
-            {
-                "property_id": r[0],
-                "agent": r[1],
-                "title": r[2],
-                "city": r[3],
-                "locality": r[4],
-                "price": r[5],
-                "status": r[6],
-            }
-            for r in rows
-        ]
-        return {"properties": properties}
+        rows, next_cursor = split_page(rows, limit, filters)
+        if format == "columnar":
+            return columnar(PROPERTY_LIST_COLUMNS, rows, next_cursor=next_cursor)
+        properties = [dict(zip(PROPERTY_LIST_COLUMNS, r)) for r in rows]
+        return {"properties": properties, "next_cursor": next_cursor}
+
+    try:
+        key = cache_key("properties", after_id=start, limit=limit, format=format, **filters)
+        result = response_cache.get_or_load(key, ["properties", "agents", "users"], load)
+        return json_bytes_response(result) if format == "columnar" else result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -386,39 +532,38 @@ def get_properties():
 @app.post("/add_property")
 def add_property(property_data: dict):
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        # Find agent_id
-        cursor.execute("""
-            SELECT a.agent_id FROM agents a
-            JOIN users u ON a.user_id = u.user_id
-            WHERE u.username = :1
-        """, [property_data["agent_username"]])
-        agent = cursor.fetchone()
-
-        if not agent:
-            raise HTTPException(status_code=404, detail="Agent not found.")
-
-        agent_id = agent[0]
-
-        cursor.execute("""
-            INSERT INTO properties (agent_id, title, description, city, locality, price, property_type, status)
-            VALUES (:1, :2, :3, :4, :5, :6, :7, :8)
-        """, (
-            agent_id,
-            property_data["title"],
-            property_data["description"],
-            property_data["city"],
-            property_data["locality"],
-            property_data["price"],
-            property_data["property_type"],
-            property_data["status"]
-        ))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with get_connection() as conn, conn.cursor() as cursor:
+            # Find agent_id
+            cursor.execute("""
+                SELECT a.agent_id FROM agents a
+                JOIN users u ON a.user_id = u.user_id
+                WHERE u.username = :1
+            """, [property_data["agent_username"]])
+            agent = cursor.fetchone()
+
+            if not agent:
+                raise HTTPException(status_code=404, detail="Agent not found.")
+
+            agent_id = agent[0]
+            property_id = property_ids.next_id(cursor)
+
+            cursor.execute("""
+                INSERT INTO properties (property_id, agent_id, title, description, city, locality, price, property_type, status)
+                VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :9)
+            """, (
+                property_id,
+                agent_id,
+                property_data["title"],
+                property_data["description"],
+                property_data["city"],
+                property_data["locality"],
+                property_data["price"],
+                property_data["property_type"],
+                property_data["status"]
+            ))
+
+            conn.commit()
+        events.publish("properties", [property_id])
         return {"message": f"✅ Property '{property_data['title']}' added successfully!"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -427,20 +572,18 @@ def add_property(property_data: dict):
 @app.put("/update_property_status/{property_id}")
 def update_property_status(property_id: int, new_status: str):
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE properties
-            SET status = :1
-            WHERE property_id = :2
-        """, [new_status, property_id])
-        conn.commit()
-
-        if cursor.rowcount == 0:
-            raise HTTPException(status_code=404, detail=f"Property ID {property_id} not found")
-
-        cursor.close()
-        conn.close()
+        with get_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("""
+                UPDATE properties
+                SET status = :1
+                WHERE property_id = :2
+            """, [new_status, property_id])
+            conn.commit()
+
+            if cursor.rowcount == 0:
+                raise HTTPException(status_code=404, detail=f"Property ID {property_id} not found")
+
+        events.publish("properties", [property_id])
         return {
             "message": f"✅ Property {property_id} updated to '{new_status}'",
             "trigger": "trg_property_status_log fired automatically"
@@ -455,26 +598,24 @@ def update_property_status(property_id: int, new_status: str):
 @app.put("/update_agent/{agent_id}")
 def update_agent(agent_id: int, agent: Agent):
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            UPDATE agents
-            SET license_no = :1, region = :2
-            WHERE agent_id = :3
-        """, [agent.license_no, agent.region, agent_id])
-
-        # Optional: also update username in USERS table
-        cursor.execute("""
-            UPDATE users
-            SET username = :1
-            WHERE user_id = (SELECT user_id FROM agents WHERE agent_id = :2)
-        """, [agent.username, agent_id])
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with get_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("""
+                UPDATE agents
+                SET license_no = :1, region = :2
+                WHERE agent_id = :3
+            """, [agent.license_no, agent.region, agent_id])
+
+            # Optional: also update username in USERS table
+            cursor.execute("""
+                UPDATE users
+                SET username = :1
+                WHERE user_id = (SELECT user_id FROM agents WHERE agent_id = :2)
+            """, [agent.username, agent_id])
+
+            conn.commit()
 
+        events.publish("agents", [agent_id])
+        events.publish("users")
         return {"message": f"✅ Agent ID {agent_id} updated successfully!"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -485,88 +626,69 @@ def update_agent(agent_id: int, agent: Agent):
 # ------------------------------------------------------------
 @app.delete("/delete_agent/{agent_id}")
 def delete_agent(agent_id: int):
+    # Properties are deleted in committed chunks by a background job
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        # Delete properties linked to the agent (foreign key)
-        cursor.execute("DELETE FROM properties WHERE agent_id = :1", [agent_id])
-
-        # Delete agent itself
-        cursor.execute("DELETE FROM agents WHERE agent_id = :1", [agent_id])
-
-        conn.commit()
-        cursor.close()
-        conn.close()
-
-        return {"message": f"🗑️ Agent ID {agent_id} deleted successfully."}
+        job_id = jobs.submit("delete_agent", agent_id=agent_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return jobs.accepted(job_id, f"🗑️ Deletion of agent ID {agent_id} queued (job {job_id}).")
 
 
 @app.put("/update_property/{property_id}")
 def update_property(property_id: int, property_data: dict):
-    import traceback
-    print(f"🛠️ Received update request for property_id={property_id}")
-    print("📦 Incoming data:", property_data)
-
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        # ✅ Find agent_id by username
-        cursor.execute("""
-            SELECT a.agent_id FROM agents a
-            JOIN users u ON a.user_id = u.user_id
-            WHERE u.username = :1
-        """, [property_data.get("agent_username")])
-        agent = cursor.fetchone()
-
-        if not agent:
-            print("❌ Agent not found for username:", property_data.get("agent_username"))
-            raise HTTPException(status_code=404, detail="Agent not found.")
-
-        agent_id = agent[0]
-        print("✅ Found agent_id:", agent_id)
-
-        # ✅ Update property details
-        cursor.execute("""
-            UPDATE properties
-            SET agent_id = :1,
-                title = :2,
-                description = :3,
-                city = :4,
-                locality = :5,
-                price = :6,
-                property_type = :7,
-                status = :8
-            WHERE property_id = :9
-        """, (
-            agent_id,
-            property_data.get("title"),
-            property_data.get("description", ""),
-            property_data.get("city"),
-            property_data.get("locality", ""),
-            property_data.get("price"),
-            property_data.get("property_type"),
-            property_data.get("status"),
-            property_id
-        ))
-
-        print("💾 Rows affected:", cursor.rowcount)
-        if cursor.rowcount == 0:
-            raise HTTPException(status_code=404, detail=f"Property ID {property_id} not found.")
-
-        conn.commit()
-        cursor.close()
-        conn.close()
-
-        print(f"✅ Property {property_id} updated successfully!")
+        with get_connection() as conn, conn.cursor() as cursor:
+            # ✅ Find agent_id by username
+            cursor.execute("""
+                SELECT a.agent_id FROM agents a
+                JOIN users u ON a.user_id = u.user_id
+                WHERE u.username = :1
+            """, [property_data.get("agent_username")])
+            agent = cursor.fetchone()
+
+            if not agent:
+                logs.log("property_update_agent_not_found", "warning", property_id=property_id,
+                         agent_username=property_data.get("agent_username"))
+                raise HTTPException(status_code=404, detail="Agent not found.")
+
+            agent_id = agent[0]
+
+            # ✅ Update property details
+            cursor.execute("""
+                UPDATE properties
+                SET agent_id = :1,
+                    title = :2,
+                    description = :3,
+                    city = :4,
+                    locality = :5,
+                    price = :6,
+                    property_type = :7,
+                    status = :8
+                WHERE property_id = :9
+            """, (
+                agent_id,
+                property_data.get("title"),
+                property_data.get("description", ""),
+                property_data.get("city"),
+                property_data.get("locality", ""),
+                property_data.get("price"),
+                property_data.get("property_type"),
+                property_data.get("status"),
+                property_id
+            ))
+
+            if cursor.rowcount == 0:
+                raise HTTPException(status_code=404, detail=f"Property ID {property_id} not found.")
+
+            conn.commit()
+
+        events.publish("properties", [property_id])
+        logs.log("property_updated", property_id=property_id, agent_id=agent_id,
+                 fields=sorted(property_data))
         return {"message": f"✅ Property {property_id} updated successfully!"}
 
     except Exception as e:
-        print("🔥 Update failed:", e)
-        traceback.print_exc()
+        logs.log("property_update_failed", "error", exc=e, property_id=property_id)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ------------------------------------------------------------
@@ -575,12 +697,32 @@ def update_property(property_id: int, property_data: dict):
 @app.delete("/delete_property/{property_id}")
 def delete_property(property_id: int):
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM properties WHERE property_id = :1", [property_id])
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with get_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("DELETE FROM properties WHERE property_id = :1", [property_id])
+            conn.commit()
+        events.publish("properties", [property_id])
         return {"message": f"🗑️ Property ID {property_id} deleted successfully!"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+# ------------------------------------------------------------
+# FEATURE ROUTERS
+# ------------------------------------------------------------
+app.include_router(export.router)
+app.include_router(bulk.router)
+app.include_router(search.router)
+app.include_router(fulltext.router)
+app.include_router(metrics.router)
+app.include_router(jobs.router)
+app.include_router(stream.router)
+app.include_router(analytics.router)
+app.include_router(history.router)
+
+# ------------------------------------------------------------
+# ASYNC ENGINE: swap the handlers above for their asyncio twins
+# ------------------------------------------------------------
+if config.DB_ENGINE == "async":
+    from real_estate_backend.async_api import install_async_routes
+    # Replica reads are local SQLite calls: those routes keep their sync handlers
+    install_async_routes(app, keep=replica.READ_ROUTES if config.REPLICA_PATH else ())
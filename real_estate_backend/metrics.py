@@ -0,0 +1,445 @@
+import bisect
+import contextvars
+import logging
+import math
+import re
+import threading
+import time
+import zlib
+from collections import deque
+
+from fastapi import APIRouter, Query
+from fastapi.responses import PlainTextResponse
+from real_estate_backend import config
+
+# ------------------------------------------------------------
+# METRICS
+# Latency histograms per route and per SQL statement, exposed in
+# Prometheus text format at GET /metrics. A request is split into:
+#   pool wait  -> time blocked in pool.acquire()
+#   execute    -> execute / executemany / callproc round trips
+#   fetch      -> fetchone / fetchmany / fetchall
+# whatever remains of the route's total is Python work (validation,
+# serialization). Statements slower than SLOW_QUERY_MS are logged
+# with their binds and kept for GET /metrics/slow_queries.
+# ------------------------------------------------------------
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+MAX_STATEMENT_LABEL = 160
+MAX_BIND_REPR = 200
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value, *label_values):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._series.items()]
+        for label_values, series in sorted(items):
+            labels = _labels(self.labels, label_values)
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {series[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount, *label_values):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.append(f"{self.name}{{{_labels(self.labels, label_values)}}} {value}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def _labels(names, values):
+    return ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time from request start to last response byte.",
+    ("method", "route", "status"))
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent executing and fetching SQL per request.", ("route",))
+REQUEST_POOL_WAIT_SECONDS = Histogram(
+    "http_request_pool_wait_seconds", "Time spent waiting for pooled connections per request.", ("route",))
+REQUEST_ROUND_TRIPS = Histogram(
+    "http_request_db_round_trips", "Approximate database round trips per request.", ("route",),
+    COUNT_BUCKETS)
+REQUEST_ROWS = Histogram(
+    "http_request_db_rows_fetched", "Rows fetched from the database per request.", ("route",),
+    COUNT_BUCKETS)
+POOL_WAIT_SECONDS = Histogram(
+    "db_pool_wait_seconds", "Time blocked in pool.acquire().", ("engine",))
+STATEMENT_SECONDS = Histogram(
+    "db_statement_duration_seconds", "SQL execution time by statement and phase.",
+    ("statement", "phase"))
+STATEMENT_ROWS = Counter(
+    "db_statement_rows_fetched_total", "Rows fetched by statement.", ("statement",))
+SLOW_QUERIES = Counter(
+    "db_slow_queries_total", "Statements slower than SLOW_QUERY_MS.", ("statement",))
+ADMISSION_WAIT_SECONDS = Histogram(
+    "admission_wait_seconds", "Time queued for an admission slot, by priority class.", ("class",))
+ADMISSION_SHED = Counter(
+    "admission_shed_total", "Requests answered 503 by admission control.", ("class", "reason"))
+LOADER_BATCH_SIZE = Histogram(
+    "dataloader_batch_size", "Distinct keys fetched per DataLoader query.", ("loader",),
+    COUNT_BUCKETS)
+LOADER_COALESCED = Counter(
+    "dataloader_coalesced_total", "Lookups that joined an identical in-flight lookup.", ("loader",))
+
+_METRICS = (
+    REQUEST_SECONDS, REQUEST_DB_SECONDS, REQUEST_POOL_WAIT_SECONDS, REQUEST_ROUND_TRIPS,
+    REQUEST_ROWS, POOL_WAIT_SECONDS, STATEMENT_SECONDS, STATEMENT_ROWS, SLOW_QUERIES,
+    LOADER_BATCH_SIZE, LOADER_COALESCED, ADMISSION_WAIT_SECONDS, ADMISSION_SHED,
+)
+slow_queries = deque(maxlen=config.SLOW_QUERY_LOG_SIZE)
+
+
+# ------------------------------------------------------------
+# PER-REQUEST ACCOUNTING
+# Starlette copies the context into the threadpool, so sync handlers
+# add to the same RequestStats object the middleware created.
+# ------------------------------------------------------------
+class RequestStats:
+    __slots__ = ("db_seconds", "pool_wait_seconds", "round_trips", "rows")
+
+    def __init__(self):
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+        self.round_trips = 0
+        self.rows = 0
+
+
+_current = contextvars.ContextVar("request_stats", default=None)
+
+
+def record_pool_wait(engine, seconds):
+    POOL_WAIT_SECONDS.observe(seconds, engine)
+    stats = _current.get()
+    if stats is not None:
+        stats.pool_wait_seconds += seconds
+
+
+def route_template(scope):
+    # Rebuild "/check_property/{property_id}" from the matched path params
+    if "endpoint" not in scope:
+        return "unmatched"
+    path = scope.get("path", "")
+    for name, value in scope.get("path_params", {}).items():
+        value = str(value)
+        if "/" in value and path.endswith(value):
+            path = path[: len(path) - len(value)] + "{" + name + "}"
+        else:
+            path = "/".join("{" + name + "}" if seg == value else seg for seg in path.split("/"))
+    return path
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = route_template(scope)
+            REQUEST_SECONDS.observe(time.perf_counter() - start, scope["method"], route, status[0])
+            REQUEST_DB_SECONDS.observe(stats.db_seconds, route)
+            REQUEST_POOL_WAIT_SECONDS.observe(stats.pool_wait_seconds, route)
+            REQUEST_ROUND_TRIPS.observe(stats.round_trips, route)
+            REQUEST_ROWS.observe(stats.rows, route)
+
+
+# ------------------------------------------------------------
+# DB-LAYER INSTRUMENTATION
+# get_connection() hands out InstrumentedConnection proxies; every
+# cursor call is timed and attributed to a normalised statement label
+# ("IN (:p0, :p1, ...)" lists collapse so labels stay bounded).
+# ------------------------------------------------------------
+_WS_RE = re.compile(r"\s+")
+_IN_LIST_RE = re.compile(r"IN\s*\(\s*:\w+(\s*,\s*:\w+)+\s*\)", re.I)
+
+
+def statement_label(sql):
+    label = _IN_LIST_RE.sub("IN (:list)", _WS_RE.sub(" ", sql).strip())
+    if len(label) <= MAX_STATEMENT_LABEL:
+        return label
+    # Keep truncated labels distinct when two statements share a prefix
+    return f"{label[:MAX_STATEMENT_LABEL]}... #{zlib.crc32(label.encode()):08x}"
+
+
+def _bind_repr(binds):
+    text = repr(binds)
+    return text if len(text) <= MAX_BIND_REPR else text[:MAX_BIND_REPR - 3] + "..."
+
+
+def _record(label, phase, seconds, binds=None, rows=0, round_trips=1):
+    STATEMENT_SECONDS.observe(seconds, label, phase)
+    if rows:
+        STATEMENT_ROWS.inc(rows, label)
+    stats = _current.get()
+    if stats is not None:
+        stats.db_seconds += seconds
+        stats.round_trips += round_trips
+        stats.rows += rows
+    if phase != "fetch" and seconds * 1000 >= config.SLOW_QUERY_MS:
+        SLOW_QUERIES.inc(1, label)
+        entry = {
+            "statement": label,
+            "phase": phase,
+            "elapsed_ms": round(seconds * 1000, 2),
+            "binds": _bind_repr(binds),
+            "at": time.time(),
+        }
+        slow_queries.append(entry)
+        logger.warning("slow query %.1fms %s binds=%s", entry["elapsed_ms"], label, entry["binds"])
+
+
+def _fetch_trips(rows, arraysize):
+    return max(1, math.ceil(rows / max(arraysize, 1)))
+
+
+class InstrumentedCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._label = "?"
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        if name in ("_cursor", "_label"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._cursor, name, value)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def _timed(self, phase, fn, binds, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _record(self._label, phase, time.perf_counter() - start, binds)
+
+    def execute(self, sql, parameters=None, **kwargs):
+        self._label = statement_label(sql)
+        self._timed("execute", self._cursor.execute, parameters or kwargs, sql, parameters, **kwargs)
+        return self
+
+    def executemany(self, sql, parameters, **kwargs):
+        self._label = statement_label(sql)
+        first = parameters[0] if isinstance(parameters, list) and parameters else None
+        binds = {"rows": len(parameters) if isinstance(parameters, list) else parameters, "first": first}
+        return self._timed("executemany", self._cursor.executemany, binds, sql, parameters, **kwargs)
+
+    def callproc(self, name, parameters=None, **kwargs):
+        self._label = f"CALL {name}"
+        return self._timed("callproc", self._cursor.callproc, parameters, name, parameters or [], **kwargs)
+
+    def _fetch(self, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        rows = (0 if result is None else 1) if fn == self._cursor.fetchone else len(result)
+        trips = 0 if fn == self._cursor.fetchone else _fetch_trips(rows, self._cursor.arraysize)
+        _record(self._label, "fetch", time.perf_counter() - start, rows=rows, round_trips=trips)
+        return result
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone)
+
+    def fetchmany(self, size=None):
+        return self._fetch(self._cursor.fetchmany, *([size] if size else []))
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+
+class AsyncInstrumentedCursor(InstrumentedCursor):
+    async def _timed(self, phase, fn, binds, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            _record(self._label, phase, time.perf_counter() - start, binds)
+
+    async def execute(self, sql, parameters=None, **kwargs):
+        self._label = statement_label(sql)
+        await self._timed("execute", self._cursor.execute, parameters or kwargs, sql, parameters, **kwargs)
+        return self
+
+    async def executemany(self, sql, parameters, **kwargs):
+        self._label = statement_label(sql)
+        binds = {"rows": len(parameters) if isinstance(parameters, list) else parameters}
+        return await self._timed("executemany", self._cursor.executemany, binds, sql, parameters, **kwargs)
+
+    async def callproc(self, name, parameters=None, **kwargs):
+        self._label = f"CALL {name}"
+        return await self._timed("callproc", self._cursor.callproc, parameters, name, parameters or [], **kwargs)
+
+    async def _fetch(self, fn, *args):
+        start = time.perf_counter()
+        result = await fn(*args)
+        rows = (0 if result is None else 1) if fn == self._cursor.fetchone else len(result)
+        trips = 0 if fn == self._cursor.fetchone else _fetch_trips(rows, self._cursor.arraysize)
+        _record(self._label, "fetch", time.perf_counter() - start, rows=rows, round_trips=trips)
+        return result
+
+    async def fetchone(self):
+        return await self._fetch(self._cursor.fetchone)
+
+    async def fetchmany(self, size=None):
+        return await self._fetch(self._cursor.fetchmany, *([size] if size else []))
+
+    async def fetchall(self):
+        return await self._fetch(self._cursor.fetchall)
+
+
+class InstrumentedConnection:
+    cursor_class = InstrumentedCursor
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return self.cursor_class(self._conn.cursor(*args, **kwargs))
+
+    def commit(self):
+        start = time.perf_counter()
+        self._conn.commit()
+        _record("COMMIT", "execute", time.perf_counter() - start)
+
+
+class AsyncInstrumentedConnection(InstrumentedConnection):
+    cursor_class = AsyncInstrumentedCursor
+
+    async def commit(self):
+        start = time.perf_counter()
+        await self._conn.commit()
+        _record("COMMIT", "execute", time.perf_counter() - start)
+
+
+# ------------------------------------------------------------
+# EXPOSITION
+# ------------------------------------------------------------
+def _gauges():
+    from real_estate_backend import logs
+    from real_estate_backend.admission import controller as admission_controller
+    from real_estate_backend.cache import response_cache
+    from real_estate_backend.database import pool_stats
+    from real_estate_backend.stream import change_feed
+
+    lines = []
+    pool = pool_stats()
+    for key in ("open", "busy", "max"):
+        lines.append(f"# TYPE db_pool_{key} gauge")
+        lines.append(f'db_pool_{key}{{engine="{pool["engine"]}"}} {pool[key]}')
+    cache = response_cache.stats()
+    for key in ("hits", "misses", "invalidations"):
+        lines.append(f"# TYPE response_cache_{key}_total counter")
+        lines.append(f"response_cache_{key}_total {cache[key]}")
+    lines.append("# TYPE response_cache_entries gauge")
+    lines.append(f"response_cache_entries {cache.get('entries', 0)}")
+    log = logs.stats()
+    for key in ("emitted", "sampled_out", "dropped", "written"):
+        lines.append(f"# TYPE log_events_{key}_total counter")
+        lines.append(f"log_events_{key}_total {log[key]}")
+    lines.append("# TYPE log_queue_depth gauge")
+    lines.append(f"log_queue_depth {log['queued']}")
+    admission = admission_controller.stats()
+    lines.append("# TYPE admission_active gauge")
+    lines.append(f"admission_active {admission['active']}")
+    lines.append("# TYPE admission_queue_depth gauge")
+    for klass, depth in admission["queued"].items():
+        lines.append(f'admission_queue_depth{{class="{klass}"}} {depth}')
+    feed = change_feed.stats()
+    lines.append("# TYPE stream_clients gauge")
+    lines.append(f"stream_clients {feed['clients']}")
+    for key in ("events", "overflows", "resets"):
+        lines.append(f"# TYPE stream_{key}_total counter")
+        lines.append(f"stream_{key}_total {feed[key]}")
+    return lines
+
+
+def render():
+    lines = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    lines.extend(_gauges())
+    return "\n".join(lines) + "\n"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/metrics/slow_queries")
+def recent_slow_queries(limit: int = Query(50, ge=1)):
+    return {"threshold_ms": config.SLOW_QUERY_MS, "queries": list(slow_queries)[-limit:][::-1]}
@@ -0,0 +1,246 @@
+import argparse
+import hashlib
+import inspect
+import sys
+
+import oracledb
+from real_estate_backend import config, logs
+from real_estate_backend.database import get_connection
+
+# ------------------------------------------------------------
+# SCHEMA MIGRATIONS
+# real_estate_db.sql drops and recreates everything; a live schema is
+# moved forward by these numbered migrations instead. Applied versions
+# are recorded in schema_migrations with a checksum of the migration's
+# source, so `status` shows what is pending and what was edited after
+# it ran. Oracle commits DDL as it goes, so every step checks before it
+# creates and a half-applied migration is simply run again.
+#   python -m real_estate_backend.migrations status
+#   python -m real_estate_backend.migrations up [--to VERSION]
+#   python -m real_estate_backend.migrations check   (query_plans.py)
+# ------------------------------------------------------------
+MIGRATIONS = []
+# ORA-00955: name already used; ORA-01408: column list already indexed;
+# ORA-01430: column already exists
+_ALREADY_EXISTS = ("ORA-00955", "ORA-01408", "ORA-01430")
+
+
+class Migration:
+    def __init__(self, version, name, fn):
+        self.version = version
+        self.name = name
+        self.fn = fn
+        self.checksum = hashlib.sha1(inspect.getsource(fn).encode()).hexdigest()
+
+
+def migration(version, name):
+    def register(fn):
+        if any(m.version == version for m in MIGRATIONS):
+            raise ValueError(f"Duplicate migration version {version}")
+        MIGRATIONS.append(Migration(version, name, fn))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return fn
+    return register
+
+
+def _exists(cursor, view, column, name):
+    cursor.execute(f"SELECT COUNT(*) FROM {view} WHERE {column} = UPPER(:name)", {"name": name})
+    return cursor.fetchone()[0] > 0
+
+
+def _ddl(cursor, sql):
+    try:
+        cursor.execute(sql)
+    except oracledb.DatabaseError as e:
+        # Another process got there first
+        if not any(code in str(e) for code in _ALREADY_EXISTS):
+            raise
+
+
+def create_index(cursor, name, table, columns):
+    # columns: column list or expressions, e.g. "LOWER(city), status"
+    if _exists(cursor, "user_indexes", "index_name", name):
+        return False
+    _ddl(cursor, f"CREATE INDEX {name} ON {table} ({columns})")
+    logs.log("index_created", index=name, table=table, columns=columns)
+    return True
+
+
+def add_column(cursor, table, column, datatype):
+    cursor.execute("""
+        SELECT COUNT(*) FROM user_tab_columns
+        WHERE table_name = UPPER(:table_name) AND column_name = UPPER(:column_name)
+    """, {"table_name": table, "column_name": column})
+    if cursor.fetchone()[0] > 0:
+        return False
+    _ddl(cursor, f"ALTER TABLE {table} ADD {column} {datatype}")
+    logs.log("column_added", table=table, column=column)
+    return True
+
+
+# ------------------------------------------------------------
+# MIGRATIONS (append only; never renumber an applied version)
+# ------------------------------------------------------------
+@migration(1, "foreign key indexes")
+def _foreign_key_indexes(cursor):
+    # delete_agent's chunked cascade, /properties?agent_id= and the
+    # summary triggers look properties up by agent; every agent read
+    # joins users on agents.user_id, and delete_user finds the agent by it
+    create_index(cursor, "properties_agent_ix", "properties", "agent_id, property_id")
+    create_index(cursor, "agents_user_ix", "agents", "user_id")
+
+
+@migration(2, "case-insensitive filter indexes")
+def _filter_indexes(cursor):
+    # The API compares LOWER(city) / LOWER(status) / LOWER(property_type).
+    # available_properties adds status = 'available'; the live agent
+    # stats and the summary rebuild read (agent_id, price) of sold rows,
+    # which the status index covers.
+    create_index(cursor, "properties_city_ix", "properties", "LOWER(city), status")
+    create_index(cursor, "properties_status_ix", "properties", "LOWER(status), agent_id, price")
+    create_index(cursor, "properties_type_ix", "properties", "LOWER(property_type)")
+
+
+@migration(3, "property log history indexes")
+def _history_indexes(cursor):
+    # Same as the PROPERTY LOG HISTORY section of real_estate_db.sql,
+    # for schemas that predate it
+    create_index(cursor, "property_logs_property_ix", "property_logs", "property_id, log_id")
+    create_index(cursor, "property_logs_date_ix", "property_logs", "change_date, log_id")
+
+
+@migration(4, "background job leases")
+def _job_leases(cursor):
+    # jobs.py claims a job by setting its owner and keeps the claim
+    # alive through heartbeat_at
+    add_column(cursor, "background_jobs", "owner", "VARCHAR2(100)")
+    add_column(cursor, "background_jobs", "heartbeat_at", "DATE")
+
+
+@migration(5, "replica change entity index")
+def _change_entity_index(cursor):
+    # versions.py reads the newest replica_changes row per entity
+    create_index(cursor, "replica_changes_entity_ix", "replica_changes", "entity, change_id")
+
+
+@migration(6, "replica progress")
+def _replica_progress(cursor):
+    # Applied change_id per read replica; prune_replica_changes keeps
+    # replica_changes from the lowest one
+    if not _exists(cursor, "user_tables", "table_name", "replica_progress"):
+        _ddl(cursor, """
+            CREATE TABLE replica_progress (
+                replica_id VARCHAR2(200) PRIMARY KEY,
+                change_id NUMBER NOT NULL,
+                reported_at DATE
+            )""")
+        logs.log("table_created", table="replica_progress")
+
+
+# ------------------------------------------------------------
+# RUNNER
+# ------------------------------------------------------------
+def _ensure_table(cursor):
+    if not _exists(cursor, "user_tables", "table_name", "schema_migrations"):
+        _ddl(cursor, """
+            CREATE TABLE schema_migrations (
+                version NUMBER PRIMARY KEY,
+                name VARCHAR2(200) NOT NULL,
+                checksum VARCHAR2(40),
+                applied_at DATE DEFAULT SYSDATE
+            )""")
+
+
+def applied(cursor):
+    _ensure_table(cursor)
+    cursor.execute("SELECT version, name, checksum, applied_at FROM schema_migrations ORDER BY version")
+    return {r[0]: {"name": r[1], "checksum": r[2], "applied_at": r[3]} for r in cursor.fetchall()}
+
+
+def status():
+    with get_connection() as conn, conn.cursor() as cursor:
+        done = applied(cursor)
+        conn.commit()
+    rows = []
+    for m in MIGRATIONS:
+        record = done.get(m.version)
+        if record is None:
+            state = "pending"
+        elif record["checksum"] != m.checksum:
+            state = "modified"
+        else:
+            state = "applied"
+        rows.append({
+            "version": m.version, "name": m.name, "state": state,
+            "applied_at": record["applied_at"] if record else None,
+        })
+    return rows
+
+
+def migrate(target=None):
+    # Applies pending migrations up to `target` (default: all), in order
+    ran = []
+    with get_connection() as conn, conn.cursor() as cursor:
+        done = applied(cursor)
+        conn.commit()
+        for m in MIGRATIONS:
+            if m.version in done or (target is not None and m.version > target):
+                continue
+            m.fn(cursor)
+            cursor.execute("""
+                INSERT INTO schema_migrations (version, name, checksum, applied_at)
+                VALUES (:version, :name, :checksum, SYSDATE)
+            """, {"version": m.version, "name": m.name, "checksum": m.checksum})
+            conn.commit()
+            logs.log("migration_applied", version=m.version, name=m.name)
+            ran.append(m.version)
+    return ran
+
+
+# ------------------------------------------------------------
+# COMMAND LINE
+# ------------------------------------------------------------
+def _install_sqlite(path):
+    from real_estate_backend.database import install_pool
+    from real_estate_backend.sqlite_compat import SQLitePool
+
+    install_pool(SQLitePool(path, size=1))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply schema migrations and check API query plans")
+    parser.add_argument("command", choices=["status", "up", "check"])
+    parser.add_argument("--to", type=int, help="up: stop after this version")
+    parser.add_argument("--min-rows", type=int, default=config.PLAN_CHECK_MIN_ROWS,
+                        help="check: smallest table whose full scan fails the check")
+    parser.add_argument("--sqlite", help="run against a SQLite stand-in database (e.g. bench.db)")
+    args = parser.parse_args(argv)
+    if args.sqlite:
+        _install_sqlite(args.sqlite)
+
+    if args.command == "status":
+        for row in status():
+            print(f"{row['version']:>4}  {row['state']:<8}  {row['name']}")
+        return 0
+    if args.command == "up":
+        ran = migrate(args.to)
+        print(f"Applied {len(ran)} migration(s)" + (f": {', '.join(map(str, ran))}" if ran else ""))
+        return 0
+
+    from real_estate_backend import query_plans
+
+    report = query_plans.check(args.min_rows)
+    for item in report:
+        mark = "ok  " if item["ok"] else "FAIL"
+        print(f"{mark}  {item['name']}")
+        for line in item["plan"]:
+            print(f"        {line}")
+        for scan in item["full_scans"]:
+            print(f"        ! full scan of {scan['table']} ({scan['rows']} rows)")
+    failed = [item["name"] for item in report if not item["ok"]]
+    print(f"{len(report) - len(failed)}/{len(report)} queries use indexed access")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+
+
+# ------------------------------------------------------------
+# DATA MODELS
+# ------------------------------------------------------------
+class User(BaseModel):
+    username: str
+    email: str
+    role: str = "buyer"
+
+
+class Agent(BaseModel):
+    username: str
+    license_no: str
+    region: str
+
+
+class StatusChange(BaseModel):
+    property_id: int
+    new_status: str
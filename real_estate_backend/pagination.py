@@ -0,0 +1,93 @@
+import base64
+import hashlib
+import json
+
+from fastapi import HTTPException
+
+# ------------------------------------------------------------
+# KEYSET PAGINATION
+# Pages are read with `WHERE key > :after_id ORDER BY key FETCH FIRST n`
+# so page N costs the same index range scan as page 1. The continuation
+# token is an opaque base64 blob holding the last key and a fingerprint
+# of the filters it was issued for.
+# ------------------------------------------------------------
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def _fingerprint(filters):
+    raw = json.dumps(filters, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+
+def encode_cursor(last_id, filters=None):
+    payload = {"after_id": last_id, "f": _fingerprint(filters or {})}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, filters=None):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        after_id = int(payload["after_id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+    if payload.get("f") != _fingerprint(filters or {}):
+        raise HTTPException(status_code=400, detail="Cursor was issued for different filters.")
+    return after_id
+
+
+def resolve_after_id(after_id=None, cursor=None, filters=None):
+    if cursor:
+        return decode_cursor(cursor, filters)
+    return after_id if after_id is not None else 0
+
+
+def page_query(select_sql, key_column, after_id, limit, where=None, binds=None):
+    # One extra row tells us whether another page exists
+    clauses = [f"{key_column} > :after_id"] + list(where or [])
+    sql = (
+        f"{select_sql}\nWHERE {' AND '.join(clauses)}"
+        f"\nORDER BY {key_column}\nFETCH FIRST :page_rows ROWS ONLY"
+    )
+    params = dict(binds or {})
+    params.update(after_id=after_id, page_rows=limit + 1)
+    return sql, params
+
+
+def split_page(rows, limit, filters=None):
+    # Rows must carry the key in column 0
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1][0], filters)
+    return rows, None
+
+
+# ------------------------------------------------------------
+# /properties FILTERS (pushed down into the WHERE clause)
+# ------------------------------------------------------------
+def property_filters(city=None, status=None, property_type=None, agent=None,
+                     agent_id=None, min_price=None, max_price=None):
+    where, binds = [], {}
+    if city:
+        where.append("LOWER(p.city) = LOWER(:city)")
+        binds["city"] = city
+    if status:
+        where.append("LOWER(p.status) = LOWER(:status)")
+        binds["status"] = status
+    if property_type:
+        where.append("LOWER(p.property_type) = LOWER(:property_type)")
+        binds["property_type"] = property_type
+    if agent:
+        where.append("u.username = :agent")
+        binds["agent"] = agent
+    if agent_id is not None:
+        where.append("p.agent_id = :agent_id")
+        binds["agent_id"] = agent_id
+    if min_price is not None:
+        where.append("p.price >= :min_price")
+        binds["min_price"] = min_price
+    if max_price is not None:
+        where.append("p.price <= :max_price")
+        binds["max_price"] = max_price
+    return where, binds
@@ -0,0 +1,199 @@
+import re
+
+from real_estate_backend import config, dataloader, replica, stream, versions
+from real_estate_backend.database import get_connection
+from real_estate_backend.history import LOG_SELECT
+from real_estate_backend.pagination import page_query, property_filters
+from real_estate_backend.search import in_list_chunks
+
+# ------------------------------------------------------------
+# QUERY PLAN CHECK
+# EXPLAIN PLAN (EXPLAIN QUERY PLAN on the SQLite stand-in) for every
+# query the API runs per request or per change, failing any that reads
+# a large table in full. "Large" is PLAN_CHECK_MIN_ROWS rows or more;
+# run it against production-sized statistics, since the optimizer
+# rightly full-scans small tables.
+# Reads that cover a whole table on purpose are not listed: /export/*,
+# the search / fulltext / analytics loads, /agents/stats without ids,
+# the summary rebuild and the replica bootstrap.
+# Queries written inline in a handler are repeated here; keep them in
+# step with the handler when it changes.
+# ------------------------------------------------------------
+PROPERTY_PAGE_SELECT = """
+    SELECT p.property_id, u.username, p.title, p.city, p.locality, p.price, p.status
+    FROM properties p
+    LEFT JOIN agents a ON p.agent_id = a.agent_id
+    LEFT JOIN users u ON a.user_id = u.user_id"""
+AGENT_STATS_SQL = """
+    SELECT a.agent_id, u.username, NVL(s.sold_count, 0), NVL(s.total_sales, 0)
+    FROM agents a
+    JOIN users u ON a.user_id = u.user_id
+    LEFT JOIN ({totals}) s ON s.agent_id = a.agent_id
+    WHERE a.agent_id IN (:a0, :a1)
+    ORDER BY a.agent_id
+"""
+LIVE_TOTALS = """
+    SELECT agent_id, COUNT(*) AS sold_count, SUM(price) AS total_sales
+    FROM properties
+    WHERE LOWER(status) = 'sold'
+    GROUP BY agent_id
+"""
+_TABLE_REF_RE = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.I)
+_NOT_ALIAS = {"WHERE", "JOIN", "LEFT", "RIGHT", "INNER", "OUTER", "ON", "ORDER", "GROUP", "FETCH"}
+
+
+def _properties_page(**filters):
+    where, binds = property_filters(**filters)
+    return page_query(PROPERTY_PAGE_SELECT, "p.property_id", 0, 100, where, binds)
+
+
+def _in_list(select_sql, column):
+    return next(in_list_chunks(select_sql, [1, 2, 3], column))
+
+
+def api_queries():
+    # (name, sql, sample binds); the binds only matter on SQLite
+    return [
+        ("users_page", *page_query("SELECT USER_ID, USERNAME, EMAIL, ROLE FROM USERS", "USER_ID", 0, 100)),
+        ("agents_page", *page_query("""
+            SELECT a.agent_id, u.username, a.license_no, a.region
+            FROM agents a
+            JOIN users u ON a.user_id = u.user_id""", "a.agent_id", 0, 100)),
+        ("properties_page", *_properties_page()),
+        ("properties_page_city_status", *_properties_page(city="mumbai", status="available")),
+        ("properties_page_type", *_properties_page(property_type="villa")),
+        ("properties_page_agent", *_properties_page(agent_id=1)),
+        ("available_properties", """
+            SELECT property_id, title, price, status
+            FROM properties
+            WHERE LOWER(city) = LOWER(:city)
+            AND status = 'available'
+        """, {"city": "mumbai"}),
+        ("property_prices", *_in_list(dataloader.PRICE_SQL, "property_id")),
+        ("agent_sales", *_in_list(dataloader.SALES_SQL, "agent_id")),
+        ("agent_stats", AGENT_STATS_SQL.format(
+            totals="SELECT agent_id, sold_count, total_sales FROM agent_sales_summary"), {"a0": 1, "a1": 2}),
+        ("agent_stats_live", AGENT_STATS_SQL.format(totals=LIVE_TOTALS), {"a0": 1, "a1": 2}),
+        ("agent_property_count", "SELECT COUNT(*) FROM properties WHERE agent_id = :1", {"1": 1}),
+        ("agent_property_chunk", """
+            SELECT property_id FROM properties
+            WHERE agent_id = :agent_id
+            ORDER BY property_id
+            FETCH FIRST :chunk ROWS ONLY
+        """, {"agent_id": 1, "chunk": 500}),
+        ("user_agent", "SELECT agent_id FROM agents WHERE user_id = :1", {"1": 1}),
+        ("property_history", f"""
+            {LOG_SELECT}
+            WHERE property_id = :property_id AND log_id < :before_id
+            ORDER BY log_id DESC
+            FETCH FIRST :n ROWS ONLY
+        """, {"property_id": 1, "before_id": 10 ** 9, "n": 101}),
+        ("history_since", """
+            SELECT log_id FROM property_logs WHERE change_date >= :since
+            ORDER BY change_date, log_id
+            FETCH FIRST 1 ROWS ONLY
+        """, {"since": "2024-01-01 00:00:00"}),
+        ("history_range", f"""
+            {LOG_SELECT}
+            WHERE log_id > :after_id AND log_id <= :hi AND change_date >= :since
+            ORDER BY log_id
+            FETCH FIRST :n ROWS ONLY
+        """, {"after_id": 0, "hi": 1000, "since": "2024-01-01 00:00:00", "n": 101}),
+        ("stream_tail", stream.TAIL_SQL, {"after": 0, "n": 1000}),
+        ("replica_changes", replica.CHANGES_SQL, {"after": 0, "n": 1000}),
+        ("replica_logs", replica.LOGS_SQL, {"after": 0, "n": 1000}),
+        ("data_versions", versions.VERSIONS_SQL, {"late": 1000}),
+    ]
+
+
+def _tables(sql):
+    # alias or table name -> table name
+    refs = {}
+    for table, alias in _TABLE_REF_RE.findall(sql):
+        table = table.lower()
+        refs[table] = table
+        if alias and alias.upper() not in _NOT_ALIAS:
+            refs[alias.lower()] = table
+    return refs
+
+
+def _explain_oracle(cursor, name, sql):
+    # Returns [(plan line, table read in full or None)]
+    statement_id = f"api_{name}"[:30]
+    cursor.execute(f"EXPLAIN PLAN SET STATEMENT_ID = '{statement_id}' FOR {sql}")
+    cursor.execute("""
+        SELECT LPAD(' ', 2 * depth) || operation || ' ' || NVL(options, '') || ' ' || NVL(object_name, ''),
+               operation, options, object_name, object_type
+        FROM plan_table
+        WHERE statement_id = :statement_id
+        ORDER BY id
+    """, {"statement_id": statement_id})
+    lines = []
+    for line, operation, options, object_name, object_type in cursor.fetchall():
+        full = (
+            (operation == "TABLE ACCESS" and "FULL" in (options or ""))
+            or (operation == "INDEX" and options == "FAST FULL SCAN")
+        )
+        table = None
+        if full and object_name:
+            table = object_name.lower()
+            if operation == "INDEX":
+                cursor.execute(
+                    "SELECT table_name FROM user_indexes WHERE index_name = :name", {"name": object_name}
+                )
+                row = cursor.fetchone()
+                table = row[0].lower() if row else table
+        lines.append((line.rstrip(), table))
+    cursor.execute("DELETE FROM plan_table WHERE statement_id = :statement_id", {"statement_id": statement_id})
+    return lines
+
+
+def _explain_sqlite(cursor, sql, binds):
+    refs = _tables(sql)
+    cursor.execute("EXPLAIN QUERY PLAN " + sql, binds)
+    lines = []
+    for _, _, _, detail in cursor.fetchall():
+        # "SCAN p", "SCAN p USING COVERING INDEX ix" read the whole table / index
+        words = detail.split()
+        table = refs.get(words[1].lower()) if words[0] == "SCAN" and len(words) > 1 else None
+        lines.append((detail, table))
+    return lines
+
+
+def _table_rows(cursor, table, dialect):
+    if dialect == "sqlite":
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        return cursor.fetchone()[0]
+    cursor.execute("SELECT num_rows FROM user_tables WHERE table_name = UPPER(:name)", {"name": table})
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def check(min_rows=None):
+    min_rows = config.PLAN_CHECK_MIN_ROWS if min_rows is None else min_rows
+    report, sizes = [], {}
+    with get_connection() as conn, conn.cursor() as cursor:
+        dialect = getattr(conn, "dialect", "oracle")
+        for name, sql, binds in api_queries():
+            if dialect == "sqlite":
+                lines = _explain_sqlite(cursor, sql, binds)
+            else:
+                lines = _explain_oracle(cursor, name, sql)
+            full_scans = []
+            for _, table in lines:
+                if table is None:
+                    continue
+                if table not in sizes:
+                    sizes[table] = _table_rows(cursor, table, dialect)
+                rows = sizes[table]
+                # No optimizer statistics: assume the worst
+                if rows is None or rows >= min_rows:
+                    full_scans.append({"table": table, "rows": rows})
+            report.append({
+                "name": name,
+                "plan": [line for line, _ in lines],
+                "full_scans": full_scans,
+                "ok": not full_scans,
+            })
+        conn.commit()
+    return report
@@ -0,0 +1,516 @@
+import contextvars
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from real_estate_backend import config, events, jobs, logs
+from real_estate_backend.database import get_connection
+from real_estate_backend.logtail import LogTail
+from real_estate_backend.search import fetch_by_ids, in_list_chunks
+
+# ------------------------------------------------------------
+# READ REPLICA (REPLICA_PATH)
+# Branch deployments far from Oracle keep an embedded SQLite copy of
+# users, agents and properties (agent_sales_summary is rebuilt locally
+# by the stand-in's triggers) and answer GETs from it, so a read costs
+# no WAN round trip. One syncer thread keeps it current:
+#   bootstrap  note the replica_changes / property_logs high-water marks,
+#              then copy the three tables in keyset pages; rows changed
+#              meanwhile are past the marks and get replayed
+#   tail       every REPLICA_POLL_SECONDS, or at once after a write in
+#              this process: read new replica_changes rows (inserts,
+#              edits, deletes) and property_logs rows (status changes),
+#              re-fetch the named rows from the primary and replace them
+#              locally, advancing the marks in the same local commit
+#   gaps       log ids are handed out at insert but become visible at
+#              commit, and sequence caching skips ranges, so an id below
+#              a mark can still show up. Ids skipped when a mark moves
+#              (and, at bootstrap, the last REPLICA_GAP_SCAN_IDS ids below
+#              it) are re-read every poll until their rows appear or
+#              REPLICA_GAP_GRACE_SECONDS pass
+#   reconcile  every REPLICA_RECONCILE_SECONDS, compare each local row
+#              with the primary's ORA_HASH of it; re-fetch what differs
+#              and drop what the primary no longer has
+#   progress   every REPLICA_PROGRESS_SECONDS, record the applied
+#              change_id in the primary's replica_progress, which bounds
+#              what prune_replica_changes may delete. If that row has
+#              been dropped as stale, the changes it held back may be
+#              gone and the copy is bootstrapped again.
+# Lag is the time since the start of the last poll that drained both
+# logs. It covers everything committed in id order before that poll; a
+# transaction committing behind a mark arrives through its gap, and
+# anything later than the grace period only through the reconcile.
+# Reads use the primary until the first catch-up and whenever lag
+# exceeds REPLICA_MAX_LAG_SECONDS. Responses to GETs carry it:
+#   X-Replica-Lag   seconds (absent until the replica has caught up)
+#   X-Read-Source   replica | primary (absent when nothing was queried)
+# ------------------------------------------------------------
+ENTITIES = {
+    # entity: (key, columns) in replay order; password hashes stay on the primary
+    "users": ("user_id", ("user_id", "username", "full_name", "email", "phone", "role", "created_at")),
+    "agents": ("agent_id", ("agent_id", "user_id", "license_no", "region")),
+    "properties": ("property_id", (
+        "property_id", "agent_id", "title", "description", "city", "locality",
+        "price", "property_type", "status",
+    )),
+}
+CHANGES_SQL = """
+    SELECT change_id, entity, entity_id FROM replica_changes
+    WHERE change_id > :after
+    ORDER BY change_id
+    FETCH FIRST :n ROWS ONLY
+"""
+LOGS_SQL = """
+    SELECT log_id, property_id FROM property_logs
+    WHERE log_id > :after
+    ORDER BY log_id
+    FETCH FIRST :n ROWS ONLY
+"""
+STATE_SQL = "CREATE TABLE IF NOT EXISTS _replica_state (name TEXT PRIMARY KEY, value INTEGER)"
+# The primary's ORA_HASH of every local row, as of when it was copied
+HASHES_SQL = """
+    CREATE TABLE IF NOT EXISTS _replica_hashes (
+        entity TEXT, id INTEGER, hash INTEGER, PRIMARY KEY (entity, id)
+    )"""
+
+# GET routes answered from the replica (kept on their sync handlers
+# under DB_ENGINE=async, since the store is an in-process SQLite file)
+READ_ROUTES = {
+    "/users", "/agents", "/properties", "/agents/stats", "/available_properties/{city}",
+    "/check_property/{property_id}", "/calc_total_sales/{agent_id}",
+    "/get_total_commission/{agent_id}", "/export/properties", "/export/users",
+}
+
+# Set per GET request by ReplicaMiddleware; read_connection() records
+# where the request's rows came from
+_read_source = contextvars.ContextVar("read_source", default=None)
+# This replica's row in the primary's replica_progress
+REPLICA_ID = (config.REPLICA_ID or f"{socket.gethostname()}:{os.path.abspath(config.REPLICA_PATH)}")[:200]
+
+
+def _row_hash(entity):
+    # NVL keeps a NULL column from nulling the whole concatenation on SQLite
+    key, columns = ENTITIES[entity]
+    return "ORA_HASH(" + " || '|' || ".join(f"NVL({c}, '')" for c in columns) + ")"
+
+
+def _select(entity):
+    # Entity columns followed by the row's hash
+    key, columns = ENTITIES[entity]
+    return f"SELECT {', '.join(columns)}, {_row_hash(entity)} FROM {entity}"
+
+
+def _insert(entity):
+    key, columns = ENTITIES[entity]
+    return (
+        f"INSERT INTO {entity} ({', '.join(columns)}) "
+        f"VALUES ({', '.join(f':{i + 1}' for i in range(len(columns)))})"
+    )
+
+
+def _store(cursor, entity, rows):
+    # rows from _select(): the hash goes to _replica_hashes
+    cursor.executemany(_insert(entity), [row[:-1] for row in rows])
+    cursor.executemany(
+        "INSERT OR REPLACE INTO _replica_hashes (entity, id, hash) VALUES (:1, :2, :3)",
+        [(entity, row[0], row[-1]) for row in rows],
+    )
+
+
+def _replace(cursor, entity, ids, rows):
+    # Replace, not upsert: ids the primary no longer has are dropped too
+    key = ENTITIES[entity][0]
+    for sql, binds in in_list_chunks(f"DELETE FROM {entity}", ids, key):
+        cursor.execute(sql, binds)
+    for sql, binds in in_list_chunks("DELETE FROM _replica_hashes", ids, "id"):
+        cursor.execute(f"{sql} AND entity = :entity", dict(binds, entity=entity))
+    if rows:
+        _store(cursor, entity, rows)
+
+
+class Replica:
+    def __init__(self):
+        self.pool = None
+        grace = config.REPLICA_GAP_GRACE_SECONDS
+        self.changes = LogTail("change", CHANGES_SQL, "replica_changes", "change_id", "change_id, entity, entity_id", grace)
+        self.logs = LogTail("log", LOGS_SQL, "property_logs", "log_id", "log_id, property_id", grace)
+        self.caught_up_at = None  # wall time of the last draining poll
+        self.reconciled_at = 0
+        self.reported = 0  # 1 once replica_progress holds this replica's row
+        self.reported_at = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {
+            "polls": 0, "rows_replayed": 0, "sync_errors": 0,
+            "reads_replica": 0, "reads_primary": 0, "bootstrap_seconds": None,
+            "gap_rows": 0, "gaps_expired": 0, "reconciles": 0, "rows_reconciled": 0,
+        }
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    # ---------- lifecycle ----------
+    def start(self):
+        if not config.REPLICA_PATH or self._thread is not None:
+            return
+        from real_estate_backend.sqlite_compat import SQLitePool
+
+        self.pool = SQLitePool(config.REPLICA_PATH, config.REPLICA_POOL_SIZE, replica=True)
+        with self._local() as conn, conn.cursor() as cursor:
+            cursor.execute(STATE_SQL)
+            cursor.execute(HASHES_SQL)
+            cursor.execute("SELECT name, value FROM _replica_state")
+            state = dict(cursor.fetchall())
+            conn.commit()
+        self.changes.restore(state)
+        self.logs.restore(state)
+        self.reconciled_at = state.get("reconciled_at") or 0
+        self.reported = state.get("reported") or 0
+        self.reported_at = 0.0
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        thread.join(timeout=10)
+        self.pool.close()
+        self.pool = None
+
+    def on_change(self, entity, ids):
+        # A write in this process: fetch it now rather than at the next
+        # poll. Replays publish too; those must not re-wake the syncer.
+        if threading.current_thread() is not self._thread:
+            self._wake.set()
+
+    # ---------- local store ----------
+    @contextmanager
+    def _local(self):
+        conn = self.pool.acquire()
+        try:
+            yield conn
+        finally:
+            self.pool.release(conn)
+
+    def _save_state(self, cursor):
+        cursor.executemany(
+            "INSERT OR REPLACE INTO _replica_state (name, value) VALUES (:1, :2)",
+            [*self.changes.state(), *self.logs.state(),
+             ("reconciled_at", self.reconciled_at), ("reported", self.reported)],
+        )
+
+    # ---------- sync ----------
+    def _run(self):
+        while not self._stop.is_set():
+            more = False
+            try:
+                if self.changes.mark is None:
+                    self._bootstrap()
+                more = self._sync_once()
+                if not more and self._reconcile_due():
+                    self._reconcile()
+                if not more and time.time() - self.reported_at >= config.REPLICA_PROGRESS_SECONDS:
+                    self._report()
+            except Exception as e:
+                self._count("sync_errors")
+                logs.log("replica_sync_failed", "error", exc=e)
+            if more:
+                continue
+            self._wake.wait(config.REPLICA_POLL_SECONDS)
+            self._wake.clear()
+
+    def _bootstrap(self):
+        start = time.perf_counter()
+        batch = config.REPLICA_BATCH_ROWS
+        with get_connection() as conn, conn.cursor() as src, self._local() as local, local.cursor() as dst:
+            now = time.time()
+            src.execute("SELECT NVL(MAX(change_id), 0) FROM replica_changes")
+            change_id = src.fetchone()[0]
+            src.execute("SELECT NVL(MAX(log_id), 0) FROM property_logs")
+            log_id = src.fetchone()[0]
+            for entity in ENTITIES:
+                dst.execute(f"DELETE FROM {entity}")
+            dst.execute("DELETE FROM agent_sales_summary")
+            dst.execute("DELETE FROM _replica_hashes")
+            copied = 0
+            for entity, (key, _) in ENTITIES.items():
+                after = None
+                while True:
+                    where = f"WHERE {key} > :after" if after is not None else ""
+                    binds = {"n": batch, **({"after": after} if after is not None else {})}
+                    src.execute(f"{_select(entity)} {where} ORDER BY {key} FETCH FIRST :n ROWS ONLY", binds)
+                    rows = src.fetchall()
+                    if rows:
+                        _store(dst, entity, rows)
+                        copied += len(rows)
+                        after = rows[-1][0]
+                    if len(rows) < batch:
+                        break
+            self.changes.seed(src, change_id, now, config.REPLICA_GAP_SCAN_IDS)
+            self.logs.seed(src, log_id, now, config.REPLICA_GAP_SCAN_IDS)
+            self.reconciled_at = now
+            self.reported, self.reported_at = 0, 0.0
+            self._save_state(dst)
+            local.commit()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._stats["bootstrap_seconds"] = round(elapsed, 3)
+        logs.log("replica_bootstrapped", rows=copied, elapsed_ms=round(elapsed * 1000, 1),
+                 change_id=change_id, log_id=log_id,
+                 gaps=len(self.changes.gaps) + len(self.logs.gaps))
+
+    def _sync_once(self):
+        # Returns True while either log still has rows waiting
+        started = time.time()
+        batch = config.REPLICA_BATCH_ROWS
+        changed = {entity: set() for entity in ENTITIES}
+        with get_connection() as conn, conn.cursor() as src:
+            changes, late_changes = self.changes.read(src, batch)
+            status_logs, late_logs = self.logs.read(src, batch)
+            for _, entity, entity_id in changes + late_changes:
+                if entity in changed:
+                    changed[entity].add(entity_id)
+            changed["properties"].update(pid for _, pid in status_logs + late_logs if pid is not None)
+            fetched = {
+                entity: fetch_by_ids(src, _select(entity), ids, ENTITIES[entity][0])
+                for entity, ids in changed.items() if ids
+            }
+        self._count("polls")
+
+        late = len(late_changes) + len(late_logs)
+        expired = (
+            self.changes.advance(changes, late_changes, started)
+            + self.logs.advance(status_logs, late_logs, started)
+        )
+        if fetched or changes or status_logs or late or expired:
+            with self._local() as local, local.cursor() as dst:
+                for entity, rows in fetched.items():
+                    _replace(dst, entity, changed[entity], rows)
+                self._save_state(dst)
+                local.commit()
+            self._count("rows_replayed", sum(len(ids) for ids in changed.values()))
+            self._count("gap_rows", late)
+            self._count("gaps_expired", expired)
+            if late:
+                logs.log("replica_gap_rows", rows=late)
+            if expired:
+                logs.log("replica_gaps_expired", "warning", gaps=expired)
+            for entity, ids in changed.items():
+                if ids:
+                    events.publish(entity, sorted(ids))
+
+        more = len(changes) == batch or len(status_logs) == batch
+        if not more:
+            self.caught_up_at = started
+        return more
+
+    def _reconcile_due(self):
+        every = config.REPLICA_RECONCILE_SECONDS
+        return every > 0 and time.time() - self.reconciled_at >= every
+
+    def _reconcile(self):
+        # Like fulltext's reconcile: compare the primary's row hashes with
+        # the ones stored at copy time, then re-read only what differs.
+        # Rows are re-fetched rather than taken from the hash scan, so a
+        # change made meanwhile is not undone; the tail replays it anyway.
+        start = time.perf_counter()
+        started = time.time()
+        repaired = {}
+        with get_connection() as conn, conn.cursor() as src:
+            src.arraysize = config.REPLICA_BATCH_ROWS
+            for entity, (key, _) in ENTITIES.items():
+                src.execute(f"SELECT {key}, {_row_hash(entity)} FROM {entity}")
+                current = dict(src.fetchall())
+                with self._local() as local, local.cursor() as dst:
+                    dst.execute(f"""
+                        SELECT e.{key}, h.hash FROM {entity} e
+                        LEFT JOIN _replica_hashes h ON h.entity = :entity AND h.id = e.{key}
+                    """, {"entity": entity})
+                    stored = dict(dst.fetchall())
+                ids = [i for i, h in current.items() if stored.get(i) != h]
+                ids += [i for i in stored if i not in current]
+                if ids:
+                    repaired[entity] = (ids, fetch_by_ids(src, _select(entity), ids, key))
+        with self._local() as local, local.cursor() as dst:
+            for entity, (ids, rows) in repaired.items():
+                _replace(dst, entity, ids, rows)
+            self.reconciled_at = started
+            self._save_state(dst)
+            local.commit()
+        count = sum(len(ids) for ids, _ in repaired.values())
+        self._count("reconciles")
+        self._count("rows_reconciled", count)
+        logs.log("replica_reconciled", "warning" if count else "info", rows=count,
+                 elapsed_ms=round((time.perf_counter() - start) * 1000, 1))
+        for entity, (ids, _) in repaired.items():
+            events.publish(entity, sorted(ids))
+
+    def _report(self):
+        mark = self.changes.mark
+        with get_connection() as conn, conn.cursor() as cursor:
+            binds = {"replica_id": REPLICA_ID, "change_id": mark, "now": datetime.now().replace(microsecond=0)}
+            cursor.execute("""
+                UPDATE replica_progress SET change_id = :change_id, reported_at = :now
+                WHERE replica_id = :replica_id
+            """, binds)
+            if cursor.rowcount == 0 and self.reported:
+                conn.rollback()
+                logs.log("replica_progress_dropped", "warning", replica_id=REPLICA_ID, change_id=mark)
+                self.changes.mark = None  # the next round bootstraps
+                return
+            if cursor.rowcount == 0:
+                cursor.execute("""
+                    INSERT INTO replica_progress (replica_id, change_id, reported_at)
+                    VALUES (:replica_id, :change_id, :now)
+                """, binds)
+            conn.commit()
+        self.reported_at = time.time()
+        if not self.reported:
+            self.reported = 1
+            with self._local() as local, local.cursor() as dst:
+                self._save_state(dst)
+                local.commit()
+
+    # ---------- reads ----------
+    def covers(self, change_id=None, log_id=None):
+        # True once rows up to these ids are applied here (None: no requirement)
+        for log, newest in ((self.changes, change_id), (self.logs, log_id)):
+            if newest is None:
+                continue
+            if log.mark is None or log.mark < newest:
+                return False
+            if any(lo <= newest <= hi for lo, hi, _ in log.gaps):
+                return False
+        return True
+
+    def lag(self):
+        caught_up_at = self.caught_up_at
+        return None if caught_up_at is None else max(0.0, time.time() - caught_up_at)
+
+    def serving(self):
+        lag = self.lag()
+        return self.pool is not None and lag is not None and lag <= config.REPLICA_MAX_LAG_SECONDS
+
+    def stats(self):
+        with self._lock:
+            data = dict(self._stats)
+        lag = self.lag()
+        data.update(
+            enabled=bool(config.REPLICA_PATH),
+            serving=self.serving(),
+            lag_seconds=None if lag is None else round(lag, 3),
+            change_id=self.changes.mark,
+            log_id=self.logs.mark,
+            open_gaps=len(self.changes.gaps) + len(self.logs.gaps),
+            reconciled_at=self.reconciled_at or None,
+        )
+        return data
+
+
+
+replica = Replica()
+for _entity in ENTITIES:
+    events.subscribe(_entity, replica.on_change)
+
+
+@contextmanager
+def read_connection():
+    # get_connection() for read-only handlers: the replica's store while
+    # it is fresh enough, the primary otherwise
+    source = _read_source.get()
+    if not replica.serving():
+        replica._count("reads_primary")
+        if source is not None:
+            source.setdefault("source", "primary")
+        with get_connection() as conn:
+            yield conn
+        return
+    replica._count("reads_replica")
+    if source is not None:
+        source["source"] = "replica"
+    with replica._local() as conn:
+        yield conn
+
+
+class ReplicaMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD") or replica.pool is None:
+            await self.app(scope, receive, send)
+            return
+        source = {}
+        _read_source.set(source)
+
+        async def send_with_lag(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                lag = replica.lag()
+                if lag is not None:
+                    headers.append((b"x-replica-lag", f"{lag:.3f}".encode()))
+                if "source" in source:
+                    headers.append((b"x-read-source", source["source"].encode()))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_lag)
+
+
+# ------------------------------------------------------------
+# RETENTION JOB (replica_changes)
+# ------------------------------------------------------------
+@jobs.job_handler("prune_replica_changes")
+def prune_replica_changes_job(job, keep_ids=None, stale_days=None):
+    # Deletes replica_changes rows more than keep_ids below the lowest
+    # change_id a live replica has applied (the newest one when there
+    # are none). The margin covers rows that commit behind a replica's
+    # mark (REPLICA_GAP_SCAN_IDS) and the listing ETags' VERSION_LATE_IDS.
+    # Replicas silent for stale_days are dropped first; they bootstrap
+    # again when they next report.
+    keep = max(config.REPLICA_GAP_SCAN_IDS, config.VERSION_LATE_IDS) if keep_ids is None else keep_ids
+    days = config.REPLICA_PROGRESS_STALE_DAYS if stale_days is None else stale_days
+    stale_before = datetime.now().replace(microsecond=0) - timedelta(days=days)
+    chunk = config.JOB_CHUNK_SIZE
+    deleted = 0
+    with get_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("DELETE FROM replica_progress WHERE reported_at < :stale_before", {"stale_before": stale_before})
+        dropped = cursor.rowcount
+        cursor.execute("SELECT MIN(change_id), COUNT(*) FROM replica_progress")
+        applied, replicas = cursor.fetchone()
+        cursor.execute("SELECT NVL(MAX(change_id), 0) FROM replica_changes")
+        newest = cursor.fetchone()[0]
+        below = min(newest, newest if applied is None else applied) - keep
+        cursor.execute("SELECT COUNT(*) FROM replica_changes WHERE change_id < :below", {"below": below})
+        total = cursor.fetchone()[0]
+        job.progress(cursor, 0, total)
+        conn.commit()
+        while True:
+            cursor.execute("""
+                SELECT change_id FROM replica_changes WHERE change_id < :below
+                ORDER BY change_id
+                FETCH FIRST :n ROWS ONLY
+            """, {"below": below, "n": chunk})
+            ids = cursor.fetchall()
+            if not ids:
+                break
+            cursor.execute("DELETE FROM replica_changes WHERE change_id <= :last", {"last": ids[-1][0]})
+            deleted += cursor.rowcount
+            job.progress(cursor, deleted, max(total, deleted))
+            conn.commit()
+            if len(ids) < chunk:
+                break
+    if dropped:
+        logs.log("replica_progress_stale", "warning", replicas=dropped, before=stale_before.isoformat())
+    logs.log("replica_changes_pruned", rows=deleted, below=below)
+    return {"rows_deleted": deleted, "below_change_id": below, "replicas": replicas, "replicas_dropped": dropped}
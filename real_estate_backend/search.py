@@ -0,0 +1,294 @@
+import bisect
+import threading
+import time
+from collections import Counter
+from itertools import islice
+
+from fastapi import APIRouter, HTTPException, Query
+from real_estate_backend import config, events
+from real_estate_backend.database import get_connection
+from real_estate_backend.logtail import LogTail
+
+# ------------------------------------------------------------
+# FACETED PROPERTY SEARCH INDEX
+# A process-local copy of the searchable property columns:
+#   posting lists  city / locality / status / type -> sorted ids
+#   sorted list    (price, id) for range queries
+# A page walks the shortest matching posting list in id order and
+# stops once it is full. Totals and facet counts need every match, so
+# they are kept per filter until the index next changes.
+# Loaded once from Oracle, then kept fresh incrementally: mutation
+# endpoints mark ids dirty through change events, and property_logs
+# is tailed by log_id to pick up status changes made elsewhere. A log
+# row that commits behind the tail (see logtail) may be older than the
+# status the index holds, so its property is re-fetched instead.
+# ------------------------------------------------------------
+router = APIRouter(prefix="/search")
+
+FACETS = ("city", "locality", "status", "property_type")
+DOC_FIELDS = ("property_id", "title", "city", "locality", "price", "property_type", "status")
+IN_LIST_LIMIT = 1000
+COUNT_CACHE_ENTRIES = 256
+# A price range this many times smaller than the index is sorted by
+# id rather than walked for in the full id list
+PRICE_SORT_RATIO = 8
+LOG_BATCH = 5000
+LOGS_SQL = """
+    SELECT log_id, property_id, new_status FROM property_logs
+    WHERE log_id > :after ORDER BY log_id
+    FETCH FIRST :n ROWS ONLY
+"""
+
+
+def _norm(value):
+    return (value or "").strip().lower()
+
+
+def in_list_chunks(select_sql, ids, column="property_id"):
+    # Yields (sql, binds) for `select_sql WHERE column IN (...)` in Oracle-sized chunks
+    ids = list(ids)
+    for i in range(0, len(ids), IN_LIST_LIMIT):
+        binds = {f"p{n}": pid for n, pid in enumerate(ids[i:i + IN_LIST_LIMIT])}
+        yield f"{select_sql} WHERE {column} IN ({', '.join(':' + k for k in binds)})", binds
+
+
+def _discard(ids, pid):
+    # Removes pid from a sorted list
+    i = bisect.bisect_left(ids, pid)
+    if i < len(ids) and ids[i] == pid:
+        del ids[i]
+
+
+def fetch_by_ids(cursor, select_sql, ids, column="property_id"):
+    rows = []
+    for sql, binds in in_list_chunks(select_sql, ids, column):
+        cursor.execute(sql, binds)
+        rows.extend(cursor.fetchall())
+    return rows
+
+
+class PropertyIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.docs = {}
+        self.ids = []  # sorted property_id
+        self.maps = {facet: {} for facet in FACETS}
+        self.prices = []  # sorted (price, property_id)
+        self.counts = {}  # filter -> (total, facets), cleared on any change
+        self.loaded = False
+        self.logs = self._log_tail()
+        self.last_log_poll = 0.0
+        self.dirty = set()
+        self.needs_reload = True
+        self.reload_requests = 0  # on_change(None) calls, so load() can tell if one came in meanwhile
+
+    # ---------- maintenance ----------
+    def _add(self, doc):
+        pid = doc["property_id"]
+        self.docs[pid] = doc
+        bisect.insort(self.ids, pid)
+        for facet in FACETS:
+            bisect.insort(self.maps[facet].setdefault(_norm(doc[facet]), []), pid)
+        bisect.insort(self.prices, (doc["price"] or 0, pid))
+        self.counts.clear()
+
+    def _remove(self, pid):
+        doc = self.docs.pop(pid, None)
+        if doc is None:
+            return
+        _discard(self.ids, pid)
+        for facet in FACETS:
+            key = _norm(doc[facet])
+            ids = self.maps[facet][key]
+            _discard(ids, pid)
+            if not ids:
+                del self.maps[facet][key]
+        _discard(self.prices, (doc["price"] or 0, pid))
+        self.counts.clear()
+
+    def upsert(self, doc):
+        with self._lock:
+            self._remove(doc["property_id"])
+            self._add(doc)
+
+    def remove(self, pid):
+        with self._lock:
+            self._remove(pid)
+
+    def set_status(self, pid, status):
+        with self._lock:
+            doc = self.docs.get(pid)
+            if doc is not None and doc["status"] != status:
+                self.upsert(dict(doc, status=status))
+
+    def on_change(self, entity, ids):
+        with self._lock:
+            if ids is None:
+                self.needs_reload = True
+                self.reload_requests += 1
+            else:
+                self.dirty.update(ids)
+
+    # ---------- syncing with Oracle ----------
+    @staticmethod
+    def _log_tail():
+        return LogTail("log", LOGS_SQL, "property_logs", "log_id", "log_id, property_id",
+                       config.LOG_GAP_GRACE_SECONDS)
+
+    def load(self, cursor):
+        # Built outside the lock and swapped in. Changes announced before
+        # the SELECT are in its rows; flags raised after it are kept.
+        with self._lock:
+            requests, dirty_before = self.reload_requests, set(self.dirty)
+        cursor.execute("SELECT NVL(MAX(log_id), 0) FROM property_logs")
+        hwm = cursor.fetchone()[0]
+        logs = self._log_tail()
+        logs.seed(cursor, hwm, time.monotonic(), config.LOG_GAP_SCAN_IDS)
+        cursor.arraysize = 5000
+        cursor.execute(f"SELECT {', '.join(DOC_FIELDS)} FROM properties")
+        docs = {}
+        maps = {facet: {} for facet in FACETS}
+        prices = []
+        for r in cursor.fetchall():
+            doc = dict(zip(DOC_FIELDS, r))
+            pid = doc["property_id"]
+            docs[pid] = doc
+            for facet in FACETS:
+                maps[facet].setdefault(_norm(doc[facet]), []).append(pid)
+            prices.append((doc["price"] or 0, pid))
+        for postings in maps.values():
+            for ids in postings.values():
+                ids.sort()
+        prices.sort()
+        with self._lock:
+            self.docs, self.ids, self.maps, self.prices = docs, sorted(docs), maps, prices
+            self.counts = {}
+            self.dirty -= dirty_before
+            self.needs_reload = self.reload_requests != requests
+            self.logs = logs
+            self.last_log_poll = time.monotonic()
+            self.loaded = True
+
+    def _refresh_dirty(self, cursor):
+        with self._lock:
+            dirty, self.dirty = list(self.dirty), set()
+        rows = fetch_by_ids(cursor, f"SELECT {', '.join(DOC_FIELDS)} FROM properties", dirty)
+        found = {r[0]: dict(zip(DOC_FIELDS, r)) for r in rows}
+        with self._lock:
+            for pid in dirty:
+                if pid in found:
+                    self.upsert(found[pid])
+                else:
+                    self._remove(pid)
+
+    def _tail_logs(self, cursor):
+        now = time.monotonic()
+        while True:
+            rows, late = self.logs.read(cursor, LOG_BATCH)
+            for log_id, pid, new_status in rows:
+                self.set_status(pid, new_status)
+            if late:
+                with self._lock:
+                    self.dirty.update(pid for _, pid in late)
+            self.logs.advance(rows, late, now)
+            if len(rows) < LOG_BATCH:
+                break
+        if self.dirty:
+            self._refresh_dirty(cursor)
+        self.last_log_poll = time.monotonic()
+
+    def sync(self):
+        with self._lock:
+            reload_needed = self.needs_reload or not self.loaded
+            has_dirty = bool(self.dirty)
+            poll_due = time.monotonic() - self.last_log_poll >= config.SEARCH_LOG_POLL_SECONDS
+        if not (reload_needed or has_dirty or poll_due):
+            return
+        with self._sync_lock, get_connection() as conn, conn.cursor() as cursor:
+            if reload_needed:
+                self.load(cursor)
+                return
+            if has_dirty:
+                self._refresh_dirty(cursor)
+            if poll_due:
+                self._tail_logs(cursor)
+
+    # ---------- querying ----------
+    def _candidates(self, wanted, min_price, max_price):
+        # Ids in id order that include every match: the shortest posting
+        # list, else the price range when it is small enough to sort
+        if wanted:
+            return min((self.maps[f][key] for f, key in wanted.items()), key=len)
+        if min_price is not None or max_price is not None:
+            start = 0 if min_price is None else bisect.bisect_left(self.prices, (min_price, float("-inf")))
+            end = len(self.prices) if max_price is None else bisect.bisect_right(self.prices, (max_price, float("inf")))
+            if (end - start) * PRICE_SORT_RATIO < len(self.ids):
+                return sorted(pid for _, pid in self.prices[start:end])
+        return self.ids
+
+    def _matching(self, candidates, wanted, lo, hi):
+        for pid in candidates:
+            doc = self.docs[pid]
+            if all(_norm(doc[f]) == key for f, key in wanted.items()) and lo <= (doc["price"] or 0) <= hi:
+                yield doc
+
+    def search(self, city=None, locality=None, status=None, property_type=None,
+               min_price=None, max_price=None, limit=50, offset=0):
+        wanted = {"city": city, "locality": locality, "status": status, "property_type": property_type}
+        wanted = {f: _norm(v) for f, v in wanted.items() if v}
+        unfiltered = not wanted and min_price is None and max_price is None
+        lo = float("-inf") if min_price is None else min_price
+        hi = float("inf") if max_price is None else max_price
+        with self._lock:
+            if any(key not in self.maps[f] for f, key in wanted.items()):
+                return {"total": 0, "properties": [], "facets": {f: {} for f in FACETS}}
+            candidates = self._candidates(wanted, min_price, max_price)
+            if unfiltered:
+                page = [self.docs[pid] for pid in candidates[offset:offset + limit]]
+            else:
+                page = list(islice(self._matching(candidates, wanted, lo, hi), offset, offset + limit))
+
+            key = (tuple(sorted(wanted.items())), min_price, max_price)
+            counts = self.counts.get(key)
+            if counts is None:
+                total, facets = 0, {f: Counter() for f in FACETS}
+                for doc in self._matching(candidates, wanted, lo, hi):
+                    total += 1
+                    for f in FACETS:
+                        facets[f][doc[f]] += 1
+                counts = (total, {f: dict(c.most_common()) for f, c in facets.items()})
+                if len(self.counts) >= COUNT_CACHE_ENTRIES:
+                    self.counts.clear()
+                self.counts[key] = counts
+
+        return {"total": counts[0], "properties": page, "facets": counts[1]}
+
+
+property_index = PropertyIndex()
+events.subscribe("properties", property_index.on_change)
+
+
+@router.get("/properties")
+def search_properties(
+    city: str = None,
+    locality: str = None,
+    status: str = None,
+    property_type: str = None,
+    min_price: float = None,
+    max_price: float = None,
+    limit: int = Query(50, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+):
+    try:
+        property_index.sync()
+        start = time.perf_counter()
+        result = property_index.search(city, locality, status, property_type,
+                                       min_price, max_price, limit, offset)
+        result["took_us"] = round((time.perf_counter() - start) * 1e6, 1)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
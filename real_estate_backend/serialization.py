@@ -0,0 +1,52 @@
+import json
+from decimal import Decimal
+
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used when orjson is missing
+    orjson = None
+
+# ------------------------------------------------------------
+# COLUMNAR LIST RESPONSES (?format=columnar)
+#   {"columns": ["property_id", ...], "rows": [[1, ...], ...], "next_cursor": ...}
+# Built straight from cursor tuples and encoded once (orjson when
+# installed), so no per-row dicts and no jsonable_encoder pass. The
+# encoded bytes are what the response cache stores.
+# ------------------------------------------------------------
+LIST_FORMATS = ("objects", "columnar")
+
+# Column names of the list endpoints, in SELECT order
+USER_LIST_COLUMNS = ["user_id", "username", "email", "role"]
+AGENT_LIST_COLUMNS = ["agent_id", "username", "license_no", "region"]
+PROPERTY_LIST_COLUMNS = ["property_id", "agent", "title", "city", "locality", "price", "status"]
+
+
+def check_format(fmt):
+    if fmt not in LIST_FORMATS:
+        raise HTTPException(status_code=400, detail="format must be 'objects' or 'columnar'")
+    return fmt
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def dumps(content):
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def columnar(columns, rows, **extra):
+    return dumps({"columns": columns, "rows": rows, **extra})
+
+
+def json_bytes_response(body):
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,498 @@
+import queue
+import re
+import sqlite3
+import threading
+import zlib
+
+import oracledb
+from real_estate_backend import config
+
+# ------------------------------------------------------------
+# ORACLE-SHAPED SQLITE ADAPTER
+# A pool / connection / cursor trio with the subset of the
+# python-oracledb API the backend uses, running the backend's Oracle
+# SQL on SQLite after a few rewrites (SYSDATE, FETCH FIRST, NVL,
+# sequences, user_tables / user_indexes / user_tab_columns, the PL/SQL
+# objects in real_estate_db.sql). It lets the benchmarks run the real
+# FastAPI app without an Oracle instance.
+# ------------------------------------------------------------
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    username TEXT UNIQUE NOT NULL,
+    password_hash TEXT,
+    full_name TEXT,
+    email TEXT,
+    phone TEXT,
+    role TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS agents (
+    agent_id INTEGER PRIMARY KEY,
+    user_id INTEGER REFERENCES users(user_id) ON DELETE CASCADE,
+    license_no TEXT,
+    region TEXT
+);
+CREATE TABLE IF NOT EXISTS properties (
+    property_id INTEGER PRIMARY KEY,
+    agent_id INTEGER REFERENCES agents(agent_id) ON DELETE CASCADE,
+    title TEXT,
+    description TEXT,
+    city TEXT,
+    locality TEXT,
+    price REAL,
+    property_type TEXT,
+    status TEXT
+);
+CREATE TABLE IF NOT EXISTS property_logs (
+    log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    property_id INTEGER,
+    old_status TEXT,
+    new_status TEXT,
+    change_date TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS agent_sales_summary (
+    agent_id INTEGER PRIMARY KEY,
+    sold_count INTEGER NOT NULL DEFAULT 0,
+    total_sales REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS background_jobs (
+    job_id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT,
+    status TEXT NOT NULL,
+    progress_done INTEGER NOT NULL DEFAULT 0,
+    progress_total INTEGER,
+    result TEXT,
+    error TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    started_at TEXT,
+    finished_at TEXT,
+    owner TEXT,
+    heartbeat_at TEXT
+);
+CREATE INDEX IF NOT EXISTS background_jobs_status_ix ON background_jobs (status);
+CREATE INDEX IF NOT EXISTS property_logs_property_ix ON property_logs (property_id, log_id);
+CREATE INDEX IF NOT EXISTS property_logs_date_ix ON property_logs (change_date, log_id);
+CREATE TABLE IF NOT EXISTS property_log_archives (
+    first_log_id INTEGER PRIMARY KEY,
+    last_log_id INTEGER NOT NULL,
+    first_change_date TEXT,
+    last_change_date TEXT,
+    row_count INTEGER NOT NULL,
+    file_name TEXT NOT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS property_log_archive_members (
+    property_id INTEGER,
+    first_log_id INTEGER REFERENCES property_log_archives(first_log_id) ON DELETE CASCADE,
+    row_count INTEGER NOT NULL,
+    PRIMARY KEY (property_id, first_log_id)
+);
+CREATE TABLE IF NOT EXISTS replica_changes (
+    change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    entity TEXT NOT NULL,
+    entity_id INTEGER NOT NULL,
+    changed_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS replica_changes_entity_ix ON replica_changes (entity, change_id);
+CREATE TABLE IF NOT EXISTS replica_progress (
+    replica_id TEXT PRIMARY KEY,
+    change_id INTEGER NOT NULL,
+    reported_at TEXT
+);
+CREATE VIEW IF NOT EXISTS user_tables AS
+    SELECT UPPER(name) AS table_name FROM sqlite_master WHERE type = 'table';
+CREATE VIEW IF NOT EXISTS user_indexes AS
+    SELECT UPPER(name) AS index_name, UPPER(tbl_name) AS table_name FROM sqlite_master WHERE type = 'index';
+CREATE VIEW IF NOT EXISTS user_tab_columns AS
+    SELECT UPPER(m.name) AS table_name, UPPER(c.name) AS column_name
+    FROM sqlite_master m, pragma_table_info(m.name) c WHERE m.type = 'table';
+CREATE TABLE IF NOT EXISTS dual (dummy TEXT);
+INSERT INTO dual SELECT 'X' WHERE NOT EXISTS (SELECT 1 FROM dual);
+CREATE TABLE IF NOT EXISTS _sequences (
+    name TEXT PRIMARY KEY,
+    next_value INTEGER NOT NULL,
+    increment_by INTEGER NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_property_status_log
+AFTER UPDATE OF status ON properties
+FOR EACH ROW WHEN OLD.status IS NOT NEW.status
+BEGIN
+    INSERT INTO property_logs (property_id, old_status, new_status, change_date)
+    VALUES (OLD.property_id, OLD.status, NEW.status, CURRENT_TIMESTAMP);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_agent_sales_summary_ins
+AFTER INSERT ON properties
+FOR EACH ROW WHEN LOWER(NEW.status) = 'sold' AND NEW.agent_id IS NOT NULL
+BEGIN
+    INSERT OR IGNORE INTO agent_sales_summary (agent_id) VALUES (NEW.agent_id);
+    UPDATE agent_sales_summary
+    SET sold_count = sold_count + 1, total_sales = total_sales + IFNULL(NEW.price, 0)
+    WHERE agent_id = NEW.agent_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_agent_sales_summary_del
+AFTER DELETE ON properties
+FOR EACH ROW WHEN LOWER(OLD.status) = 'sold' AND OLD.agent_id IS NOT NULL
+BEGIN
+    UPDATE agent_sales_summary
+    SET sold_count = sold_count - 1, total_sales = total_sales - IFNULL(OLD.price, 0)
+    WHERE agent_id = OLD.agent_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_agent_sales_summary_upd
+AFTER UPDATE OF status, price, agent_id ON properties
+FOR EACH ROW
+BEGIN
+    UPDATE agent_sales_summary
+    SET sold_count = sold_count - 1, total_sales = total_sales - IFNULL(OLD.price, 0)
+    WHERE agent_id = OLD.agent_id AND LOWER(OLD.status) = 'sold';
+    INSERT OR IGNORE INTO agent_sales_summary (agent_id)
+    SELECT NEW.agent_id WHERE LOWER(NEW.status) = 'sold' AND NEW.agent_id IS NOT NULL;
+    UPDATE agent_sales_summary
+    SET sold_count = sold_count + 1, total_sales = total_sales + IFNULL(NEW.price, 0)
+    WHERE agent_id = NEW.agent_id AND LOWER(NEW.status) = 'sold';
+END;
+"""
+
+# Change capture for read replicas (trg_*_capture in real_estate_db.sql).
+# Not installed on a replica's own store, which is written by replay.
+CAPTURE_SCHEMA = """
+CREATE TRIGGER IF NOT EXISTS trg_users_capture_ins
+AFTER INSERT ON users
+FOR EACH ROW
+BEGIN
+    INSERT INTO replica_changes (entity, entity_id) VALUES ('users', NEW.user_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_users_capture_upd
+AFTER UPDATE ON users
+FOR EACH ROW
+BEGIN
+    INSERT INTO replica_changes (entity, entity_id) VALUES ('users', NEW.user_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_users_capture_del
+AFTER DELETE ON users
+FOR EACH ROW
+BEGIN
+    INSERT INTO replica_changes (entity, entity_id) VALUES ('users', OLD.user_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_agents_capture_ins
+AFTER INSERT ON agents
+FOR EACH ROW
+BEGIN
+    INSERT INTO replica_changes (entity, entity_id) VALUES ('agents', NEW.agent_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_agents_capture_upd
+AFTER UPDATE ON agents
+FOR EACH ROW
+BEGIN
+    INSERT INTO replica_changes (entity, entity_id) VALUES ('agents', NEW.agent_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_agents_capture_del
+AFTER DELETE ON agents
+FOR EACH ROW
+BEGIN
+    INSERT INTO replica_changes (entity, entity_id) VALUES ('agents', OLD.agent_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_properties_capture_ins
+AFTER INSERT ON properties
+FOR EACH ROW
+BEGIN
+    INSERT INTO replica_changes (entity, entity_id) VALUES ('properties', NEW.property_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_properties_capture_upd
+AFTER UPDATE OF agent_id, title, description, city, locality, price, property_type ON properties
+FOR EACH ROW
+BEGIN
+    INSERT INTO replica_changes (entity, entity_id) VALUES ('properties', NEW.property_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_properties_capture_del
+AFTER DELETE ON properties
+FOR EACH ROW
+BEGIN
+    INSERT INTO replica_changes (entity, entity_id) VALUES ('properties', OLD.property_id);
+END;
+"""
+
+SEQUENCES = {
+    "users_seq": ("users", "user_id"),
+    "agents_seq": ("agents", "agent_id"),
+    "properties_seq": ("properties", "property_id"),
+    "background_jobs_seq": ("background_jobs", "job_id"),
+}
+
+_REWRITES = [
+    (re.compile(r"\bSYSDATE\b", re.I), "CURRENT_TIMESTAMP"),
+    (re.compile(r"FETCH\s+FIRST\s+(:\w+|\d+)\s+ROWS\s+ONLY", re.I), r"LIMIT \1"),
+    (re.compile(r"\bget_total_commission\(([^)]*)\)", re.I),
+     r"(SELECT IFNULL(MAX(total_sales), 0) * 0.05 FROM agent_sales_summary WHERE agent_id = \1)"),
+]
+_NEXTVAL_RE = re.compile(
+    r"SELECT\s+(\w+)\.NEXTVAL\s+FROM\s+dual(?:\s+CONNECT\s+BY\s+LEVEL\s*<=\s*(:\w+|\d+))?", re.I
+)
+_BIND_RE = re.compile(r"(?<![:\w]):(\w+)")
+
+
+def translate(sql):
+    for pattern, replacement in _REWRITES:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+def _bind_params(sql, params):
+    # Oracle binds sequences by position of each distinct placeholder
+    if params is None:
+        return {}
+    if isinstance(params, dict):
+        return params
+    names = list(dict.fromkeys(_BIND_RE.findall(sql)))
+    return dict(zip(names, params))
+
+
+def _ora_hash(value):
+    return None if value is None else zlib.crc32(str(value).encode())
+
+
+def _nvl(value, default):
+    return default if value is None else value
+
+
+def _oracle_error(e):
+    if isinstance(e, sqlite3.IntegrityError):
+        return oracledb.IntegrityError(str(e))
+    return oracledb.DatabaseError(str(e))
+
+
+def create_schema(conn, block_size=None, capture=True):
+    block_size = block_size or config.ID_BLOCK_SIZE
+    conn.executescript(SCHEMA)
+    if capture:
+        conn.executescript(CAPTURE_SCHEMA)
+    for seq, (table, column) in SEQUENCES.items():
+        conn.execute(
+            f"INSERT OR IGNORE INTO _sequences (name, next_value, increment_by) "
+            f"SELECT ?, IFNULL(MAX({column}), 0) + 1, ? FROM {table}",
+            (seq, block_size),
+        )
+    conn.commit()
+
+
+class BatchError:
+    def __init__(self, offset, message):
+        self.offset = offset
+        self.message = message
+
+
+class Var:
+    def __init__(self, typ=None):
+        self.type = typ
+        self.value = None
+
+    def getvalue(self):
+        return self.value
+
+    def setvalue(self, pos, value):
+        self.value = value
+
+
+def _calc_total_sales(cursor, args):
+    agent_id, out = args
+    cursor.execute(
+        "SELECT IFNULL(MAX(total_sales), 0) FROM agent_sales_summary WHERE agent_id = :1", [agent_id]
+    )
+    out.setvalue(0, cursor.fetchone()[0])
+
+
+PROCEDURES = {"calc_total_sales": _calc_total_sales}
+
+
+class Cursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self._cur = connection._raw.cursor()
+        self._rows = None
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.rowcount = 0
+        self._batch_errors = []
+        self._row_counts = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    @property
+    def description(self):
+        return self._cur.description
+
+    def _run(self, fn, *args):
+        try:
+            return fn(*args)
+        except sqlite3.Error as e:
+            raise _oracle_error(e) from e
+
+    def execute(self, sql, params=None, **kwargs):
+        params = dict(params or {}, **kwargs) if kwargs else params
+        match = _NEXTVAL_RE.search(sql)
+        if match:
+            count = match.group(2)
+            if count and count.startswith(":"):
+                count = _bind_params(sql, params)[count[1:]]
+            self._rows = [(v,) for v in self.connection._pool.nextval(match.group(1), int(count or 1))]
+            return self
+        self._rows = None
+        self._run(self._cur.execute, translate(sql), _bind_params(sql, params))
+        self.rowcount = self._cur.rowcount
+        return self
+
+    def executemany(self, sql, seq_of_params, batcherrors=False, arraydmlrowcounts=False):
+        translated = translate(sql)
+        self._batch_errors, self._row_counts = [], []
+        total = 0
+        for offset, params in enumerate(seq_of_params):
+            try:
+                self._cur.execute(translated, _bind_params(sql, params))
+            except sqlite3.Error as e:
+                if not batcherrors:
+                    raise _oracle_error(e) from e
+                self._batch_errors.append(BatchError(offset, str(e)))
+                self._row_counts.append(0)
+                continue
+            self._row_counts.append(self._cur.rowcount)
+            total += self._cur.rowcount
+        self.rowcount = total
+
+    def getbatcherrors(self):
+        return list(self._batch_errors)
+
+    def getarraydmlrowcounts(self):
+        return list(self._row_counts)
+
+    def callproc(self, name, params=()):
+        PROCEDURES[name.lower()](self, params)
+        return params
+
+    def var(self, typ=None, *args, **kwargs):
+        return Var(typ)
+
+    def fetchone(self):
+        if self._rows is not None:
+            return self._rows.pop(0) if self._rows else None
+        return self._cur.fetchone()
+
+    def fetchmany(self, size=None):
+        size = size or self.arraysize
+        if self._rows is not None:
+            rows, self._rows = self._rows[:size], self._rows[size:]
+            return rows
+        return self._cur.fetchmany(size)
+
+    def fetchall(self):
+        if self._rows is not None:
+            rows, self._rows = self._rows, []
+            return rows
+        return self._cur.fetchall()
+
+    def close(self):
+        self._cur.close()
+
+
+class Connection:
+    dialect = "sqlite"  # plan checks use EXPLAIN QUERY PLAN here
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def cursor(self):
+        return Cursor(self)
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def close(self):
+        self._pool.release(self)
+
+
+class SQLitePool:
+    # Mirrors the oracledb.ConnectionPool attributes pool_stats() reads.
+    # replica=True: a read replica's store (replica.py) with no change
+    # capture and no foreign keys, since the primary has already
+    # cascaded every delete it replays.
+    def __init__(self, path, size=8, timeout=30, replica=False):
+        self.path = path
+        self.min = self.max = size
+        self.timeout = timeout
+        self.replica = replica
+        self._idle = queue.Queue()
+        self._seq_lock = threading.Lock()
+        # Sequences are non-transactional in Oracle: use a separate
+        # autocommit connection so a rollback never re-issues a block
+        self._seq_conn = self._connect(isolation_level=None)
+        create_schema(self._connect(), capture=not replica)
+        for _ in range(size):
+            self._idle.put(Connection(self, self._connect()))
+
+    def _connect(self, **kwargs):
+        raw = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False, **kwargs)
+        raw.execute("PRAGMA journal_mode=WAL")
+        raw.execute(f"PRAGMA foreign_keys={'OFF' if self.replica else 'ON'}")
+        raw.create_function("NVL", 2, _nvl, deterministic=True)
+        raw.create_function("ORA_HASH", 1, _ora_hash, deterministic=True)
+        return raw
+
+    @property
+    def opened(self):
+        return self.max
+
+    @property
+    def busy(self):
+        return self.max - self._idle.qsize()
+
+    def acquire(self):
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise oracledb.DatabaseError("DPY-4005: timed out waiting for a pooled connection")
+
+    def release(self, conn):
+        conn._raw.rollback()
+        self._idle.put(conn)
+
+    def nextval(self, sequence, count=1):
+        with self._seq_lock:
+            row = self._seq_conn.execute(
+                "SELECT next_value, increment_by FROM _sequences WHERE name = ?", (sequence.lower(),)
+            ).fetchone()
+            if row is None:
+                raise oracledb.DatabaseError(f"ORA-02289: sequence {sequence} does not exist")
+            start, step = row
+            self._seq_conn.execute(
+                "UPDATE _sequences SET next_value = ? WHERE name = ?",
+                (start + step * count, sequence.lower()),
+            )
+        return [start + step * i for i in range(count)]
+
+    def close(self, force=False):
+        while not self._idle.empty():
+            self._idle.get_nowait()._raw.close()
+        self._seq_conn.close()
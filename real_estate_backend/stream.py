@@ -0,0 +1,272 @@
+import asyncio
+import threading
+
+from fastapi import APIRouter, Header, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from real_estate_backend import config, events, logs
+from real_estate_backend.serialization import dumps
+
+# ------------------------------------------------------------
+# LIVE CHANGE STREAM (GET /stream/properties, Server-Sent Events)
+# Every connected client is fed by one poller that tails
+# property_logs by log_id, so N open tabs cost one query loop rather
+# than N re-fetches of /properties. Change events from this process
+# wake the poller at once and are forwarded as "changed" events
+# (inserts, edits and deletes leave no log row).
+#   event: status   id: <log_id>   one property_logs row
+#   event: changed                 property ids to re-fetch (null = any)
+#   event: reset                   resume point too old; re-fetch all
+#   event: overflow                client fell behind; reconnect
+# Each client has a bounded queue. The poller never waits on a slow
+# client: when its queue is full the client is told to reconnect and
+# dropped, and EventSource resumes from Last-Event-ID, replaying the
+# missed rows from property_logs.
+# log_ids become visible at commit, not in id order, so the cursor
+# stops in front of a missing id (its row may still be committing)
+# and only moves past it once it has been missing for
+# STREAM_GAP_HOLD_SECONDS; ids above the cursor are not sent yet.
+# ------------------------------------------------------------
+router = APIRouter(prefix="/stream")
+
+LOG_FIELDS = ("log_id", "property_id", "old_status", "new_status", "change_date")
+TAIL_SQL = f"""
+    SELECT {', '.join(LOG_FIELDS)} FROM property_logs
+    WHERE log_id > :after
+    ORDER BY log_id
+    FETCH FIRST :n ROWS ONLY
+"""
+RETRY_MS = 3000
+
+
+def _query_sync(sql, binds):
+    from real_estate_backend.database import get_connection
+
+    with get_connection() as conn, conn.cursor() as cursor:
+        cursor.execute(sql, binds)
+        return cursor.fetchall()
+
+
+async def _query(sql, binds=None):
+    binds = binds or {}
+    if config.DB_ENGINE == "async":
+        from real_estate_backend.database import get_async_connection
+
+        async with get_async_connection() as conn:
+            with conn.cursor() as cursor:
+                await cursor.execute(sql, binds)
+                return await cursor.fetchall()
+    return await run_in_threadpool(_query_sync, sql, binds)
+
+
+def _status_event(row):
+    return {"id": row[0], "event": "status", "data": dict(zip(LOG_FIELDS, row))}
+
+
+class _Client:
+    def __init__(self, after):
+        self.queue = asyncio.Queue(maxsize=config.STREAM_CLIENT_QUEUE)
+        self.after = after  # highest log_id delivered or queued
+        self.overflowed = False
+
+
+class ChangeFeed:
+    def __init__(self):
+        self.clients = set()
+        self.hwm = None
+        self._gap_since = None  # loop time the id after hwm was first found missing
+        self._loop = None
+        self._task = None
+        self._wake = None
+        self._start_lock = None
+        self._lock = threading.Lock()
+        self._stats = {"polls": 0, "events": 0, "delivered": 0, "overflows": 0, "resets": 0}
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    # ---------- poller ----------
+    async def _ensure_running(self):
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._task is not None and not self._task.done():
+                return
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            # Restarting after idle: start from the current end of the log
+            rows = await _query("SELECT NVL(MAX(log_id), 0) FROM property_logs")
+            self.hwm = rows[0][0]
+            self._gap_since = None
+            self._task = self._loop.create_task(self._run())
+
+    async def _run(self):
+        while self.clients:
+            more = False
+            try:
+                more = await self._poll()
+            except Exception as e:
+                logs.log("stream_poll_failed", "error", exc=e)
+            if more:
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), config.STREAM_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def _poll(self):
+        rows = await _query(TAIL_SQL, {"after": self.hwm, "n": config.STREAM_BACKFILL_LIMIT})
+        self._count("polls")
+        now = self._loop.time()
+        for row in rows:
+            if row[0] > self.hwm + 1:
+                if self._gap_since is None:
+                    self._gap_since = now
+                if now - self._gap_since < config.STREAM_GAP_HOLD_SECONDS:
+                    return False  # hold the cursor; the next poll looks again
+            self._gap_since = None
+            self._broadcast(_status_event(row))
+            self.hwm = row[0]
+        # A full page means the log has more rows waiting
+        return len(rows) == config.STREAM_BACKFILL_LIMIT
+
+    def _broadcast(self, event):
+        self._count("events")
+        for client in list(self.clients):
+            if event.get("id") is not None and client.after is not None and event["id"] <= client.after:
+                continue
+            self._offer(client, event)
+
+    def _offer(self, client, event):
+        if client.overflowed:
+            return
+        try:
+            client.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            client.overflowed = True
+            self._count("overflows")
+            return
+        if event.get("id") is not None:
+            client.after = event["id"]
+
+    # ---------- mutation hook ----------
+    def on_change(self, entity, ids):
+        # Called from request threads, job threads or the loop itself
+        loop = self._loop
+        if loop is None or not self.clients or loop.is_closed():
+            return
+        event = {"event": "changed", "data": {"entity": entity, "property_ids": ids}}
+        loop.call_soon_threadsafe(self._changed, event)
+
+    def _changed(self, event):
+        self._broadcast(event)
+        if self._wake is not None:
+            self._wake.set()
+
+    # ---------- clients ----------
+    async def subscribe(self, last_event_id=None):
+        await self._ensure_running()
+        client = _Client(self.hwm if last_event_id is None else last_event_id)
+        self.clients.add(client)
+        if last_event_id is not None and last_event_id < self.hwm:
+            await self._backfill(client, last_event_id)
+        return client
+
+    async def _backfill(self, client, after):
+        # Rows the client missed while disconnected; live rows queued
+        # meanwhile are skipped by their log_id
+        rows = await _query(TAIL_SQL, {"after": after, "n": config.STREAM_BACKFILL_LIMIT + 1})
+        if len(rows) > config.STREAM_BACKFILL_LIMIT:
+            self._count("resets")
+            client.queue = asyncio.Queue(maxsize=config.STREAM_CLIENT_QUEUE)
+            client.after = self.hwm
+            client.queue.put_nowait({"event": "reset", "data": {"log_id": self.hwm}})
+            return
+        pending = []
+        while not client.queue.empty():
+            pending.append(client.queue.get_nowait())
+        # Nothing past the poller's cursor: it may be held at a gap
+        backfill = [_status_event(r) for r in rows if r[0] <= self.hwm]
+        last = backfill[-1]["id"] if backfill else after
+        merged = backfill + [e for e in pending if e.get("id") is None or e["id"] > last]
+        client.queue = asyncio.Queue(maxsize=max(config.STREAM_CLIENT_QUEUE, len(merged)))
+        client.after = after
+        for event in merged:
+            self._offer(client, event)
+
+    def unsubscribe(self, client):
+        self.clients.discard(client)
+
+    async def stop(self):
+        self.clients.clear()
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def stats(self):
+        with self._lock:
+            data = dict(self._stats)
+        data["clients"] = len(self.clients)
+        data["log_id"] = self.hwm
+        data["poller_running"] = self._task is not None and not self._task.done()
+        return data
+
+
+change_feed = ChangeFeed()
+events.subscribe("properties", change_feed.on_change)
+
+
+def _sse(event):
+    lines = []
+    if event.get("id") is not None:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event['event']}")
+    lines.append("data: " + dumps(event["data"]).decode())
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+async def _event_stream(request, client):
+    try:
+        yield f"retry: {RETRY_MS}\n\n".encode()
+        while True:
+            if client.overflowed and client.queue.empty():
+                yield _sse({"event": "overflow", "data": {"log_id": client.after}})
+                return
+            try:
+                event = await asyncio.wait_for(client.queue.get(), config.STREAM_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield b": ping\n\n"
+                continue
+            change_feed._count("delivered")
+            yield _sse(event)
+    finally:
+        change_feed.unsubscribe(client)
+
+
+@router.get("/properties")
+async def stream_properties(
+    request: Request,
+    last_event_id: int = Header(None),
+    after: int = None,
+):
+    # EventSource sends Last-Event-ID on reconnect; ?after= resumes explicitly
+    resume = last_event_id if last_event_id is not None else after
+    client = await change_feed.subscribe(resume)
+    return StreamingResponse(
+        _event_stream(request, client),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stats")
+def stream_stats():
+    return change_feed.stats()
@@ -0,0 +1,206 @@
+import hashlib
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+
+from starlette.concurrency import run_in_threadpool
+from real_estate_backend import config, events, replica
+from real_estate_backend.cache import response_cache
+
+# ------------------------------------------------------------
+# CONDITIONAL GET (ETag / Last-Modified / 304)
+# Collection versions come from the database, so every process behind
+# the load balancer issues the same tag for the same data. Every
+# insert / edit / delete of a user, agent or property adds a
+# replica_changes row (capture triggers) and every status change a
+# property_logs row; an entity's version is the newest id there plus
+# the number of ids within VERSION_LATE_IDS of it, so a transaction
+# that commits behind the newest id still moves it. The versions are
+# re-read at most every VERSION_POLL_SECONDS, and at the next request
+# after a write in this process. Last-Modified is when this process
+# first saw the current version.
+# A version change this process did not cause (a write elsewhere) drops
+# the entity's response cache entries, and a 200 carries validators
+# only when its body is at least that version: read from the primary,
+# or from a replica that has applied the versions' newest ids.
+# A GET on a versioned route whose If-None-Match still matches is
+# answered with 304 before the handler, the query or serialization.
+# ------------------------------------------------------------
+VERSIONED_ROUTES = {
+    "/properties": ("properties", "agents", "users"),
+    "/agents": ("agents", "users"),
+    "/users": ("users",),
+}
+# (part, table, key, entity filter): "properties" is both of its parts
+VERSION_PARTS = (
+    ("users", "replica_changes", "change_id", "users"),
+    ("agents", "replica_changes", "change_id", "agents"),
+    ("properties", "replica_changes", "change_id", "properties"),
+    ("property_logs", "property_logs", "log_id", None),
+)
+ENTITY_PARTS = {"users": ("users",), "agents": ("agents",), "properties": ("properties", "property_logs")}
+
+
+def _version_sql():
+    selects = []
+    for part, table, key, entity in VERSION_PARTS:
+        where = f"entity = '{entity}' AND " if entity else ""
+        newest = f"SELECT NVL(MAX({key}), 0) FROM {table}" + (f" WHERE entity = '{entity}'" if entity else "")
+        selects.append(f"""
+    SELECT '{part}', NVL(MAX({key}), 0), COUNT(*) FROM {table}
+    WHERE {where}{key} > ({newest}) - :late""")
+    return "\n    UNION ALL".join(selects)
+
+
+VERSIONS_SQL = _version_sql()
+
+
+class DataVersions:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        now = time.time()
+        self.versions = {entity: None for entity in ENTITY_PARTS}
+        self.newest = {}  # part -> newest id at the last poll
+        self.modified = {entity: now for entity in ENTITY_PARTS}
+        self.last_poll = 0.0
+
+    def on_change(self, entity, ids):
+        # The write has committed: the next request re-reads the versions
+        with self._lock:
+            self.last_poll = 0.0
+
+    def _poll_due(self):
+        return time.monotonic() - self.last_poll >= config.VERSION_POLL_SECONDS
+
+    def _apply(self, rows):
+        parts = {part: f"{newest}.{recent}" for part, newest, recent in rows}
+        now = time.time()
+        changed = []
+        with self._lock:
+            self.newest = {part: newest for part, newest, _ in rows}
+            for entity, names in ENTITY_PARTS.items():
+                version = "/".join(parts[name] for name in names)
+                if version != self.versions[entity]:
+                    if self.versions[entity] is not None:
+                        self.modified[entity] = now
+                        changed.append(entity)
+                    self.versions[entity] = version
+            self.last_poll = time.monotonic()
+        # Cached bodies may predate the change; a local write has already
+        # dropped them through its event, and dropping twice is harmless
+        for entity in changed:
+            response_cache.on_change(entity, None)
+
+    def replica_current(self, entities):
+        # Whether the replica has applied everything the versions count
+        parts = {part for e in entities for part in ENTITY_PARTS[e]}
+        with self._lock:
+            changes = [self.newest[p] for p in parts if p != "property_logs" and p in self.newest]
+            log_id = self.newest.get("property_logs") if "property_logs" in parts else None
+        return replica.replica.covers(max(changes, default=None), log_id)
+
+    def _poll_sync(self):
+        from real_estate_backend.database import get_connection
+
+        with self._poll_lock:
+            if not self._poll_due():
+                return
+            with get_connection() as conn, conn.cursor() as cursor:
+                cursor.execute(VERSIONS_SQL, {"late": config.VERSION_LATE_IDS})
+                self._apply(cursor.fetchall())
+
+    async def _poll_async(self):
+        from real_estate_backend.database import get_async_connection
+
+        async with get_async_connection() as conn:
+            with conn.cursor() as cursor:
+                await cursor.execute(VERSIONS_SQL, {"late": config.VERSION_LATE_IDS})
+                self._apply(await cursor.fetchall())
+
+    async def poll(self):
+        if not self._poll_due():
+            return
+        if config.DB_ENGINE == "async":
+            await self._poll_async()
+        else:
+            await run_in_threadpool(self._poll_sync)
+
+    def validators(self, entities, query_string=b""):
+        # ETag covers the versions and the query, so each page/filter
+        # combination revalidates on its own
+        with self._lock:
+            state = ",".join(f"{e}={self.versions[e]}" for e in entities)
+            modified = max(self.modified[e] for e in entities)
+        digest = hashlib.sha1(state.encode() + b"?" + query_string).hexdigest()[:16]
+        return f'W/"{digest}"', modified
+
+
+data_versions = DataVersions()
+for _entity in ("users", "agents", "properties"):
+    events.subscribe(_entity, data_versions.on_change)
+
+
+def _etag_matches(header, etag):
+    if header.strip() == "*":
+        return True
+    # Weak comparison: W/"x" and "x" are the same tag
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+
+def _not_modified_since(header, modified):
+    try:
+        return int(modified) <= parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+def _body_current(entities):
+    # A body from a lagging replica (or cached from one) must not carry
+    # the newer version's tag
+    if replica.replica.pool is None:
+        return True
+    source = replica._read_source.get() or {}
+    return source.get("source") == "primary" or data_versions.replica_current(entities)
+
+
+class ConditionalGetMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        entities = VERSIONED_ROUTES.get(scope.get("path")) if scope["type"] == "http" else None
+        if entities is None or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await data_versions.poll()
+        except Exception:
+            # Can't vouch for freshness; let the handler answer in full
+            await self.app(scope, receive, send)
+            return
+        etag, modified = data_versions.validators(entities, scope.get("query_string", b""))
+        validator_headers = [
+            (b"etag", etag.encode()),
+            (b"last-modified", formatdate(modified, usegmt=True).encode()),
+            (b"cache-control", b"no-cache"),
+        ]
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        if_none_match = headers.get("if-none-match")
+        if if_none_match is not None:
+            fresh = _etag_matches(if_none_match, etag)
+        else:
+            fresh = "if-modified-since" in headers and _not_modified_since(headers["if-modified-since"], modified)
+        if fresh:
+            await send({"type": "http.response.start", "status": 304, "headers": validator_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] == 200 and _body_current(entities):
+                message["headers"] = list(message.get("headers", [])) + validator_headers
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,150 @@
+import argparse
+import os
+import random
+import sqlite3
+import time
+
+from real_estate_backend.sqlite_compat import create_schema
+
+# ------------------------------------------------------------
+# BENCHMARK DATA GENERATOR
+# Builds a SQLite database shaped like real_estate_db.sql with
+# `--rows` properties (10^3 .. 10^7) and proportional users, agents
+# and property_logs. Output is deterministic for a given --seed.
+#
+#   python -m real_estate_benchmarks.datagen --rows 100000 --db bench.db
+# ------------------------------------------------------------
+CITIES = [
+    "Ahmedabad", "Mumbai", "Pune", "Delhi", "Bengaluru", "Chennai", "Hyderabad",
+    "Kolkata", "Jaipur", "Surat", "Vadodara", "Rajkot", "Indore", "Nagpur", "Lucknow",
+]
+LOCALITIES = [
+    "Satellite", "Bopal", "Navrangpura", "Andheri", "Baner", "Whitefield", "Gachibowli",
+    "Salt Lake", "Vastrapur", "Thaltej", "Powai", "Koregaon Park", "Indiranagar", "Adajan",
+]
+TYPES = ["Apartment", "Villa", "Plot", "Office", "Shop", "Penthouse"]
+STATUSES = ["available", "available", "available", "sold", "rented", "pending"]
+ROLES = ["buyer", "buyer", "buyer", "seller", "agent"]
+ADJECTIVES = ["Spacious", "Modern", "Cozy", "Luxury", "Affordable", "Sunny", "Quiet", "Renovated"]
+FEATURES = [
+    "near metro station", "with garden", "with parking", "close to schools", "with gym access",
+    "lake view", "corner unit", "gated community", "fully furnished", "newly built",
+]
+BATCH = 10000
+
+
+def _batches(rows, size=BATCH):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _users(rng, count, agent_count):
+    for uid in range(1, count + 1):
+        role = "agent" if uid <= agent_count else rng.choice(ROLES)
+        yield (uid, f"user{uid}", "x", f"User {uid}", f"user{uid}@example.com",
+               f"98{uid:08d}"[-10:], role)
+
+
+def _agents(rng, count):
+    for aid in range(1, count + 1):
+        yield (aid, aid, f"LIC-{aid:07d}", rng.choice(CITIES))
+
+
+def property_rows(rng, count, agent_count):
+    for pid in range(1, count + 1):
+        ptype = rng.choice(TYPES)
+        city = rng.choice(CITIES)
+        title = f"{rng.choice(ADJECTIVES)} {ptype} in {city}"
+        description = f"{rng.randint(1, 5)} BHK {ptype.lower()} " + ", ".join(rng.sample(FEATURES, 3))
+        yield (pid, rng.randint(1, agent_count), title, description, city,
+               rng.choice(LOCALITIES), round(rng.uniform(5e5, 5e7), -3), ptype, rng.choice(STATUSES))
+
+
+def _logs(rng, count, property_count):
+    for _ in range(count):
+        old, new = rng.sample(["available", "sold", "rented", "pending"], 2)
+        yield (rng.randint(1, property_count), old, new)
+
+
+def generate(path, rows, seed=42, overwrite=False):
+    if os.path.exists(path):
+        if not overwrite:
+            raise SystemExit(f"{path} already exists (use --overwrite)")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    rng = random.Random(seed)
+    counts = {
+        "properties": rows,
+        "users": max(rows // 10, 10),
+        "agents": max(rows // 100, 5),
+        "property_logs": rows,
+    }
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    # Load without triggers; the summary table is backfilled in one
+    # statement and create_schema() puts the triggers back at the end
+    create_schema(conn, capture=False)  # no replica_changes rows for the bulk load
+    conn.executescript("""
+        DROP TRIGGER trg_property_status_log;
+        DROP TRIGGER trg_agent_sales_summary_ins;
+        DROP TRIGGER trg_agent_sales_summary_del;
+        DROP TRIGGER trg_agent_sales_summary_upd;
+    """)
+
+    start = time.perf_counter()
+    inserts = [
+        ("users", "INSERT INTO users (user_id, username, password_hash, full_name, email, phone, role) "
+                  "VALUES (?, ?, ?, ?, ?, ?, ?)",
+         _users(rng, counts["users"], counts["agents"])),
+        ("agents", "INSERT INTO agents (agent_id, user_id, license_no, region) VALUES (?, ?, ?, ?)",
+         _agents(rng, counts["agents"])),
+        ("properties", "INSERT INTO properties (property_id, agent_id, title, description, city, "
+                       "locality, price, property_type, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+         property_rows(rng, counts["properties"], counts["agents"])),
+        ("property_logs", "INSERT INTO property_logs (property_id, old_status, new_status) VALUES (?, ?, ?)",
+         _logs(rng, counts["property_logs"], counts["properties"])),
+    ]
+    for table, sql, rows_iter in inserts:
+        for batch in _batches(rows_iter):
+            conn.executemany(sql, batch)
+        conn.commit()
+        print(f"  {table}: {counts[table]} rows")
+
+    conn.execute("""
+        INSERT INTO agent_sales_summary (agent_id, sold_count, total_sales)
+        SELECT agent_id, COUNT(*), SUM(price) FROM properties
+        WHERE LOWER(status) = 'sold' GROUP BY agent_id
+    """)
+    conn.execute("DELETE FROM _sequences")
+    conn.commit()
+    create_schema(conn)  # restores triggers and starts sequences above the data
+    conn.execute("ANALYZE")
+    conn.close()
+    return {"path": path, "seed": seed, "counts": counts,
+            "elapsed_seconds": round(time.perf_counter() - start, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a benchmark database")
+    parser.add_argument("--rows", type=int, default=10000, help="number of properties (10^3 .. 10^7)")
+    parser.add_argument("--db", default="bench.db")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--overwrite", action="store_true")
+    args = parser.parse_args()
+    if not 10 ** 3 <= args.rows <= 10 ** 7:
+        parser.error("--rows must be between 1000 and 10000000")
+    print(f"Generating {args.rows} properties into {args.db}")
+    print(generate(args.db, args.rows, args.seed, args.overwrite))
+
+
+if __name__ == "__main__":
+    main()
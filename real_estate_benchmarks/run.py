@@ -0,0 +1,254 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+from real_estate_backend import database
+from real_estate_backend.cache import response_cache
+from real_estate_backend.sqlite_compat import SQLitePool
+
+# ------------------------------------------------------------
+# LOAD DRIVER
+# Runs the FastAPI app from main.py in-process (httpx ASGI transport,
+# no network) against a database built by datagen.py, and reports
+# per-endpoint throughput and p50/p95/p99 latency at each concurrency
+# level. Results are written as JSON; --compare flags regressions
+# against an earlier run and exits non-zero.
+#
+#   python -m real_estate_benchmarks.run --db bench.db --concurrency 1 8 32
+#   python -m real_estate_benchmarks.run --db bench.db --compare results/baseline.json
+# ------------------------------------------------------------
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+CITIES = ["Ahmedabad", "Mumbai", "Pune", "Delhi", "Bengaluru", "Chennai", "Hyderabad"]
+TEXT_QUERIES = ["spacious villa", "modern apartment near metro", "lake view", "furnished pent", "garden"]
+
+
+def _scenarios(counts, rng):
+    # name -> (method, request builder); builders return (path, params, json)
+    def property_id():
+        return rng.randint(1, counts["properties"])
+
+    def agent_id():
+        return rng.randint(1, counts["agents"])
+
+    def new_property():
+        # datagen makes user N the login of agent N
+        return {"agent_username": f"user{agent_id()}", "title": "Benchmark listing", "description": "bench",
+                "city": rng.choice(CITIES), "locality": "Bench", "price": rng.randint(5, 500) * 100000,
+                "property_type": "Apartment", "status": "available"}
+
+    return {
+        "users_page": ("GET", lambda: ("/users", {"limit": 100}, None)),
+        "agents": ("GET", lambda: ("/agents", None, None)),
+        "properties_by_city": ("GET", lambda: ("/properties", {"city": rng.choice(CITIES), "limit": 100}, None)),
+        "available_properties": ("GET", lambda: (f"/available_properties/{rng.choice(CITIES)}", None, None)),
+        "check_property": ("GET", lambda: (f"/check_property/{property_id()}", None, None)),
+        "calc_total_sales": ("GET", lambda: (f"/calc_total_sales/{agent_id()}", None, None)),
+        "agents_stats": ("GET", lambda: ("/agents/stats", {"agent_id": [agent_id() for _ in range(20)]}, None)),
+        "search_properties": ("GET", lambda: ("/search/properties", {"city": rng.choice(CITIES),
+                                                                    "status": "available"}, None)),
+        "search_text": ("GET", lambda: ("/search/text", {"q": rng.choice(TEXT_QUERIES)}, None)),
+        "analytics_prices": ("GET", lambda: ("/analytics/prices", {"group_by": "locality",
+                                                                   "city": rng.choice(CITIES)}, None)),
+        "analytics_agents": ("GET", lambda: ("/analytics/agents", {"limit": 20}, None)),
+        "add_property": ("POST", lambda: ("/add_property", None, new_property())),
+    }
+
+
+def _table_counts(pool):
+    conn = pool.acquire()
+    try:
+        with conn.cursor() as cursor:
+            counts = {}
+            for table in ("users", "agents", "properties", "property_logs"):
+                cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                counts[table] = cursor.fetchone()[0]
+            return counts
+    finally:
+        pool.release(conn)
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def _drive(client, method, build, concurrency, requests, warmup):
+    latencies, errors = [], 0
+
+    async def worker(remaining, record):
+        nonlocal errors
+        while remaining:
+            remaining.pop()
+            path, params, body = build()
+            start = time.perf_counter()
+            try:
+                resp = await client.request(method, path, params=params, json=body)
+                failed = resp.status_code >= 400
+            except Exception:
+                failed = True
+            if record:
+                latencies.append((time.perf_counter() - start) * 1000)
+                errors += failed
+
+    warm = list(range(warmup))
+    await asyncio.gather(*(worker(warm, False) for _ in range(concurrency)))
+    todo = list(range(requests))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(todo, True) for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_seconds": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+            "p50": round(_percentile(latencies, 50), 3),
+            "p95": round(_percentile(latencies, 95), 3),
+            "p99": round(_percentile(latencies, 99), 3),
+            "max": round(latencies[-1], 3) if latencies else 0.0,
+        },
+    }
+
+
+async def run(args):
+    pool = SQLitePool(args.db, size=max(args.concurrency) if args.pool_size is None else args.pool_size)
+    database.install_pool(pool)
+    response_cache.enabled = not args.no_cache
+    counts = _table_counts(pool)
+
+    from real_estate_backend.main import app
+
+    rng = random.Random(args.seed)
+    scenarios = _scenarios(counts, rng)
+    selected = args.endpoints or [name for name in scenarios if name != "add_property"]
+    unknown = set(selected) - set(scenarios)
+    if unknown:
+        raise SystemExit(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        for name in selected:
+            method, build = scenarios[name]
+            results[name] = []
+            for concurrency in args.concurrency:
+                result = await _drive(client, method, build, concurrency, args.requests, args.warmup)
+                results[name].append(result)
+                lat = result["latency_ms"]
+                print(f"{name:<22} c={concurrency:<4} {result['throughput_rps']:>9.1f} req/s  "
+                      f"p50={lat['p50']:.2f}ms p95={lat['p95']:.2f}ms p99={lat['p99']:.2f}ms  "
+                      f"errors={result['errors']}")
+    pool.close()
+    database.install_pool(None)
+    return {"metadata": _metadata(args, counts), "results": results}
+
+
+def _metadata(args, counts):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "db": os.path.abspath(args.db),
+        "table_counts": counts,
+        "requests_per_level": args.requests,
+        "warmup": args.warmup,
+        "concurrency": args.concurrency,
+        "cache_enabled": not args.no_cache,
+        "seed": args.seed,
+    }
+
+
+def compare(current, baseline, threshold):
+    # A level regresses when throughput drops or p95 rises by more than
+    # `threshold` percent relative to the baseline run
+    regressions = []
+    for name, levels in current["results"].items():
+        base_levels = {r["concurrency"]: r for r in baseline["results"].get(name, [])}
+        for result in levels:
+            base = base_levels.get(result["concurrency"])
+            if base is None:
+                continue
+            rps_change = _pct_change(base["throughput_rps"], result["throughput_rps"])
+            p95_change = _pct_change(base["latency_ms"]["p95"], result["latency_ms"]["p95"])
+            if rps_change < -threshold or p95_change > threshold:
+                regressions.append({
+                    "endpoint": name,
+                    "concurrency": result["concurrency"],
+                    "throughput_change_pct": round(rps_change, 1),
+                    "p95_change_pct": round(p95_change, 1),
+                })
+    return regressions
+
+
+def _pct_change(before, after):
+    return (after - before) / before * 100 if before else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the API against a generated database")
+    parser.add_argument("--db", default="bench.db", help="database built by real_estate_benchmarks.datagen")
+    parser.add_argument("--endpoints", nargs="*", help="scenario names (default: all read endpoints)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=500, help="measured requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--pool-size", type=int, help="connections in the SQLite pool (default: max concurrency)")
+    parser.add_argument("--no-cache", action="store_true", help="disable the response cache")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="result file (default: results/<timestamp>.json)")
+    parser.add_argument("--compare", help="baseline result file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        parser.error(f"{args.db} not found; run real_estate_benchmarks.datagen first")
+
+    report = asyncio.run(run(args))
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        report["comparison"] = {
+            "baseline": args.compare,
+            "threshold_pct": args.threshold,
+            "regressions": compare(report, baseline, args.threshold),
+        }
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    regressions = report.get("comparison", {}).get("regressions", [])
+    for r in regressions:
+        print(f"REGRESSION {r['endpoint']} c={r['concurrency']}: "
+              f"throughput {r['throughput_change_pct']:+.1f}%, p95 {r['p95_change_pct']:+.1f}%")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
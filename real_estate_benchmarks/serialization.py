@@ -0,0 +1,99 @@
+import argparse
+import json
+import os
+import random
+import time
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from real_estate_backend import serialization
+from real_estate_backend.serialization import PROPERTY_LIST_COLUMNS
+from real_estate_benchmarks.datagen import property_rows
+from real_estate_benchmarks.run import RESULTS_DIR
+
+# ------------------------------------------------------------
+# SERIALIZATION BENCHMARK
+# Encodes the same /properties page both ways and reports body size
+# and CPU time per page:
+#   objects  -> dict per row, jsonable_encoder, JSONResponse (today)
+#   columnar -> cursor tuples straight into serialization.columnar()
+#
+#   python -m real_estate_benchmarks.serialization --rows 100 1000 10000
+# ------------------------------------------------------------
+
+
+def _page(count, seed):
+    # Rows shaped like the /properties SELECT (agent username in column 1)
+    rng = random.Random(seed)
+    return [
+        (pid, f"user{agent}", title, city, locality, price, status)
+        for pid, agent, title, _, city, locality, price, _, status in property_rows(rng, count, 100)
+    ]
+
+
+def encode_objects(rows):
+    payload = {"properties": [dict(zip(PROPERTY_LIST_COLUMNS, r)) for r in rows], "next_cursor": None}
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def encode_columnar(rows):
+    return serialization.columnar(PROPERTY_LIST_COLUMNS, rows, next_cursor=None)
+
+
+def _measure(fn, rows, min_seconds):
+    body = fn(rows)
+    runs, cpu_start = 0, time.process_time()
+    wall_start = time.perf_counter()
+    while time.perf_counter() - wall_start < min_seconds:
+        fn(rows)
+        runs += 1
+    cpu = (time.process_time() - cpu_start) / runs
+    return {"bytes": len(body), "cpu_ms_per_page": round(cpu * 1000, 4), "runs": runs}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare list response encodings")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--seconds", type=float, default=1.0, help="minimum measuring time per case")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="result file (default: results/serialization-<timestamp>.json)")
+    args = parser.parse_args()
+
+    results = []
+    for count in args.rows:
+        rows = _page(count, args.seed)
+        objects = _measure(encode_objects, rows, args.seconds)
+        cols = _measure(encode_columnar, rows, args.seconds)
+        result = {
+            "rows": count,
+            "objects": objects,
+            "columnar": cols,
+            "bytes_ratio": round(cols["bytes"] / objects["bytes"], 3),
+            "cpu_speedup": round(objects["cpu_ms_per_page"] / cols["cpu_ms_per_page"], 1)
+            if cols["cpu_ms_per_page"] else None,
+        }
+        results.append(result)
+        print(f"rows={count:<7} objects {objects['bytes']:>9} B {objects['cpu_ms_per_page']:>9.3f} ms | "
+              f"columnar {cols['bytes']:>9} B {cols['cpu_ms_per_page']:>9.3f} ms | "
+              f"size x{result['bytes_ratio']} cpu {result['cpu_speedup']}x faster")
+
+    report = {
+        "metadata": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "encoder": "orjson" if serialization.orjson is not None else "json",
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, "serialization-" + datetime.now().strftime("%Y%m%d-%H%M%S") + ".json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
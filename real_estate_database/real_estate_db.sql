@@ -11,6 +11,10 @@ BEGIN
     EXECUTE IMMEDIATE 'DROP TABLE property_logs CASCADE CONSTRAINTS';
 EXCEPTION WHEN OTHERS THEN NULL; END;
 /
+BEGIN
+    EXECUTE IMMEDIATE 'DROP TABLE agent_sales_summary CASCADE CONSTRAINTS';
+EXCEPTION WHEN OTHERS THEN NULL; END;
+/
 BEGIN
     EXECUTE IMMEDIATE 'DROP TABLE properties CASCADE CONSTRAINTS';
 EXCEPTION WHEN OTHERS THEN NULL; END;
@@ -23,6 +27,42 @@ BEGIN
     EXECUTE IMMEDIATE 'DROP TABLE users CASCADE CONSTRAINTS';
 EXCEPTION WHEN OTHERS THEN NULL; END;
 /
+BEGIN
+    EXECUTE IMMEDIATE 'DROP SEQUENCE users_seq';
+EXCEPTION WHEN OTHERS THEN NULL; END;
+/
+BEGIN
+    EXECUTE IMMEDIATE 'DROP SEQUENCE agents_seq';
+EXCEPTION WHEN OTHERS THEN NULL; END;
+/
+BEGIN
+    EXECUTE IMMEDIATE 'DROP SEQUENCE properties_seq';
+EXCEPTION WHEN OTHERS THEN NULL; END;
+/
+BEGIN
+    EXECUTE IMMEDIATE 'DROP TABLE background_jobs CASCADE CONSTRAINTS';
+EXCEPTION WHEN OTHERS THEN NULL; END;
+/
+BEGIN
+    EXECUTE IMMEDIATE 'DROP SEQUENCE background_jobs_seq';
+EXCEPTION WHEN OTHERS THEN NULL; END;
+/
+BEGIN
+    EXECUTE IMMEDIATE 'DROP TABLE property_log_archive_members CASCADE CONSTRAINTS';
+EXCEPTION WHEN OTHERS THEN NULL; END;
+/
+BEGIN
+    EXECUTE IMMEDIATE 'DROP TABLE property_log_archives CASCADE CONSTRAINTS';
+EXCEPTION WHEN OTHERS THEN NULL; END;
+/
+BEGIN
+    EXECUTE IMMEDIATE 'DROP TABLE replica_changes CASCADE CONSTRAINTS';
+EXCEPTION WHEN OTHERS THEN NULL; END;
+/
+BEGIN
+    EXECUTE IMMEDIATE 'DROP TABLE replica_progress CASCADE CONSTRAINTS';
+EXCEPTION WHEN OTHERS THEN NULL; END;
+/
 
 -- =====================
 --  2️⃣ TABLE CREATION
@@ -86,6 +126,207 @@ INSERT INTO properties VALUES (27, 24, 'Lake View Apartment', 'Beautiful view',
 
 COMMIT;
 
+-- =====================
+--  🔢 ID SEQUENCES (MIGRATION)
+-- =====================
+-- Replaces SELECT NVL(MAX(id),0)+1 key generation. Each sequence steps by
+-- 50 (ID_BLOCK_SIZE in real_estate_backend/config.py): the API reserves a
+-- block of 50 ids per NEXTVAL and hands them out from memory (hi/lo).
+-- Safe to run against an existing schema: each sequence is created only
+-- if missing and starts above the current highest key.
+DECLARE
+    PROCEDURE create_id_seq(p_seq VARCHAR2, p_table VARCHAR2, p_column VARCHAR2) IS
+        v_exists NUMBER;
+        v_start  NUMBER;
+    BEGIN
+        SELECT COUNT(*) INTO v_exists FROM user_sequences WHERE sequence_name = UPPER(p_seq);
+        IF v_exists = 0 THEN
+            EXECUTE IMMEDIATE 'SELECT NVL(MAX(' || p_column || '), 0) + 1 FROM ' || p_table INTO v_start;
+            EXECUTE IMMEDIATE 'CREATE SEQUENCE ' || p_seq || ' START WITH ' || v_start
+                || ' INCREMENT BY 50 CACHE 20';
+        END IF;
+    END;
+BEGIN
+    create_id_seq('users_seq', 'users', 'user_id');
+    create_id_seq('agents_seq', 'agents', 'agent_id');
+    create_id_seq('properties_seq', 'properties', 'property_id');
+END;
+/
+
+-- =====================
+--  📊 AGENT SALES SUMMARY (MIGRATION)
+-- =====================
+-- One row per agent with the count and value of their sold properties,
+-- kept current by trg_agent_sales_summary (section 4). calc_total_sales,
+-- get_total_commission and GET /agents/stats read it in O(1) instead of
+-- scanning properties. Safe to re-run: creates the table if missing and
+-- rebuilds every row from properties.
+DECLARE
+    v_exists NUMBER;
+BEGIN
+    SELECT COUNT(*) INTO v_exists FROM user_tables WHERE table_name = 'AGENT_SALES_SUMMARY';
+    IF v_exists = 0 THEN
+        EXECUTE IMMEDIATE '
+            CREATE TABLE agent_sales_summary (
+                agent_id NUMBER PRIMARY KEY,
+                sold_count NUMBER DEFAULT 0 NOT NULL,
+                total_sales NUMBER DEFAULT 0 NOT NULL
+            )';
+    END IF;
+END;
+/
+
+-- Same rebuild as the rebuild_agent_sales_summary job: rows of agents
+-- with no sold properties left (or no longer existing) go too
+DELETE FROM agent_sales_summary;
+
+INSERT INTO agent_sales_summary (agent_id, sold_count, total_sales)
+SELECT agent_id, COUNT(*), NVL(SUM(price), 0)
+FROM properties
+WHERE LOWER(status) = 'sold' AND agent_id IS NOT NULL
+GROUP BY agent_id;
+
+COMMIT;
+
+-- =====================
+--  🧵 BACKGROUND JOBS (MIGRATION)
+-- =====================
+-- State of the API's background jobs (real_estate_backend/jobs.py):
+-- user/agent delete cascades and summary rebuilds. params/result hold
+-- JSON. Ids come from background_jobs_seq in blocks of 50, like the
+-- other sequences. A process claims a job by setting owner while it is
+-- still queued (or its heartbeat_at lease has run out). Safe to re-run.
+DECLARE
+    v_exists NUMBER;
+BEGIN
+    SELECT COUNT(*) INTO v_exists FROM user_tables WHERE table_name = 'BACKGROUND_JOBS';
+    IF v_exists = 0 THEN
+        EXECUTE IMMEDIATE '
+            CREATE TABLE background_jobs (
+                job_id NUMBER PRIMARY KEY,
+                kind VARCHAR2(50) NOT NULL,
+                params VARCHAR2(4000),
+                status VARCHAR2(20) NOT NULL,
+                progress_done NUMBER DEFAULT 0 NOT NULL,
+                progress_total NUMBER,
+                result VARCHAR2(4000),
+                error VARCHAR2(4000),
+                created_at DATE DEFAULT SYSDATE,
+                started_at DATE,
+                finished_at DATE,
+                owner VARCHAR2(100),
+                heartbeat_at DATE
+            )';
+        EXECUTE IMMEDIATE 'CREATE INDEX background_jobs_status_ix ON background_jobs (status)';
+    END IF;
+
+    -- owner / heartbeat_at: the process running the job and its lease
+    SELECT COUNT(*) INTO v_exists FROM user_tab_columns
+    WHERE table_name = 'BACKGROUND_JOBS' AND column_name = 'OWNER';
+    IF v_exists = 0 THEN
+        EXECUTE IMMEDIATE 'ALTER TABLE background_jobs ADD (owner VARCHAR2(100), heartbeat_at DATE)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_exists FROM user_sequences WHERE sequence_name = 'BACKGROUND_JOBS_SEQ';
+    IF v_exists = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE SEQUENCE background_jobs_seq START WITH 1 INCREMENT BY 50 CACHE 20';
+    END IF;
+END;
+/
+
+-- =====================
+--  📜 PROPERTY LOG HISTORY (MIGRATION)
+-- =====================
+-- Indexes behind /properties/{id}/history (property_id, log_id) and
+-- the /history time-range reads (change_date, log_id). Rows older
+-- than the retention window are moved by the archive_property_logs
+-- job into gzip NDJSON files; property_log_archives lists the files
+-- and the log_id / date range each one holds, and
+-- property_log_archive_members which files hold rows of a property
+-- (so a property's history never opens unrelated files). Safe to re-run.
+DECLARE
+    v_exists NUMBER;
+BEGIN
+    SELECT COUNT(*) INTO v_exists FROM user_indexes WHERE index_name = 'PROPERTY_LOGS_PROPERTY_IX';
+    IF v_exists = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX property_logs_property_ix ON property_logs (property_id, log_id)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_exists FROM user_indexes WHERE index_name = 'PROPERTY_LOGS_DATE_IX';
+    IF v_exists = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX property_logs_date_ix ON property_logs (change_date, log_id)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_exists FROM user_tables WHERE table_name = 'PROPERTY_LOG_ARCHIVES';
+    IF v_exists = 0 THEN
+        EXECUTE IMMEDIATE '
+            CREATE TABLE property_log_archives (
+                first_log_id NUMBER PRIMARY KEY,
+                last_log_id NUMBER NOT NULL,
+                first_change_date DATE,
+                last_change_date DATE,
+                row_count NUMBER NOT NULL,
+                file_name VARCHAR2(255) NOT NULL,
+                created_at DATE DEFAULT SYSDATE
+            )';
+    END IF;
+
+    SELECT COUNT(*) INTO v_exists FROM user_tables WHERE table_name = 'PROPERTY_LOG_ARCHIVE_MEMBERS';
+    IF v_exists = 0 THEN
+        EXECUTE IMMEDIATE '
+            CREATE TABLE property_log_archive_members (
+                property_id NUMBER,
+                first_log_id NUMBER REFERENCES property_log_archives(first_log_id) ON DELETE CASCADE,
+                row_count NUMBER NOT NULL,
+                PRIMARY KEY (property_id, first_log_id)
+            ) ORGANIZATION INDEX';
+    END IF;
+END;
+/
+
+-- =====================
+--  🛰️ READ REPLICA CHANGE CAPTURE (MIGRATION)
+-- =====================
+-- One row per inserted, updated or deleted users / agents / properties
+-- row, written by the trg_*_capture triggers (section 4). Read replicas
+-- (real_estate_backend/replica.py) tail it by change_id together with
+-- property_logs, which already carries status changes, and re-fetch
+-- the rows it names. The API's listing ETags (real_estate_backend/
+-- versions.py) read the newest change per entity through
+-- replica_changes_entity_ix. Each replica records the change_id it has
+-- applied in replica_progress; the prune_replica_changes job deletes
+-- rows below the lowest one. Safe to re-run.
+DECLARE
+    v_exists NUMBER;
+BEGIN
+    SELECT COUNT(*) INTO v_exists FROM user_tables WHERE table_name = 'REPLICA_CHANGES';
+    IF v_exists = 0 THEN
+        EXECUTE IMMEDIATE '
+            CREATE TABLE replica_changes (
+                change_id NUMBER GENERATED BY DEFAULT ON NULL AS IDENTITY PRIMARY KEY,
+                entity VARCHAR2(20) NOT NULL,
+                entity_id NUMBER NOT NULL,
+                changed_at DATE DEFAULT SYSDATE
+            )';
+    END IF;
+
+    SELECT COUNT(*) INTO v_exists FROM user_indexes WHERE index_name = 'REPLICA_CHANGES_ENTITY_IX';
+    IF v_exists = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX replica_changes_entity_ix ON replica_changes (entity, change_id)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_exists FROM user_tables WHERE table_name = 'REPLICA_PROGRESS';
+    IF v_exists = 0 THEN
+        EXECUTE IMMEDIATE '
+            CREATE TABLE replica_progress (
+                replica_id VARCHAR2(200) PRIMARY KEY,
+                change_id NUMBER NOT NULL,
+                reported_at DATE
+            )';
+    END IF;
+END;
+/
+
 -- =====================
 --  4️⃣ PL/SQL PROGRAMS
 -- =====================
@@ -97,11 +338,11 @@ CREATE OR REPLACE PROCEDURE calc_total_sales (
 )
 AS
 BEGIN
-    SELECT NVL(SUM(price), 0)
+    -- O(1) read of the maintained aggregate (see trg_agent_sales_summary)
+    SELECT NVL(MAX(total_sales), 0)
     INTO p_total_sales
-    FROM properties
-    WHERE agent_id = p_agent_id
-      AND LOWER(status) = 'sold';
+    FROM agent_sales_summary
+    WHERE agent_id = p_agent_id;
 EXCEPTION
     WHEN NO_DATA_FOUND THEN
         p_total_sales := 0;
@@ -114,11 +355,10 @@ RETURN NUMBER
 AS
     v_total_commission NUMBER;
 BEGIN
-    SELECT NVL(SUM(price * 0.05), 0)
+    SELECT NVL(MAX(total_sales), 0) * 0.05
     INTO v_total_commission
-    FROM properties
-    WHERE agent_id = p_agent_id
-      AND LOWER(status) = 'sold';
+    FROM agent_sales_summary
+    WHERE agent_id = p_agent_id;
     RETURN v_total_commission;
 EXCEPTION
     WHEN NO_DATA_FOUND THEN
@@ -170,6 +410,63 @@ BEGIN
 END;
 /
 
+-- 🔹 TRIGGER: Keep agent_sales_summary in step with properties
+-- Fires alongside trg_property_status_log on status changes, and also on
+-- inserts, deletes (including ON DELETE CASCADE from agents) and
+-- price/agent reassignments, so the summary never needs a rescan.
+CREATE OR REPLACE TRIGGER trg_agent_sales_summary
+AFTER INSERT OR DELETE OR UPDATE OF status, price, agent_id ON properties
+FOR EACH ROW
+BEGIN
+    IF (DELETING OR UPDATING) AND LOWER(:OLD.status) = 'sold' AND :OLD.agent_id IS NOT NULL THEN
+        UPDATE agent_sales_summary
+        SET sold_count = sold_count - 1,
+            total_sales = total_sales - NVL(:OLD.price, 0)
+        WHERE agent_id = :OLD.agent_id;
+    END IF;
+
+    IF (INSERTING OR UPDATING) AND LOWER(:NEW.status) = 'sold' AND :NEW.agent_id IS NOT NULL THEN
+        MERGE INTO agent_sales_summary s
+        USING (SELECT :NEW.agent_id AS agent_id, NVL(:NEW.price, 0) AS price FROM dual) n
+        ON (s.agent_id = n.agent_id)
+        WHEN MATCHED THEN UPDATE SET s.sold_count = s.sold_count + 1,
+                                     s.total_sales = s.total_sales + n.price
+        WHEN NOT MATCHED THEN INSERT (agent_id, sold_count, total_sales)
+                              VALUES (n.agent_id, 1, n.price);
+    END IF;
+END;
+/
+
+-- 🔹 TRIGGERS: Change capture for read replicas
+-- Status-only updates of properties are left to property_logs.
+CREATE OR REPLACE TRIGGER trg_users_capture
+AFTER INSERT OR UPDATE OR DELETE ON users
+FOR EACH ROW
+BEGIN
+    INSERT INTO replica_changes (entity, entity_id)
+    VALUES ('users', NVL(:NEW.user_id, :OLD.user_id));
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_agents_capture
+AFTER INSERT OR UPDATE OR DELETE ON agents
+FOR EACH ROW
+BEGIN
+    INSERT INTO replica_changes (entity, entity_id)
+    VALUES ('agents', NVL(:NEW.agent_id, :OLD.agent_id));
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_properties_capture
+AFTER INSERT OR DELETE
+   OR UPDATE OF agent_id, title, description, city, locality, price, property_type ON properties
+FOR EACH ROW
+BEGIN
+    INSERT INTO replica_changes (entity, entity_id)
+    VALUES ('properties', NVL(:NEW.property_id, :OLD.property_id));
+END;
+/
+
 COMMIT;
 
 -- =====================
@@ -0,0 +1,13 @@
+import axios from "axios";
+
+// Deletes return 202 with a job id; poll /jobs/{id} until the job ends
+export async function waitForJob(baseURL, response, intervalMs = 500) {
+  if (response.status !== 202) return response.data;
+  const url = `${baseURL}${response.data.status_url}`;
+  for (;;) {
+    const { data } = await axios.get(url);
+    if (data.status === "succeeded") return data;
+    if (data.status === "failed") throw new Error(data.error || "Job failed");
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}
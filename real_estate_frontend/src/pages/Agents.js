@@ -1,19 +1,31 @@
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import axios from "axios";
+import { waitForJob } from "../jobs";
+import { fetchPage, fetchPages } from "../paging";
 
 function Agents() {
   const [agents, setAgents] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const shown = useRef(0);
   const [username, setUsername] = useState("");
   const [licenseNo, setLicenseNo] = useState("");
   const [region, setRegion] = useState("");
   const [editingAgentId, setEditingAgentId] = useState(null);
   const baseURL = "http://127.0.0.1:8000";
 
+  const show = ({ rows, nextCursor }) => {
+    shown.current = rows.length;
+    setAgents(rows);
+    setNextCursor(nextCursor);
+  };
+  const refresh = () => fetchPages(baseURL, "/agents", "agents", shown.current).then(show);
+  const loadMore = async () => {
+    const page = await fetchPage(baseURL, "/agents", "agents", nextCursor);
+    show({ rows: agents.concat(page.rows), nextCursor: page.nextCursor });
+  };
+
   useEffect(() => {
-    axios
-      .get(`${baseURL}/agents`)
-      .then((res) => setAgents(res.data.agents || []))
-      .catch((err) => console.error("Error fetching agents:", err));
+    refresh().catch((err) => console.error("Error fetching agents:", err));
   }, []);
 
   const handleAddOrUpdate = async (e) => {
@@ -38,8 +50,7 @@ function Agents() {
       setUsername("");
       setLicenseNo("");
       setRegion("");
-      const res = await axios.get(`${baseURL}/agents`);
-      setAgents(res.data.agents || []);
+      await refresh();
     } catch (err) {
       console.error("Error:", err);
       alert("❌ Something went wrong. Check console.");
@@ -56,10 +67,9 @@ function Agents() {
   const handleDelete = async (id) => {
     if (!window.confirm("Delete this agent?")) return;
     try {
-      await axios.delete(`${baseURL}/delete_agent/${id}`);
+      await waitForJob(baseURL, await axios.delete(`${baseURL}/delete_agent/${id}`));
       alert("🗑️ Agent deleted successfully!");
-      const res = await axios.get(`${baseURL}/agents`);
-      setAgents(res.data.agents || []);
+      await refresh();
     } catch {
       alert("❌ Error deleting agent.");
     }
@@ -101,6 +111,9 @@ function Agents() {
           ))}
         </tbody>
       </table>
+      {nextCursor && (
+        <button style={styles.moreBtn} onClick={loadMore}>Load more</button>
+      )}
     </div>
   );
 }
@@ -114,6 +127,7 @@ const styles = {
   table: { width: "100%", borderCollapse: "collapse", textAlign: "left" },
   editBtn: { background: "#ffeaa7", border: "none", padding: "6px 10px", marginRight: "5px", borderRadius: "6px", cursor: "pointer" },
   deleteBtn: { background: "#ff7675", border: "none", padding: "6px 10px", color: "white", borderRadius: "6px", cursor: "pointer" },
+  moreBtn: { display: "block", margin: "15px auto 0", background: "#5f27cd", color: "white", border: "none", borderRadius: "8px", padding: "10px 15px", cursor: "pointer" },
 };
 
 export default Agents;
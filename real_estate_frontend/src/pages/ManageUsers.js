@@ -1,8 +1,12 @@
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import axios from "axios";
+import { waitForJob } from "../jobs";
+import { fetchPage, fetchPages } from "../paging";
 
 function ManageUsers() {
   const [users, setUsers] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const shown = useRef(0);
   const [username, setUsername] = useState("");
   const [email, setEmail] = useState("");
   const [role, setRole] = useState("buyer");
@@ -10,8 +14,19 @@ function ManageUsers() {
 
   const baseURL = "http://127.0.0.1:8000";
 
+  const show = ({ rows, nextCursor }) => {
+    shown.current = rows.length;
+    setUsers(rows);
+    setNextCursor(nextCursor);
+  };
+  const refresh = () => fetchPages(baseURL, "/users", "users", shown.current).then(show);
+  const loadMore = async () => {
+    const page = await fetchPage(baseURL, "/users", "users", nextCursor);
+    show({ rows: users.concat(page.rows), nextCursor: page.nextCursor });
+  };
+
   useEffect(() => {
-    axios.get(`${baseURL}/users`).then((res) => setUsers(res.data.users || []));
+    refresh();
   }, []);
 
   const handleAddOrUpdateUser = async (e) => {
@@ -28,8 +43,7 @@ function ManageUsers() {
       setUsername("");
       setEmail("");
       setRole("buyer");
-      const res = await axios.get(`${baseURL}/users`);
-      setUsers(res.data.users || []);
+      await refresh();
     } catch (error) {
       alert("❌ Error adding/updating user. Check console.");
     }
@@ -45,10 +59,9 @@ function ManageUsers() {
   const handleDelete = async (id) => {
     if (!window.confirm("Delete this user?")) return;
     try {
-      await axios.delete(`${baseURL}/delete_user/${id}`);
+      await waitForJob(baseURL, await axios.delete(`${baseURL}/delete_user/${id}`));
       alert("🗑️ Deleted successfully!");
-      const res = await axios.get(`${baseURL}/users`);
-      setUsers(res.data.users || []);
+      await refresh();
     } catch {
       alert("❌ Error deleting user.");
     }
@@ -94,6 +107,9 @@ function ManageUsers() {
           ))}
         </tbody>
       </table>
+      {nextCursor && (
+        <button style={styles.moreBtn} onClick={loadMore}>Load more</button>
+      )}
     </div>
   );
 }
@@ -143,6 +159,16 @@ const styles = {
     borderRadius: "6px",
     cursor: "pointer",
   },
+  moreBtn: {
+    display: "block",
+    margin: "15px auto 0",
+    background: "#5f27cd",
+    color: "white",
+    border: "none",
+    borderRadius: "8px",
+    padding: "10px 15px",
+    cursor: "pointer",
+  },
 };
 
 export default ManageUsers;
@@ -1,8 +1,11 @@
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import axios from "axios";
+import { fetchPage, fetchPages } from "../paging";
 
 function Properties() {
   const [properties, setProperties] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const shown = useRef(0);
   const [form, setForm] = useState({
     agent_username: "",
     title: "",
@@ -16,8 +19,31 @@ function Properties() {
   const [editingPropertyId, setEditingPropertyId] = useState(null);
   const baseURL = "http://127.0.0.1:8000";
 
+  const show = ({ rows, nextCursor }) => {
+    shown.current = rows.length;
+    setProperties(rows);
+    setNextCursor(nextCursor);
+  };
+  const refresh = () => fetchPages(baseURL, "/properties", "properties", shown.current).then(show);
+  const loadMore = async () => {
+    const page = await fetchPage(baseURL, "/properties", "properties", nextCursor);
+    show({ rows: properties.concat(page.rows), nextCursor: page.nextCursor });
+  };
+
   useEffect(() => {
-    axios.get(`${baseURL}/properties`).then((res) => setProperties(res.data.properties || []));
+    refresh();
+
+    // Live updates: status rows are applied in place; other changes re-fetch
+    const source = new EventSource(`${baseURL}/stream/properties`);
+    source.addEventListener("status", (e) => {
+      const { property_id, new_status } = JSON.parse(e.data);
+      setProperties((list) =>
+        list.map((p) => (p.property_id === property_id ? { ...p, status: new_status } : p))
+      );
+    });
+    source.addEventListener("changed", refresh);
+    source.addEventListener("reset", refresh);
+    return () => source.close();
   }, []);
 
   const handleChange = (e) => setForm({ ...form, [e.target.name]: e.target.value });
@@ -43,8 +69,7 @@ function Properties() {
         property_type: "sale",
         status: "available",
       });
-      const res = await axios.get(`${baseURL}/properties`);
-      setProperties(res.data.properties || []);
+      await refresh();
     } catch (err) {
       console.error(err);
       alert("❌ Error adding/updating property.");
@@ -70,8 +95,7 @@ function Properties() {
     try {
       await axios.delete(`${baseURL}/delete_property/${id}`);
       alert("🗑️ Property deleted successfully!");
-      const res = await axios.get(`${baseURL}/properties`);
-      setProperties(res.data.properties || []);
+      await refresh();
     } catch {
       alert("❌ Error deleting property.");
     }
@@ -127,6 +151,9 @@ function Properties() {
           ))}
         </tbody>
       </table>
+      {nextCursor && (
+        <button style={styles.moreBtn} onClick={loadMore}>Load more</button>
+      )}
     </div>
   );
 }
@@ -141,6 +168,7 @@ const styles = {
   table: { width: "100%", borderCollapse: "collapse", textAlign: "left" },
   editBtn: { background: "#ffeaa7", border: "none", padding: "6px 10px", marginRight: "5px", borderRadius: "6px", cursor: "pointer" },
   deleteBtn: { background: "#ff7675", border: "none", padding: "6px 10px", color: "white", borderRadius: "6px", cursor: "pointer" },
+  moreBtn: { display: "block", margin: "15px auto 0", background: "#5f27cd", color: "white", border: "none", borderRadius: "8px", padding: "10px 15px", cursor: "pointer" },
 };
 
 export default Properties;
@@ -0,0 +1,21 @@
+import axios from "axios";
+
+// List endpoints return one keyset page plus next_cursor (null on the
+// last page); pass it back as ?cursor= for the page after
+export async function fetchPage(baseURL, path, key, cursor = null) {
+  const { data } = await axios.get(`${baseURL}${path}`, { params: cursor ? { cursor } : {} });
+  return { rows: data[key] || [], nextCursor: data.next_cursor || null };
+}
+
+// Re-reads from the first page until at least `minRows` rows are back
+// (or the list ends), so a refresh keeps what "Load more" had shown
+export async function fetchPages(baseURL, path, key, minRows = 0) {
+  let rows = [];
+  let cursor = null;
+  do {
+    const page = await fetchPage(baseURL, path, key, cursor);
+    rows = rows.concat(page.rows);
+    cursor = page.nextCursor;
+  } while (cursor && rows.length < minRows);
+  return { rows, nextCursor: cursor };
+}